@@ -0,0 +1,224 @@
+"""
+Asyncio counterpart of Helpers/Database_connectors.py for non-Streamlit
+consumers (API sidecars, exporters) that run on an event loop.
+
+Every read helper here runs the same query plan as its synchronous namesake,
+so the SQL, result shaping and cache entries are shared; only the driver
+(aiomysql) and the pool differ.
+
+    from Helpers import Async_database_connectors as adb
+    stats = await adb.get_dashboard_stats()
+    await adb.close_pool()
+"""
+import asyncio
+import os
+from contextlib import asynccontextmanager
+import aiomysql
+import pandas as pd
+from Helpers import Database_connectors as db
+from Helpers import Columnar, Score_rollups
+from Helpers.Query_cache import acached
+
+# Async Pool Settings (default to the synchronous pool's)
+ASYNC_DB_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", str(db.DB_POOL_SIZE)))
+
+_pool = None
+_pool_lock = asyncio.Lock()
+
+# Get (or Lazily Create) the aiomysql Pool
+async def get_pool():
+    global _pool
+    if db.DB_BACKEND != "mysql":
+        raise RuntimeError(f"The async helpers need the MySQL backend (DB_BACKEND={db.DB_BACKEND}).")
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await aiomysql.create_pool(
+                    host=os.getenv("DB_HOST"),
+                    user=os.getenv("DB_USER"),
+                    password=os.getenv("DB_PASSWORD"),
+                    db=os.getenv("DB_NAME"),
+                    minsize=0,
+                    maxsize=ASYNC_DB_POOL_SIZE,
+                    pool_recycle=db.DB_POOL_IDLE_TIMEOUT,
+                    # aiomysql closes connections released mid-transaction, so reads
+                    # run in autocommit and writes open their transaction explicitly
+                    autocommit=True,
+                )
+    return _pool
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        pool.close()
+        await pool.wait_closed()
+
+# Scoped Session: borrow a connection, yield a cursor, always give it back
+@asynccontextmanager
+async def db_session(commit=False):
+    pool = await get_pool()
+    conn = await asyncio.wait_for(pool.acquire(), db.DB_POOL_TIMEOUT)
+    try:
+        async with conn.cursor() as cursor:
+            if commit:
+                await conn.begin()
+            try:
+                yield cursor
+                if commit:
+                    await conn.commit()
+            except BaseException:
+                if commit:
+                    await conn.rollback()
+                raise
+    finally:
+        pool.release(conn)
+
+# Drive a query plan from Database_connectors on one async session
+async def run_plan(plan, commit=False):
+    async with db_session(commit=commit) as cursor:
+        rows = None
+        while True:
+            try:
+                query = plan.send(rows)
+            except StopIteration as stop:
+                return stop.value
+            await cursor.execute(query.sql, query.params or None)
+            if query.frame:
+                rows = await fetch_frame(cursor, query.dtypes)
+            else:
+                rows = db.shape_rows(query, cursor.description, await cursor.fetchall())
+
+# Async twin of Columnar.fetch_frame
+async def fetch_frame(cursor, dtypes=None, batch_size=Columnar.FETCH_BATCH_ROWS):
+    rowcount = cursor.rowcount or -1
+    builder = Columnar.ColumnBuilder(cursor.description, dtypes, rowcount if rowcount > 0 else batch_size)
+    while True:
+        rows = await cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        builder.append(rows)
+    return builder.frame()
+
+
+_rollups_lock = asyncio.Lock()
+
+# Check once per process that migration 1 created and backfilled the score rollup tables
+async def ensure_rollups():
+    if db._rollups_ready:
+        return
+    async with _rollups_lock:
+        if db._rollups_ready:
+            return
+        try:
+            async with db_session() as cursor:
+                await cursor.execute(Score_rollups.NEEDS_REBUILD_QUERY)
+                needs_rebuild = Score_rollups.rebuild_needed(await cursor.fetchone())
+        except aiomysql.Error as err:
+            raise RuntimeError(db.ROLLUPS_MISSING) from err
+        if needs_rebuild:
+            raise RuntimeError(db.ROLLUPS_EMPTY)
+        db._rollups_ready = True
+
+# Async read helper running the registered plan of the same name
+def _read_helper(name):
+    spec = db.READ_HELPERS[name]
+
+    async def helper(*args, **kwargs):
+        if spec.rollups:
+            await ensure_rollups()
+        return await run_plan(spec.plan(*args, **kwargs))
+
+    helper.__name__ = helper.__qualname__ = name
+    helper.__doc__ = spec.plan.__doc__
+    return acached(tables=spec.tables, ttl=spec.ttl)(helper)
+
+
+"""
+Dashboard.py
+"""
+get_dashboard_kpis = _read_helper("get_dashboard_kpis")
+
+async def get_dashboard_stats():
+    kpis = await get_dashboard_kpis()
+    return kpis.total_employees, kpis.total_departments, kpis.active_projects, kpis.average_performance
+
+async def get_performance_insights():
+    kpis = await get_dashboard_kpis()
+    return kpis.top_performers, kpis.most_projects, kpis.high_success_projects
+
+"""
+Employee.py
+"""
+_fetch_all_records = _read_helper("_fetch_all_records")
+_fetch_records_page = _read_helper("_fetch_records_page")
+_fetch_employee_ids = _read_helper("_fetch_employee_ids")
+estimate_row_count = _read_helper("estimate_row_count")
+get_histogram = _read_helper("get_histogram")
+get_department_distribution = _read_helper("get_department_distribution")
+
+async def view_records(table_name, columns=None):
+    try:
+        df = await _fetch_all_records(table_name, db._checked_columns(table_name, columns))
+        return df if not df.empty else pd.DataFrame(columns=["No records found"])
+    except aiomysql.Error as err:
+        print(f"Error: {err}")
+        return pd.DataFrame(columns=["Error"])
+
+async def get_records_page(table_name, columns=None, page_size=50, after=None,
+                           order_by=None, descending=False, filters=None):
+    args = db.records_page_args(table_name, columns, page_size, after, order_by, descending, filters)
+    records, next_key = await _fetch_records_page(*args)
+    return db.RecordPage(records, next_key, await estimate_row_count(table_name, args[-1]))
+
+async def get_employee_ids():
+    try:
+        return await _fetch_employee_ids()
+    except:
+        return []
+
+"""
+Performance.py
+"""
+get_all_performance_records = _read_helper("get_all_performance_records")
+get_performance_averages = _read_helper("get_performance_averages")
+get_employee_rankings = _read_helper("get_employee_rankings")
+_filter_performance_rows = _read_helper("_filter_performance_rows")
+
+async def get_top_performers(limit=5):
+    return db.top_ranked(await get_employee_rankings(), limit)
+
+async def get_bottom_performers(limit=5):
+    return db.bottom_ranked(await get_employee_rankings(), limit)
+
+async def get_underperformers(threshold=60):
+    return db.ranked_below(await get_employee_rankings(), threshold)
+
+async def get_performance_band(band):
+    return db.ranked_in_band(await get_employee_rankings(), band)
+
+async def get_analytics():
+    rankings = await get_employee_rankings()
+    return db.top_ranked(rankings, 3), db.bottom_ranked(rankings, 3)
+
+# Filtered in SQL: the performance cube is loaded through the synchronous pool
+async def filter_performance(dept_id=None, project_id=None):
+    return await _filter_performance_rows(dept_id, project_id)
+
+"""
+Department.py
+"""
+get_all_departments = _read_helper("get_all_departments")
+get_department_names = _read_helper("get_department_names")
+get_department_employee_count = _read_helper("get_department_employee_count")
+get_budget_distribution = _read_helper("get_budget_distribution")
+get_department_scores = _read_helper("get_department_scores")
+
+"""
+Projects.py
+"""
+get_all_projects = _read_helper("get_all_projects")
+get_project_performance = _read_helper("get_project_performance")
+get_project_score_chart = _read_helper("get_project_score_chart")
+get_top_projects = _read_helper("get_top_projects")
+get_underperforming_projects = _read_helper("get_underperforming_projects")
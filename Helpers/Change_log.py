@@ -0,0 +1,74 @@
+"""
+Change log: one row per inserted, updated or deleted row of the core tables,
+written by AFTER INSERT / UPDATE / DELETE triggers. Clients remember the last
+ChangeID they have seen (their watermark) and ask Database_connectors for the
+changes since then instead of reloading whole tables.
+
+Triggers also catch writes made outside the app (imports, SQL consoles).
+Installed by migration 3; DuckDB has no triggers, so there the change log
+doesn't exist and callers fall back to full reloads. Primary keys are
+assumed never to be updated in place.
+
+Every function takes an open cursor and leaves committing to the caller.
+"""
+
+CHANGE_LOG_TABLE = "change_log"
+
+# Tracked table -> primary key
+TRACKED_TABLES = {
+    "employee": "EmpID",
+    "department": "DeptID",
+    "project": "ProjectID",
+    "performance": "PerformanceID",
+}
+
+EVENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+def _ddl(backend):
+    # SQLite numbers an INTEGER PRIMARY KEY itself, including rows inserted by triggers
+    change_id = ("ChangeID INTEGER PRIMARY KEY" if backend == "sqlite"
+                 else "ChangeID BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY")
+    return f"""
+CREATE TABLE IF NOT EXISTS {CHANGE_LOG_TABLE} (
+    {change_id},
+    TableName VARCHAR(64) NOT NULL,
+    RowKey INT NOT NULL,
+    Op CHAR(1) NOT NULL,
+    ChangedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+)"""
+
+def trigger_name(table, event):
+    return f"{table}_{event.lower()}_log"
+
+# BEGIN ... END bodies are accepted by both MySQL and SQLite
+def _trigger_ddl(table, key, event):
+    row = "OLD" if event == "DELETE" else "NEW"
+    return f"""
+CREATE TRIGGER {trigger_name(table, event)} AFTER {event} ON {table}
+FOR EACH ROW BEGIN
+    INSERT INTO {CHANGE_LOG_TABLE} (TableName, RowKey, Op) VALUES ('{table}', {row}.{key}, '{event[0]}');
+END"""
+
+
+def create_change_log(cursor, backend):
+    cursor.execute(_ddl(backend))
+    for table, key in TRACKED_TABLES.items():
+        for event in EVENTS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name(table, event)}")
+            cursor.execute(_trigger_ddl(table, key, event))
+
+def drop_change_log(cursor):
+    for table in TRACKED_TABLES:
+        for event in EVENTS:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger_name(table, event)}")
+    cursor.execute(f"DROP TABLE IF EXISTS {CHANGE_LOG_TABLE}")
+
+# Delete all but the newest `keep_rows` entries; clients older than that reload in full
+def prune(cursor, keep_rows):
+    cursor.execute(f"SELECT MAX(ChangeID) FROM {CHANGE_LOG_TABLE}")
+    (max_id,) = cursor.fetchone()
+    if max_id is None or max_id <= keep_rows:
+        return 0
+    cursor.execute(f"DELETE FROM {CHANGE_LOG_TABLE} WHERE ChangeID <= %s", (max_id - keep_rows,))
+    return cursor.rowcount
@@ -0,0 +1,90 @@
+"""
+Chart data for the pages: whatever the size of the table behind a chart, what
+Plotly sends to the browser stays bounded.
+
+  * categorical charts show at most CHART_MAX_CATEGORIES categories: the
+    largest ones plus an "Other" bucket for the rest (top_k / count_top_k);
+  * labels are cut to CHART_LABEL_CHARS characters (truncate_labels);
+  * point charts are WebGL scatter traces of at most CHART_MAX_POINTS points
+    (scatter).
+
+Inputs are DataFrames that are already aggregated where possible (in SQL, see
+e.g. get_project_score_chart); this module only shapes them.
+"""
+import os
+from Helpers.Config import load_config
+from Helpers.Lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+px = lazy_import("plotly.express")
+
+load_config()
+
+# Chart Settings
+CHART_MAX_CATEGORIES = int(os.getenv("CHART_MAX_CATEGORIES", "20"))
+CHART_LABEL_CHARS = int(os.getenv("CHART_LABEL_CHARS", "30"))
+CHART_MAX_POINTS = int(os.getenv("CHART_MAX_POINTS", "5000"))
+
+OTHER_LABEL = "Other"
+
+
+def truncate_label(text, max_chars=CHART_LABEL_CHARS):
+    text = "" if text is None or text is pd.NA else str(text)
+    return text if len(text) <= max_chars else text[:max_chars - 1].rstrip() + "…"
+
+# Truncated labels; labels that collide after truncation get their key appended (" #key")
+def truncate_labels(labels, max_chars=CHART_LABEL_CHARS, keys=None):
+    labels = pd.Series(labels, dtype=object).reset_index(drop=True)
+    short = labels.map(lambda text: truncate_label(text, max_chars))
+    if keys is not None:
+        keys = pd.Series(keys, dtype=object).reset_index(drop=True)
+        clash = short.duplicated(keep=False) & keys.notna()
+        short[clash] = [f"{label} #{key}" for label, key in zip(short[clash], keys[clash])]
+    return short.tolist()
+
+def other_label(count, other=OTHER_LABEL):
+    return f"{other} ({count:,})"
+
+# Labels for a frame already cut to top-k + "Other" in SQL: truncated labels, and
+# "Other (n)" for the bucket row (the one with no `key`), n taken from `count`
+def bucket_labels(frame, label, key, count):
+    labels = truncate_labels(frame[label], keys=frame[key])
+    return [other_label(int(n)) if pd.isna(k) else text
+            for text, k, n in zip(labels, frame[key], frame[count])]
+
+# At most `k` rows of a one-row-per-category frame: the k-1 largest (or smallest) by `value`,
+# then one "Other (n)" row whose value is the sum or mean of the rest. `key` tells apart equal labels.
+def top_k(frame, label, value, k=CHART_MAX_CATEGORIES, agg="sum", ascending=False, key=None, other=OTHER_LABEL):
+    ordered = frame.sort_values(value, ascending=ascending, kind="stable")
+    shown = pd.DataFrame({
+        label: truncate_labels(ordered[label], keys=ordered[key] if key else None),
+        value: ordered[value].to_numpy(),
+    })
+    if len(shown) <= k:
+        return shown
+    rest = shown[value].iloc[k - 1:]
+    bucket = pd.DataFrame({label: [other_label(len(rest), other)], value: [getattr(rest, agg)()]})
+    return pd.concat([shown.iloc[:k - 1], bucket], ignore_index=True)
+
+# Category counts (a value_counts() Series) as a top-k frame with an "Other" bucket
+def count_top_k(counts, label, k=CHART_MAX_CATEGORIES, value="Count"):
+    counts = counts[counts > 0]
+    frame = pd.DataFrame({label: counts.index.astype(str), value: counts.to_numpy()})
+    return top_k(frame, label, value, k)
+
+# Evenly spaced rows, at most `max_points` of them, in their original order
+def downsample(frame, max_points=CHART_MAX_POINTS):
+    if len(frame) <= max_points:
+        return frame
+    step = len(frame) / max_points
+    return frame.iloc[[int(i * step) for i in range(max_points)]]
+
+# WebGL scatter of at most `max_points` points; hover labels are truncated
+def scatter(frame, x, y, hover_name=None, max_points=CHART_MAX_POINTS, **kwargs):
+    points = downsample(frame, max_points)
+    if hover_name is not None:
+        points = points.assign(**{hover_name: truncate_labels(points[hover_name])})
+    fig = px.scatter(points, x=x, y=y, hover_name=hover_name, render_mode="webgl", **kwargs)
+    if len(points) < len(frame):
+        fig.update_layout(title_text=f"{fig.layout.title.text or ''} ({len(points):,} of {len(frame):,} points)")
+    return fig
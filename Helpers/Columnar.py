@@ -0,0 +1,151 @@
+"""
+Columnar fetch: build DataFrames straight from cursor batches.
+
+Rows are read with fetchmany() and copied column by column into preallocated,
+typed NumPy buffers, so a result never exists as one Python dict per row.
+Columns get their dtype from COLUMN_DTYPES by name (nullable Int32 for IDs and
+counts, float32 for the raw per-row scores, float64 for the averages the pages
+display, category for SuccessIndicator); anything else is kept as Python
+objects and left to pandas' usual inference.
+"""
+from Helpers.Lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+# Rows per fetchmany() call
+FETCH_BATCH_ROWS = 10_000
+
+# Column name -> dtype of the resulting DataFrame column
+COLUMN_DTYPES = {
+    **dict.fromkeys(
+        ["EmpID", "DeptID", "ProjectID", "PerformanceID", "EmployeeID", "AttendanceID", "EvaluatorID",
+         "WorkEx", "Count", "ScoreRank", "ScoreBand"],
+        "Int32",
+    ),
+    **dict.fromkeys(["EfficiencyScore", "TimelineScore", "QualityScore", "AccuracyScore"], "float32"),
+    # SQL-rounded averages stay float64, so 57.78 is shown as 57.78 rather than 57.779999
+    **dict.fromkeys(
+        ["AvgScore", "AvgEfficiency", "AvgTimeline", "AvgQuality", "AvgAccuracy", "Salary", "Budget"],
+        "float64",
+    ),
+    "SuccessIndicator": "category",
+}
+
+
+def column_dtype(name, dtypes=None):
+    if dtypes and name in dtypes:
+        return dtypes[name]
+    return COLUMN_DTYPES.get(name)
+
+
+class _Column:
+    # Growable typed buffer for one result column
+    def __init__(self, dtype, capacity):
+        self.dtype = dtype
+        if dtype == "Int32":
+            self.data = np.zeros(capacity, dtype=np.int32)
+            self.mask = np.zeros(capacity, dtype=bool)
+        elif dtype in ("float32", "float64"):
+            self.data = np.empty(capacity, dtype=dtype)
+            self.mask = None
+        else:
+            self.data = np.empty(capacity, dtype=object)
+            self.mask = None
+
+    def reserve(self, capacity):
+        if capacity <= len(self.data):
+            return
+        capacity = max(capacity, 2 * len(self.data))
+        self.data = np.resize(self.data, capacity)
+        if self.mask is not None:
+            self.mask = np.resize(self.mask, capacity)
+
+    def put(self, start, values):
+        stop = start + len(values)
+        if self.dtype == "Int32":
+            self.mask[start:stop] = np.fromiter((v is None for v in values), dtype=bool, count=len(values))
+            self.data[start:stop] = np.fromiter((0 if v is None else v for v in values), dtype=np.int32,
+                                                count=len(values))
+        elif self.mask is None and self.data.dtype != object:
+            self.data[start:stop] = np.fromiter((np.nan if v is None else v for v in values),
+                                                dtype=self.data.dtype, count=len(values))
+        else:
+            self.data[start:stop] = values
+
+    def array(self, length):
+        data = self.data[:length]
+        if self.dtype == "Int32":
+            return pd.arrays.IntegerArray(data, self.mask[:length])
+        if self.dtype == "category":
+            return pd.Categorical(data)
+        if data.dtype == object:
+            return pd.Series(data).infer_objects().array
+        return data
+
+
+class ColumnBuilder:
+    """Accumulates row batches of one result set into typed column buffers."""
+
+    def __init__(self, description, dtypes=None, capacity=FETCH_BATCH_ROWS):
+        self.names = [col[0] for col in description]
+        capacity = max(int(capacity), 1)
+        self.columns = [_Column(column_dtype(name, dtypes), capacity) for name in self.names]
+        self.length = 0
+
+    def append(self, rows):
+        if not rows:
+            return
+        for column in self.columns:
+            column.reserve(self.length + len(rows))
+        for column, values in zip(self.columns, zip(*rows)):
+            column.put(self.length, values)
+        self.length += len(rows)
+
+    def frame(self):
+        return pd.DataFrame(
+            {name: column.array(self.length) for name, column in zip(self.names, self.columns)},
+            columns=self.names,
+        )
+
+
+# Read the cursor's current result set into a DataFrame, one fetchmany() batch at a time
+def fetch_frame(cursor, dtypes=None, batch_size=FETCH_BATCH_ROWS):
+    # Buffered cursors know their row count up front; others grow as batches arrive
+    rowcount = getattr(cursor, "rowcount", -1) or -1
+    builder = ColumnBuilder(cursor.description, dtypes, rowcount if rowcount > 0 else batch_size)
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        builder.append(rows)
+    return builder.frame()
+
+# Same as fetch_frame, but yields one DataFrame per fetchmany() batch, so only one batch is ever in memory
+# (category columns only know the categories of their own chunk)
+def iter_frames(cursor, dtypes=None, batch_size=FETCH_BATCH_ROWS):
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows_to_frame(cursor.description, rows, dtypes)
+
+# Rows of `frame` followed by those of `others`, keeping `frame`'s dtypes (categories are re-derived)
+def append_rows(frame, *others):
+    combined = pd.concat([frame, *others], ignore_index=True)
+    return combined.astype({
+        col: "category" if isinstance(dtype, pd.CategoricalDtype) else dtype
+        for col, dtype in frame.dtypes.items()
+    })
+
+# Plain Python scalar for a DataFrame cell (NumPy scalars can't be bound as SQL parameters)
+def python_value(value):
+    if value is None or value is pd.NA or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return value.item() if isinstance(value, np.generic) else value
+
+# Same as fetch_frame, for rows that were already fetched (e.g. by an async driver)
+def rows_to_frame(description, rows, dtypes=None):
+    builder = ColumnBuilder(description, dtypes, len(rows))
+    builder.append(rows)
+    return builder.frame()
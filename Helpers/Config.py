@@ -0,0 +1,22 @@
+"""
+One-time configuration loading: every module that reads settings from the
+environment calls load_config() before its settings block, so `.env` is
+parsed once per process, before the first setting is read, whichever Helpers
+module happens to be imported first.
+"""
+import threading
+
+_loaded = False
+_lock = threading.Lock()
+
+
+def load_config():
+    global _loaded
+    if _loaded:
+        return
+    with _lock:
+        if not _loaded:
+            from dotenv import load_dotenv
+            # Searches upwards from Helpers/, as the call in Database_connectors used to
+            load_dotenv()
+            _loaded = True
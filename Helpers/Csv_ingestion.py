@@ -0,0 +1,186 @@
+from functools import partial
+from typing import NamedTuple, Optional
+from Helpers.Lazy_imports import lazy_import
+from Helpers.Database_connectors import BULK_INSERT_CHUNK_SIZE, PERFORMANCE_UPLOAD_COLUMNS
+
+pd = lazy_import("pandas")
+
+# Rows parsed from the upload per chunk; memory use is bounded by this, not by the file size
+CSV_CHUNK_ROWS = 20000
+
+# Rows shown in the upload widget before inserting
+CSV_PREVIEW_ROWS = 100
+
+# Explicit dtypes so pandas never infers (or upcasts to object) column types chunk by chunk
+PERFORMANCE_CSV_DTYPES = {
+    "EmpID": "Int32",
+    "ProjectID": "Int32",
+    "AccuracyScore": "float64",
+    "EfficiencyScore": "float64",
+    "QualityScore": "float64",
+    "TimelineScore": "float64",
+}
+
+EMPLOYEE_CSV_DTYPES = {
+    "EmpID": "Int32",
+    "Name": "string",
+    "DeptID": "Int32",
+    "AttendanceID": "Int32",
+    "EmailID": "string",
+    "DOB": "string",
+    "Address": "string",
+    "WorkEx": "Int32",
+    "Salary": "float64",
+}
+
+DEPARTMENT_CSV_DTYPES = {
+    "DeptID": "Int32",
+    "Name": "string",
+}
+
+# Columns an employee / department upload must have; the others may be left out
+EMPLOYEE_CSV_REQUIRED = ["EmpID", "Name"]
+DEPARTMENT_CSV_REQUIRED = ["DeptID", "Name"]
+
+SCORE_MIN = 0
+SCORE_MAX = 100
+
+# VARCHAR widths of the schema
+NAME_MAX_LENGTH = 100
+EMAIL_MAX_LENGTH = 100
+ADDRESS_MAX_LENGTH = 255
+
+
+class IngestionResult(NamedTuple):
+    ok: bool
+    rows: int
+    rejected: int
+    chunks: int
+    error: Optional[str] = None
+
+    def __bool__(self):
+        return self.ok
+
+
+# Bounded preview of an upload; rewinds the file so it can be streamed afterwards
+def read_csv_preview(uploaded_file, dtypes=PERFORMANCE_CSV_DTYPES, rows=CSV_PREVIEW_ROWS):
+    uploaded_file.seek(0)
+    try:
+        return pd.read_csv(uploaded_file, nrows=rows, dtype=dtypes)
+    finally:
+        uploaded_file.seek(0)
+
+# Yield the upload as DataFrame chunks of at most `chunk_rows` rows.
+# With `required`, only those columns must be present; missing optional ones come back empty.
+def iter_csv_chunks(uploaded_file, dtypes=PERFORMANCE_CSV_DTYPES, chunk_rows=CSV_CHUNK_ROWS, required=None):
+    uploaded_file.seek(0)
+    if required is None:
+        reader = pd.read_csv(uploaded_file, usecols=list(dtypes), dtype=dtypes, chunksize=chunk_rows)
+    else:
+        header = pd.read_csv(uploaded_file, nrows=0).columns
+        uploaded_file.seek(0)
+        missing = [col for col in required if col not in header]
+        if missing:
+            raise ValueError(f"Missing required column(s): {', '.join(missing)}")
+        reader = pd.read_csv(uploaded_file, usecols=lambda col: col in dtypes, dtype=dtypes, chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            yield chunk.reindex(columns=list(dtypes)).astype(dtypes)
+
+# Split a chunk into rows that can be inserted and a count of rejected rows
+def validate_performance_chunk(chunk):
+    valid = chunk["EmpID"].notna() & chunk["ProjectID"].notna()
+    for col in PERFORMANCE_UPLOAD_COLUMNS[2:]:
+        scores = chunk[col]
+        valid &= scores.isna() | scores.between(SCORE_MIN, SCORE_MAX)
+    return chunk[valid], int((~valid).sum())
+
+# Rows whose Name is present and fits the schema
+def _valid_names(names):
+    names = names.str.strip()
+    return names.notna() & names.ne("") & names.str.len().le(NAME_MAX_LENGTH)
+
+# Employee rows that can be upserted; DeptID must be one of `dept_ids` when that is given
+def validate_employee_chunk(chunk, dept_ids=None):
+    valid = chunk["EmpID"].gt(0) & _valid_names(chunk["Name"])
+    if dept_ids is not None:
+        valid &= chunk["DeptID"].isna() | chunk["DeptID"].isin(dept_ids)
+    emails = chunk["EmailID"]
+    valid &= emails.isna() | (emails.str.contains("@", regex=False) & emails.str.len().le(EMAIL_MAX_LENGTH))
+    valid &= chunk["Address"].isna() | chunk["Address"].str.len().le(ADDRESS_MAX_LENGTH)
+    valid &= chunk["DOB"].isna() | pd.to_datetime(chunk["DOB"], format="%Y-%m-%d", errors="coerce").notna()
+    valid &= chunk["WorkEx"].isna() | chunk["WorkEx"].ge(0)
+    valid &= chunk["Salary"].isna() | chunk["Salary"].ge(0)
+    valid = valid.fillna(False).astype(bool)
+    return chunk[valid], int((~valid).sum())
+
+def validate_department_chunk(chunk):
+    valid = (chunk["DeptID"].gt(0) & _valid_names(chunk["Name"])).fillna(False).astype(bool)
+    return chunk[valid], int((~valid).sum())
+
+# Validate an upload chunk by chunk and write it: streamed through `write(valid, chunk_size=...)`
+# one chunk at a time, or (staged=True) handed to `write` as a single iterable of chunks so that
+# it can be applied all-or-nothing
+def _ingest_csv(uploaded_file, write, dtypes, validate, required=None, staged=False,
+                chunk_rows=CSV_CHUNK_ROWS, batch_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    size = getattr(uploaded_file, "size", None)
+    rows = rejected = chunks = 0
+
+    def report():
+        if progress:
+            fraction = min(uploaded_file.tell() / size, 1.0) if size else None
+            progress(rows, rejected, fraction)
+
+    # Read errors raised while staging surface through `write` as a failed merge; keep their message
+    errors = []
+
+    def valid_chunks():
+        nonlocal rows, rejected, chunks
+        try:
+            for chunk in iter_csv_chunks(uploaded_file, dtypes, chunk_rows, required):
+                valid, bad = validate(chunk)
+                rejected += bad
+                if not valid.empty:
+                    yield valid
+                    rows += len(valid)
+                chunks += 1
+                report()
+        except ValueError as e:
+            errors.append(str(e))
+            raise
+
+    try:
+        if staged:
+            result = write(valid_chunks(), chunk_size=batch_size)
+            if not result:
+                error = errors[0] if errors else "Database merge failed; nothing was applied."
+                return IngestionResult(False, 0, rejected, chunks, error)
+            return IngestionResult(True, result.rows, rejected, chunks)
+
+        for valid in valid_chunks():
+            result = write(valid, chunk_size=batch_size)
+            if not result:
+                return IngestionResult(False, rows + result.rows, rejected, chunks, "Database insert failed.")
+    except ValueError as e:
+        # Missing required columns or values that don't fit the declared dtypes
+        return IngestionResult(False, rows, rejected, chunks, str(e))
+    return IngestionResult(True, rows, rejected, chunks)
+
+# Stream an uploaded performance CSV into the database chunk by chunk
+def ingest_performance_csv(uploaded_file, insert, chunk_rows=CSV_CHUNK_ROWS,
+                           batch_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    return _ingest_csv(uploaded_file, insert, PERFORMANCE_CSV_DTYPES, validate_performance_chunk,
+                       chunk_rows=chunk_rows, batch_size=batch_size, progress=progress)
+
+# Upsert an uploaded employee CSV: `write` is bulk_upsert_employees, or merge_employees with staged=True
+def ingest_employee_csv(uploaded_file, write, dept_ids=None, staged=False, chunk_rows=CSV_CHUNK_ROWS,
+                        batch_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    validate = partial(validate_employee_chunk, dept_ids=None if dept_ids is None else list(dept_ids))
+    return _ingest_csv(uploaded_file, write, EMPLOYEE_CSV_DTYPES, validate, EMPLOYEE_CSV_REQUIRED, staged,
+                       chunk_rows, batch_size, progress)
+
+# Upsert an uploaded department CSV: `write` is bulk_upsert_departments, or merge_departments with staged=True
+def ingest_department_csv(uploaded_file, write, staged=False, chunk_rows=CSV_CHUNK_ROWS,
+                          batch_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    return _ingest_csv(uploaded_file, write, DEPARTMENT_CSV_DTYPES, validate_department_chunk,
+                       DEPARTMENT_CSV_REQUIRED, staged, chunk_rows, batch_size, progress)
@@ -1,13 +1,88 @@
 import os
-from dotenv import load_dotenv
-import mysql.connector
-import pandas as pd
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Database Connection
-def connect_db():
+import atexit
+import contextvars
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, NamedTuple, Optional
+from Helpers.Config import load_config
+from Helpers.Lazy_imports import lazy_import
+from Helpers.Query_cache import QUERY_CACHE_TTL, cached, get_cache_stats, invalidates
+from Helpers import Change_log, Columnar, Embedded_backend, Queries, Score_rollups
+from Helpers.Instrumentation import (
+    METRICS_PORT, InstrumentedCursor, error_log, instrumented, record_pool_wait, render_prometheus,
+    start_metrics_server
+)
+
+# Heavy modules are imported by the first helper that needs them, not by the pages importing this module
+mysql = lazy_import("mysql.connector", package=True)
+pd = lazy_import("pandas")
+
+# Load environment variables from .env file (once per process)
+load_config()
+
+# Database Backend: "mysql" (default), or an embedded "sqlite" / "duckdb" database at DB_PATH
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql").lower()
+
+# Connection Pool Settings
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", "300"))
+
+# Worker threads for concurrent page queries (defaults to one per pooled connection)
+DB_QUERY_WORKERS = int(os.getenv("DB_QUERY_WORKERS", str(DB_POOL_SIZE)))
+
+# Rows per multi-row INSERT (and per transaction) in the bulk upload paths
+BULK_INSERT_CHUNK_SIZE = int(os.getenv("BULK_INSERT_CHUNK_SIZE", "1000"))
+
+# Rows per DataFrame chunk of the streaming iter_* helpers
+STREAM_BATCH_ROWS = int(os.getenv("STREAM_BATCH_ROWS", "50000"))
+
+# Directory of Arrow table snapshots to warm-start full-table reads from (unset: read MySQL directly)
+SNAPSHOT_DIR = os.getenv("SNAPSHOT_DIR", "")
+
+# Change-log IDs newer than this many seconds may still be committing out of order; watermarks wait for them
+CHANGE_LOG_GAP_SECONDS = float(os.getenv("CHANGE_LOG_GAP_SECONDS", "60"))
+
+# Above this many changed keys a delta is no cheaper than a reload
+CHANGE_LOG_MAX_KEYS = int(os.getenv("CHANGE_LOG_MAX_KEYS", "10000"))
+
+# DatabaseError: raised for any database failure on every backend, including pool exhaustion
+# (the embedded backend re-raises its driver errors as mysql.connector errors).
+# Resolved on first use, so that importing it doesn't load the driver.
+def __getattr__(name):
+    if name == "DatabaseError":
+        return mysql.connector.Error
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Table Schema (from SQLDump): primary key and columns, used to whitelist identifiers
+TABLE_SCHEMA = {
+    "employee": ("EmpID", ["EmpID", "Name", "DeptID", "AttendanceID", "EmailID", "DOB", "Address", "WorkEx", "Salary"]),
+    "department": ("DeptID", ["DeptID", "Name"]),
+    "project": ("ProjectID", ["ProjectID", "EmployeeID", "ProjectInfo", "SuccessIndicator"]),
+    "performance": ("PerformanceID", ["PerformanceID", "EmpID", "ProjectID", "EfficiencyScore", "TimelineScore", "QualityScore", "AccuracyScore"]),
+    "evaluator": ("EvaluatorID", ["EvaluatorID", "EmpID"]),
+}
+
+# A database just seeded from SQLDump.zip gets migration 1 (the score rollups) with its seed,
+# since nothing else may ever migrate it (an in-memory one can't be reached from outside)
+def _migrate_seeded_database(cursor):
+    from Helpers import Migrations
+    Migrations.apply_initial(cursor, through=1)
+
+# Open a Fresh Connection (for MySQL: TCP + auth handshake)
+def _open_connection():
+    if DB_BACKEND in Embedded_backend.EMBEDDED_BACKENDS:
+        return Embedded_backend.connect(
+            DB_BACKEND, os.getenv("DB_PATH", ":memory:"), os.getenv("DB_SEED", Embedded_backend.SEED_DUMP),
+            on_seed=_migrate_seeded_database,
+        )
+    if DB_BACKEND != "mysql":
+        raise ValueError(f"Unknown DB_BACKEND: {DB_BACKEND}")
     return mysql.connector.connect(
         host=os.getenv("DB_HOST"),
         user=os.getenv("DB_USER"),
@@ -15,6 +90,599 @@ def connect_db():
         database=os.getenv("DB_NAME")
     )
 
+
+class PooledConnection:
+    """Proxy around a pooled MySQL connection.
+
+    Behaves like the underlying connection, except that ``close()`` hands the
+    socket back to the pool instead of tearing it down.
+    """
+
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise mysql.connector.errors.OperationalError("Connection already returned to the pool.")
+        return getattr(self._raw, name)
+
+    def close(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.release(raw)
+
+    # Close instead of returning to the pool (e.g. with an unread result that isn't worth draining)
+    def discard(self):
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool.discard(raw)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        # Safety net for callers that forget to close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    """Bounded pool of reusable MySQL connections.
+
+    Connections are health-checked with a ping on checkout, and connections
+    left idle for longer than ``idle_timeout`` seconds are closed.
+    """
+
+    def __init__(self, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                 idle_timeout=DB_POOL_IDLE_TIMEOUT, factory=_open_connection):
+        self.size = size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._factory = factory
+        self._idle = deque()  # (raw connection, returned_at)
+        self._open = 0
+        self._borrowed = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        with self._cond:
+            while True:
+                stale = self._pop_stale()
+                if self._idle:
+                    # LIFO: reuse the warmest connection so cold ones age out
+                    raw, _ = self._idle.pop()
+                    break
+                if self._open < self.size:
+                    self._open += 1
+                    raw = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise mysql.connector.errors.PoolError(
+                        f"No free connection in pool after {timeout}s (size={self.size})."
+                    )
+                self._cond.wait(remaining)
+            self._borrowed += 1
+            self._checkouts += 1
+        record_pool_wait(time.monotonic() - started)
+        self._close_quietly(stale)
+
+        if raw is not None and not self._healthy(raw):
+            self._close_quietly([raw])
+            raw = None
+        if raw is None:
+            try:
+                raw = self._factory()
+            except Exception:
+                with self._cond:
+                    self._open -= 1
+                    self._borrowed -= 1
+                    self._cond.notify()
+                raise
+        return PooledConnection(self, raw)
+
+    def release(self, raw):
+        try:
+            # Never hand a half-finished transaction or unread result to the next borrower
+            raw.consume_results()
+            if raw.in_transaction:
+                raw.rollback()
+        except Exception:
+            self.discard(raw)
+            return
+        with self._cond:
+            self._borrowed -= 1
+            self._idle.append((raw, time.monotonic()))
+            stale = self._pop_stale()
+            self._cond.notify()
+        self._close_quietly(stale)
+
+    # Drop a borrowed connection that is no longer usable
+    def discard(self, raw):
+        self._close_quietly([raw])
+        with self._cond:
+            self._open -= 1
+            self._borrowed -= 1
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle = [raw for raw, _ in self._idle]
+            self._idle.clear()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        self._close_quietly(idle)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "borrowed": self._borrowed,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+            }
+
+    # Must be called with self._cond held; returns connections for the caller to close
+    def _pop_stale(self):
+        stale = []
+        cutoff = time.monotonic() - self.idle_timeout
+        # The oldest idle connections sit at the left end of the deque
+        while self._idle and self._idle[0][1] < cutoff:
+            stale.append(self._idle.popleft()[0])
+        self._open -= len(stale)
+        return stale
+
+    @staticmethod
+    def _healthy(raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connections):
+        for raw in connections:
+            try:
+                raw.close()
+            except Exception:
+                pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Get (or Lazily Create) the Process-Wide Pool
+def get_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool()
+                atexit.register(_pool.close_all)
+    return _pool
+
+# Database Connection (borrowed from the pool; close() returns it)
+def connect_db():
+    return get_pool().acquire()
+
+_session_local = threading.local()
+
+
+class _RecordingCursor:
+    # Cursor proxy that logs every statement it executes
+    def __init__(self, cursor, log):
+        self._cursor = cursor
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._log.append((operation, params))
+        return self._cursor.execute(operation, params, *args, **kwargs)
+
+
+# Capture (sql, params) for every statement issued through db_session in this thread
+@contextmanager
+def record_statements():
+    log = []
+    previous = getattr(_session_local, "recorder", None)
+    _session_local.recorder = log
+    try:
+        yield log
+    finally:
+        _session_local.recorder = previous
+
+# Cursor on a borrowed connection, with statement recording and instrumentation applied.
+# A `prepared` cursor runs each statement on the connection's cached prepared cursor for it.
+def _session_cursor(conn, dictionary=False, prepared=False, buffered=None):
+    if prepared and Queries.PREPARED_STATEMENTS:
+        cursor = InstrumentedCursor(Queries.prepared_cursor(conn._raw))
+    else:
+        cursor = InstrumentedCursor(conn.cursor(dictionary=dictionary, buffered=buffered))
+    recorder = getattr(_session_local, "recorder", None)
+    if recorder is not None:
+        cursor = _RecordingCursor(cursor, recorder)
+    return cursor
+
+# Scoped Session: borrow a connection, yield a cursor, always give it back
+@contextmanager
+def db_session(dictionary=False, commit=False, prepared=False):
+    conn = connect_db()
+    try:
+        cursor = _session_cursor(conn, dictionary, prepared)
+        try:
+            yield cursor
+            if commit:
+                conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            raise
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                pass
+    finally:
+        conn.close()
+
+# Live Connection Counters (open / idle / borrowed) for monitoring
+def get_connection_stats():
+    return get_pool().stats()
+
+# Pool and cache figures exported next to the per-helper metrics
+def _metrics_gauges():
+    gauges = {f"coremetrics_pool_{name}": value for name, value in get_connection_stats().items()}
+    gauges["coremetrics_query_cache_entries"] = get_cache_stats()["entries"]
+    gauges.update({f"coremetrics_prepared_statements_{name}": value
+                   for name, value in Queries.get_statement_cache_stats().items()})
+    return gauges
+
+# Prometheus text for every helper, plus pool and cache gauges
+def get_metrics_text():
+    return render_prometheus(_metrics_gauges())
+
+# Serve get_metrics_text() on :METRICS_PORT/metrics (no-op when METRICS_PORT is unset)
+def start_metrics_endpoint(port=METRICS_PORT):
+    return start_metrics_server(port, gauges=_metrics_gauges)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_query_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=DB_QUERY_WORKERS, thread_name_prefix="coremetrics-query")
+                atexit.register(_executor.shutdown, wait=False)
+    return _executor
+
+# Submit independent helper calls to the bounded query pool; returns {name: Future}
+# Each call is `helper` or `(helper, *args)` and runs on its own pooled connection.
+def submit_queries(**calls):
+    executor = get_query_executor()
+    futures = {}
+    for name, call in calls.items():
+        func, args = (call[0], call[1:]) if isinstance(call, tuple) else (call, ())
+        # Carry the caller's context variables into the worker thread
+        futures[name] = executor.submit(contextvars.copy_context().run, func, *args)
+    return futures
+
+# Same as submit_queries, but waits and returns {name: result}
+def run_queries(**calls):
+    futures = submit_queries(**calls)
+    return {name: future.result() for name, future in futures.items()}
+
+class Query(NamedTuple):
+    """One statement of a query plan.
+
+    ``dictionary`` shapes the rows as dicts keyed by column name; ``one`` keeps
+    only the first row (or None); ``frame`` returns a typed DataFrame built
+    column by column (see Helpers/Columnar.py), with ``dtypes`` overriding the
+    default dtype of individual columns.
+    """
+    sql: str
+    params: tuple = ()
+    dictionary: bool = False
+    one: bool = False
+    frame: bool = False
+    dtypes: Optional[dict] = None
+
+
+# Shape fetched rows the way the plan asked for them, whatever driver produced them
+def shape_rows(query, description, rows):
+    if query.frame:
+        return Columnar.rows_to_frame(description, rows, query.dtypes)
+    if query.dictionary:
+        names = [col[0] for col in description]
+        rows = [dict(zip(names, row)) for row in rows]
+    else:
+        rows = [tuple(row) for row in rows]
+    if query.one:
+        return rows[0] if rows else None
+    return rows
+
+# Drive a query plan on one pooled session, on prepared statements.
+# A plan is a generator that yields Query objects, is sent back the shaped rows
+# of each, and returns the helper's result; it never touches a driver itself.
+def run_plan(plan, commit=False):
+    with db_session(commit=commit, prepared=True) as cursor:
+        rows = None
+        while True:
+            try:
+                query = plan.send(rows)
+            except StopIteration as stop:
+                return stop.value
+            cursor.execute(query.sql, query.params or None)
+            if query.frame:
+                rows = Columnar.fetch_frame(cursor, query.dtypes)
+            else:
+                rows = shape_rows(query, cursor.description, cursor.fetchall())
+
+# Stream one statement's result from an unbuffered cursor: typed DataFrame chunks of up to
+# `batch_size` rows (lists of row tuples with frames=False), so memory holds one chunk at a time.
+# The pooled connection stays borrowed until the generator is exhausted; a generator closed
+# early drops its connection rather than draining the rest of the result.
+def iter_query(query, batch_size=STREAM_BATCH_ROWS, frames=True):
+    conn = connect_db()
+    exhausted = False
+    try:
+        cursor = _session_cursor(conn, buffered=False)
+        cursor.execute(query.sql, query.params or None)
+        if frames:
+            yield from Columnar.iter_frames(cursor, query.dtypes, batch_size)
+        else:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+        exhausted = True
+        cursor.close()
+    finally:
+        if exhausted:
+            conn.close()
+        else:
+            conn.discard()
+
+# The statement of a single-query read helper, to stream it with iter_query
+def _helper_query(name, *args):
+    return next(READ_HELPERS[name].plan(*args))
+
+
+class ReadHelper(NamedTuple):
+    plan: Callable
+    tables: object  # tuple of table names, or a callable of the helper's arguments
+    ttl: float
+    rollups: bool  # needs the score rollup tables
+    snapshot: object  # Helpers/Snapshots dataset serving this helper, or a callable of its arguments
+
+
+# name -> ReadHelper for every plan-based read helper (the async layer is built from this)
+READ_HELPERS = {}
+
+# Decorator turning a query plan into a cached, synchronous read helper of the same name.
+# With SNAPSHOT_DIR set, helpers naming a `snapshot` dataset are served from it instead.
+def read_helper(tables, ttl=QUERY_CACHE_TTL, rollups=False, snapshot=None):
+    def decorator(plan):
+        READ_HELPERS[plan.__name__] = ReadHelper(plan, tables, ttl, rollups, snapshot)
+
+        @instrumented
+        @cached(tables=tables, ttl=ttl)
+        @wraps(plan)
+        def helper(*args, **kwargs):
+            if rollups:
+                ensure_rollups()
+            dataset = snapshot(*args, **kwargs) if callable(snapshot) else snapshot
+            if dataset and SNAPSHOT_DIR:
+                from Helpers import Snapshots
+                return Snapshots.load(dataset)
+            return run_plan(plan(*args, **kwargs))
+
+        return helper
+    return decorator
+
+
+_rollups_ready = False
+_rollups_lock = threading.Lock()
+
+ROLLUPS_MISSING = "The score rollup tables are missing: run `python -m Helpers.Migrations --apply`."
+ROLLUPS_EMPTY = ("The score rollup tables are empty although performance has rows: "
+                 "run `python -m Helpers.Score_rollups` to rebuild them.")
+
+def _check_rollups():
+    try:
+        with db_session() as cursor:
+            return Score_rollups.needs_rebuild(cursor)
+    except mysql.connector.Error as err:
+        raise RuntimeError(ROLLUPS_MISSING) from err
+
+# Check once per process that migration 1 created and backfilled the score rollup tables;
+# neither the read nor the write paths create them
+def ensure_rollups():
+    global _rollups_ready
+    if _rollups_ready:
+        return
+    with _rollups_lock:
+        if _rollups_ready:
+            return
+        if _check_rollups():
+            raise RuntimeError(ROLLUPS_EMPTY)
+        _rollups_ready = True
+
+# Rollup table -> keys out of step with performance, e.g. after writes made outside the app.
+# Scans the whole performance table, so it runs on request (Diagnostics) rather than on reads.
+def get_rollup_drift():
+    ensure_rollups()
+    with db_session() as cursor:
+        return Score_rollups.drifted_keys(cursor)
+
+# Recompute every rollup row from performance, e.g. once get_rollup_drift() reports drift
+@instrumented
+@invalidates("performance", "employee", "project", "department")
+def rebuild_score_rollups():
+    ensure_rollups()
+    with db_session(commit=True) as cursor:
+        Score_rollups.rebuild_rollups(cursor)
+
+
+"""
+Change tracking (Helpers/Change_log.py)
+"""
+
+class ChangeSet(NamedTuple):
+    watermark: int  # pass back as `since` next time
+    upserts: "pd.DataFrame"  # current rows of every key inserted or updated since `since`
+    deleted: list  # keys deleted since `since`
+
+    def __bool__(self):
+        return not self.upserts.empty or bool(self.deleted)
+
+
+_change_log_found = False
+
+# True once migration 3 has created the change log (re-checked until then)
+def change_tracking_enabled():
+    global _change_log_found
+    if not _change_log_found and DB_BACKEND != "duckdb":
+        _change_log_found = run_plan(_change_log_exists_plan())
+    return _change_log_found
+
+def _change_log_exists_plan():
+    if DB_BACKEND == "sqlite":
+        query = "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = %s"
+    else:
+        query = "SELECT COUNT(*) FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+    (found,) = yield Query(query, (Change_log.CHANGE_LOG_TABLE,), one=True)
+    return bool(found)
+
+def _as_datetime(value):
+    # MySQL returns datetimes, SQLite "YYYY-MM-DD HH:MM:SS" strings (both in the same zone as CURRENT_TIMESTAMP)
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+# Advance a watermark over consecutive ChangeIDs. An ID missing from the middle may belong to a
+# transaction that hasn't committed yet, so the watermark stops there until the gap is old enough
+# to be a rollback.
+def _advance_watermark(since, changes, now):
+    watermark = since
+    for change_id, changed_at in changes:
+        if change_id != watermark + 1 and (now - _as_datetime(changed_at)).total_seconds() < CHANGE_LOG_GAP_SECONDS:
+            break
+        watermark = change_id
+    return watermark
+
+# Change-log statements shared by the plans below
+CHANGE_LOG_BOUNDS = Queries.register_query(
+    "change_log_bounds", f"SELECT MIN(ChangeID), MAX(ChangeID), CURRENT_TIMESTAMP FROM {Change_log.CHANGE_LOG_TABLE}"
+)
+CHANGE_LOG_SINCE = Queries.register_query(
+    "change_log_since",
+    f"SELECT ChangeID, ChangedAt FROM {Change_log.CHANGE_LOG_TABLE} WHERE ChangeID > %s ORDER BY ChangeID"
+)
+CHANGE_LOG_ENTRIES = Queries.register_query(
+    "change_log_entries",
+    f"SELECT ChangeID, ChangedAt, TableName, RowKey FROM {Change_log.CHANGE_LOG_TABLE} WHERE ChangeID > %s ORDER BY ChangeID"
+)
+
+def _change_watermark_plan():
+    min_id, max_id, now = yield Query(CHANGE_LOG_BOUNDS, one=True)
+    if max_id is None:
+        return 0
+    # Only the newest entries can still have gaps in front of them
+    recent = yield Query(CHANGE_LOG_SINCE, (max(min_id, max_id - CHANGE_LOG_MAX_KEYS) - 1,))
+    return _advance_watermark(recent[0][0] - 1, recent, _as_datetime(now))
+
+def _changes_plan(table, since):
+    pk, columns = TABLE_SCHEMA[table]
+    min_id, max_id, now = yield Query(CHANGE_LOG_BOUNDS, one=True)
+    if max_id is None:
+        # Empty log: nothing changed, unless it was pruned (or recreated) after `since`
+        return ChangeSet(since, Columnar.rows_to_frame([(col,) for col in columns], []), []) if since == 0 else None
+    if since < min_id - 1 or since > max_id:
+        return None
+
+    # Every table's changes: gaps are judged on the shared ChangeID sequence
+    changes = yield Query(CHANGE_LOG_ENTRIES, (since,))
+    watermark = _advance_watermark(since, [(change_id, changed_at) for change_id, changed_at, _, _ in changes],
+                                   _as_datetime(now))
+    keys = list(dict.fromkeys(key for _, _, name, key in changes if name == table))
+    if len(keys) > CHANGE_LOG_MAX_KEYS:
+        return None
+
+    # Keys still present were inserted or updated; the rest were deleted
+    frames = []
+    for start in range(0, len(keys), BULK_INSERT_CHUNK_SIZE):
+        chunk = keys[start:start + BULK_INSERT_CHUNK_SIZE]
+        frames.append((yield Query(
+            f"SELECT {', '.join(columns)} FROM {table} WHERE {pk} IN ({', '.join(['%s'] * len(chunk))})",
+            tuple(chunk), frame=True
+        )))
+    upserts = (Columnar.append_rows(frames[0], *frames[1:]) if frames
+               else Columnar.rows_to_frame([(col,) for col in columns], []))
+    present = set(upserts[pk].tolist())
+    return ChangeSet(watermark, upserts, [key for key in keys if key not in present])
+
+# Watermark to load a table at, or None without change tracking. Read it *before* loading the
+# table: changes landing in between are then replayed by the next get_changes (they are idempotent).
+@instrumented
+def get_change_watermark():
+    if not change_tracking_enabled():
+        return None
+    return run_plan(_change_watermark_plan())
+
+# Rows of `table` inserted, updated or deleted since the `since` watermark, as a ChangeSet.
+# None means there is no usable history (no change tracking, history pruned, too many changes): reload.
+@instrumented
+def get_changes(table, since):
+    _checked_columns(table, None)
+    if since is None or not change_tracking_enabled():
+        return None
+    return run_plan(_changes_plan(table, int(since)))
+
+# Patch a client-side copy of `table` with a ChangeSet (rows keep the frame's dtypes)
+def apply_changes(frame, table, changes):
+    pk = TABLE_SCHEMA[table][0]
+    changed = set(changes.deleted) | set(changes.upserts[pk].tolist())
+    kept = frame[~frame[pk].isin(changed)]
+    return Columnar.append_rows(kept, changes.upserts[list(frame.columns)]).reset_index(drop=True)
+
+# Keep a client-side copy of `table` current: patch `frame` with the changes since `watermark`,
+# or call `load()` for a fresh copy when there is no usable change history.
+# Returns (frame, watermark, changed).
+def refresh_frame(table, frame, watermark, load):
+    changes = get_changes(table, watermark) if frame is not None else None
+    if changes is None:
+        watermark = get_change_watermark()
+        return load(), watermark, True
+    if not changes:
+        return frame, changes.watermark, False
+    return apply_changes(frame, table, changes), changes.watermark, True
+
+# Keep only the newest `keep_rows` change-log entries
+@instrumented
+def prune_change_log(keep_rows=1_000_000):
+    with db_session(commit=True) as cursor:
+        return Change_log.prune(cursor, keep_rows)
+
 """
 
 # Get Column Names for a Table
@@ -78,86 +746,109 @@ def delete_record(table_name, column, value):
     except mysql.connector.Error as err:
         print(f"Error: {err}")
 """
-# Function to fetch dashboard stats
-def get_dashboard_stats():
-    conn = connect_db()
-    cursor = conn.cursor()
-
-    # Queries for key metrics
-    cursor.execute("SELECT COUNT(*) FROM employee;")
-    total_employees = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(DISTINCT DeptID) FROM employee;")
-    total_departments = cursor.fetchone()[0]
-
-    cursor.execute("SELECT COUNT(*) FROM project WHERE SuccessIndicator = 'In Progress';")
-    active_projects = cursor.fetchone()[0]
-
-    cursor.execute("SELECT AVG((AccuracyScore + EfficiencyScore + QualityScore + TimelineScore) / 4) FROM performance;")
-    average_performance = round(cursor.fetchone()[0], 2)
-
-    conn.close()
-
-    return total_employees, total_departments, active_projects, average_performance
-
-# Function to fetch performance insights
-def get_performance_insights():
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
-
-    # 1️⃣ Top 5 Employees with Best Performance (Average Score)
-    cursor.execute("""
-        SELECT e.EmpID, e.Name, ROUND(AVG((p.AccuracyScore + p.EfficiencyScore + p.QualityScore + p.TimelineScore) / 4), 2) AS AvgScore
-        FROM performance p
-        JOIN employee e ON p.EmpID = e.EmpID
-        GROUP BY e.EmpID, e.Name
-        ORDER BY AvgScore DESC
-        LIMIT 5;
-    """)
-    top_performers = cursor.fetchall()
-
-    # 2️⃣ Employees with Most Projects Assigned
-    cursor.execute("""
-        SELECT e.EmpID, e.Name, COUNT(pr.ProjectID) AS TotalProjects
+# Every Dashboard.py figure, tagged by Section, in a single UNION ALL statement
+DASHBOARD_KPI_QUERY = """
+    SELECT 'total_employees' AS Section, NULL AS ID, NULL AS Label, COUNT(*) AS Value, NULL AS Status
+    FROM employee
+    UNION ALL
+    SELECT 'total_departments', NULL, NULL, COUNT(DISTINCT DeptID), NULL
+    FROM employee
+    UNION ALL
+    SELECT 'active_projects', NULL, NULL, COUNT(*), NULL
+    FROM project
+    WHERE SuccessIndicator = 'In Progress'
+    UNION ALL
+    SELECT 'average_performance', NULL, NULL, AVG((AccuracyScore + EfficiencyScore + QualityScore + TimelineScore) / 4), NULL
+    FROM performance
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'top_performers' AS Section, e.EmpID AS ID, e.Name AS Label,
+               ROUND(r.SumComposite / NULLIF(r.CntComposite, 0), 2) AS Value,
+               NULL AS Status
+        FROM employee_score_rollup r
+        JOIN employee e ON r.EmpID = e.EmpID
+        ORDER BY Value DESC
+        LIMIT 5
+    ) AS top_performers
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'most_projects' AS Section, e.EmpID AS ID, e.Name AS Label, COUNT(pr.ProjectID) AS Value, NULL AS Status
         FROM project pr
         JOIN employee e ON pr.EmployeeID = e.EmpID
         GROUP BY e.EmpID, e.Name
-        ORDER BY TotalProjects DESC
-        LIMIT 5;
-    """)
-    most_projects = cursor.fetchall()
-
-    # 3️⃣ Projects with High Success Rates
-    cursor.execute("""
-        SELECT ProjectID, ProjectInfo, SuccessIndicator
+        ORDER BY Value DESC
+        LIMIT 5
+    ) AS most_projects
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'high_success_projects' AS Section, ProjectID AS ID, ProjectInfo AS Label, NULL AS Value, SuccessIndicator AS Status
         FROM project
         WHERE SuccessIndicator = 'Completed on time'
         ORDER BY ProjectID ASC
-        LIMIT 5;
-    """)
-    high_success_projects = cursor.fetchall()
+        LIMIT 5
+    ) AS high_success_projects;
+"""
+
 
-    conn.close()
+class DashboardKPIs(NamedTuple):
+    total_employees: int
+    total_departments: int
+    active_projects: int
+    average_performance: float
+    top_performers: list
+    most_projects: list
+    high_success_projects: list
+
+
+# Fetch every Dashboard figure in one round trip
+@read_helper(tables=("employee", "project", "performance"), ttl=30, rollups=True)
+def get_dashboard_kpis():
+    rows = yield Query(DASHBOARD_KPI_QUERY)
+
+    scalars = {}
+    sections = {"top_performers": [], "most_projects": [], "high_success_projects": []}
+    for section, row_id, label, value, status in rows:
+        if section in sections:
+            sections[section].append((row_id, label, value, status))
+        else:
+            scalars[section] = value
+
+    # UNION ALL does not promise to keep each branch's ORDER BY, so re-sort here
+    top = sorted(sections["top_performers"], key=lambda r: -1 if r[2] is None else r[2], reverse=True)
+    most = sorted(sections["most_projects"], key=lambda r: r[2], reverse=True)
+    high = sorted(sections["high_success_projects"], key=lambda r: r[0])
+    average = scalars.get("average_performance")
+
+    return DashboardKPIs(
+        total_employees=int(scalars.get("total_employees") or 0),
+        total_departments=int(scalars.get("total_departments") or 0),
+        active_projects=int(scalars.get("active_projects") or 0),
+        average_performance=round(average, 2) if average is not None else 0,
+        top_performers=[{"EmpID": i, "Name": n, "AvgScore": v} for i, n, v, _ in top],
+        most_projects=[{"EmpID": i, "Name": n, "TotalProjects": int(v)} for i, n, v, _ in most],
+        high_success_projects=[{"ProjectID": i, "ProjectInfo": n, "SuccessIndicator": status} for i, n, _, status in high],
+    )
 
-    return top_performers, most_projects, high_success_projects
+# Function to fetch dashboard stats
+@instrumented
+def get_dashboard_stats():
+    kpis = get_dashboard_kpis()
+    return kpis.total_employees, kpis.total_departments, kpis.active_projects, kpis.average_performance
+
+# Function to fetch performance insights
+@instrumented
+def get_performance_insights():
+    kpis = get_dashboard_kpis()
+    return kpis.top_performers, kpis.most_projects, kpis.high_success_projects
 
 """
 Employee.py
 """
-# View All Records from Any Table
-def view_records(table_name):
+# View All Records from Any Table (optionally only some columns)
+@instrumented
+def view_records(table_name, columns=None):
     try:
-        conn = connect_db()
-        cursor = conn.cursor(dictionary=True)
-        
-        # Fetch all records
-        cursor.execute(f"SELECT * FROM {table_name};")
-        records = cursor.fetchall()
-
-        # Convert to Pandas DataFrame
-        df = pd.DataFrame(records)
-
-        conn.close()
+        df = _fetch_all_records(table_name, _checked_columns(table_name, columns))
 
         # Return DataFrame
         return df if not df.empty else pd.DataFrame(columns=["No records found"])
@@ -166,39 +857,170 @@ def view_records(table_name):
         print(f"Error: {err}")
         return pd.DataFrame(columns=["Error"])
 
+# Same rows as view_records, as DataFrame chunks (see iter_query); raises ValueError for unknown tables/columns
+def iter_records(table_name, columns=None, batch_size=STREAM_BATCH_ROWS):
+    return iter_query(_helper_query("_fetch_all_records", table_name, _checked_columns(table_name, columns)), batch_size)
+
+# Tables with a snapshot dataset of the same name (Helpers/Snapshots.py)
+SNAPSHOT_TABLES = ("employee", "project", "performance")
+
+# Cached separately so that error results are never cached
+@read_helper(tables=lambda table_name, columns: (table_name,),
+             snapshot=lambda table_name, columns: table_name if columns is None and table_name in SNAPSHOT_TABLES else None)
+def _fetch_all_records(table_name, columns):
+    select = ", ".join(columns) if columns else "*"
+    # Fetch all records straight into a typed DataFrame
+    return (yield Query(f"SELECT {select} FROM {table_name};", frame=True))
+
+# Validate requested columns against TABLE_SCHEMA (they end up in SQL text)
+def _checked_columns(table_name, columns):
+    if table_name not in TABLE_SCHEMA:
+        raise ValueError(f"Unknown table: {table_name}")
+    if not columns:
+        return None
+    known = TABLE_SCHEMA[table_name][1]
+    unknown = [col for col in columns if col not in known]
+    if unknown:
+        raise ValueError(f"Unknown column(s) for {table_name}: {', '.join(unknown)}")
+    return tuple(columns)
+
+
+class RecordPage(NamedTuple):
+    records: "pd.DataFrame"
+    next_key: Optional[tuple]  # pass as `after` to get the following page; None on the last page
+    total_estimate: int
+
+
+# One page of a table via keyset pagination on (order_by, primary key)
+@instrumented
+def get_records_page(table_name, columns=None, page_size=50, after=None,
+                     order_by=None, descending=False, filters=None):
+    args = records_page_args(table_name, columns, page_size, after, order_by, descending, filters)
+    records, next_key = _fetch_records_page(*args)
+    return RecordPage(records, next_key, estimate_row_count(table_name, args[-1]))
+
+# Validate and normalise get_records_page arguments into _fetch_records_page's (hashable) ones
+def records_page_args(table_name, columns=None, page_size=50, after=None,
+                      order_by=None, descending=False, filters=None):
+    columns = _checked_columns(table_name, columns) or tuple(TABLE_SCHEMA[table_name][1])
+    order_by = order_by or TABLE_SCHEMA[table_name][0]
+    _checked_columns(table_name, [order_by, *(filters or {})])
+
+    # Filters become a hashable, order-independent cache key
+    filter_items = tuple(sorted(
+        (col, tuple(value) if isinstance(value, (list, tuple, set)) else value)
+        for col, value in (filters or {}).items()
+    ))
+    return (table_name, columns, int(page_size), tuple(after) if after else None,
+            order_by, bool(descending), filter_items)
+
+@read_helper(tables=lambda table_name, *args: (table_name,))
+def _fetch_records_page(table_name, columns, page_size, after, order_by, descending, filter_items):
+    pk = TABLE_SCHEMA[table_name][0]
+    select = list(dict.fromkeys([*columns, order_by, pk]))
+    where, params = _filter_clause(filter_items)
+
+    if after is not None:
+        # MySQL sorts NULLs first ascending and last descending; the predicate mirrors that
+        last_value, last_pk = after
+        cmp = "<" if descending else ">"
+        if order_by == pk:
+            where.append(f"{pk} {cmp} %s")
+            params.append(last_pk)
+        elif last_value is None:
+            where.append(f"(({order_by} IS NULL AND {pk} {cmp} %s)" + ("" if descending else f" OR {order_by} IS NOT NULL") + ")")
+            params.append(last_pk)
+        else:
+            where.append(
+                f"({order_by} {cmp} %s OR ({order_by} = %s AND {pk} {cmp} %s)"
+                + (f" OR {order_by} IS NULL" if descending else "") + ")"
+            )
+            params.extend([last_value, last_value, last_pk])
+
+    direction = "DESC" if descending else "ASC"
+    query = f"SELECT {', '.join(select)} FROM {table_name}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    query += f" ORDER BY {order_by} {direction}" + (f", {pk} {direction}" if order_by != pk else "")
+    query += " LIMIT %s"
+    # One extra row tells us whether another page exists
+    params.append(page_size + 1)
+
+    # The sort key goes back into SQL as `after`, so it must survive the round trip exactly
+    dtypes = {order_by: "float64"} if Columnar.column_dtype(order_by) == "float32" else None
+    df = yield Query(query, tuple(params), frame=True, dtypes=dtypes)
+
+    next_key = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        next_key = (Columnar.python_value(df[order_by].iloc[-1]), Columnar.python_value(df[pk].iloc[-1]))
+    return df[list(columns)], next_key
+
+# Build "col = %s" / "col IN (...)" predicates from normalised filter items
+def _filter_clause(filter_items):
+    where, params = [], []
+    for col, value in filter_items:
+        if isinstance(value, tuple):
+            where.append(f"{col} IN ({', '.join(['%s'] * len(value))})")
+            params.extend(value)
+        else:
+            where.append(f"{col} = %s")
+            params.append(value)
+    return where, params
+
+# Row count for pagination: InnoDB's statistics when unfiltered (MySQL only), COUNT(*) otherwise
+@read_helper(tables=lambda table_name, filter_items=(): (table_name,), ttl=300)
+def estimate_row_count(table_name, filter_items=()):
+    _checked_columns(table_name, [col for col, _ in filter_items])
+    if not filter_items and DB_BACKEND == "mysql":
+        row = yield Query(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            (table_name,), one=True
+        )
+        if row and row[0] is not None:
+            return int(row[0])
+    where, params = _filter_clause(filter_items)
+    query = f"SELECT COUNT(*) FROM {table_name}"
+    if where:
+        query += " WHERE " + " AND ".join(where)
+    row = yield Query(query, tuple(params), one=True)
+    return int(row[0])
+
+# Employee columns in upload / upsert order (key first)
+EMPLOYEE_COLUMNS = TABLE_SCHEMA["employee"][1]
+
+# Upsert a chunk of employee rows (EMPLOYEE_COLUMNS order) in one statement
+def _upsert_employees(cursor, chunk):
+    # A department move changes two department rollups
+    old_depts = Score_rollups.departments_of(cursor, [row[0] for row in chunk])
+    cursor.execute(_insert_sql("employee", EMPLOYEE_COLUMNS, len(chunk), EMPLOYEE_COLUMNS[1:]),
+                   [value for row in chunk for value in row])
+    dept_index = EMPLOYEE_COLUMNS.index("DeptID")
+    Score_rollups.refresh_departments(cursor, old_depts + [row[dept_index] for row in chunk])
+
+# Delete a chunk of employees in one statement
+def _delete_employees(cursor, emp_ids):
+    old_depts = Score_rollups.departments_of(cursor, emp_ids)
+    cursor.execute(_delete_sql("employee", "EmpID", len(emp_ids)), emp_ids)
+    Score_rollups.refresh_employees(cursor, emp_ids)
+    Score_rollups.refresh_departments(cursor, old_depts)
+
+# Apply a staged employee upload: one INSERT ... SELECT, then the departments it touched
+def _merge_employees(cursor, staging):
+    cursor.execute(f"SELECT DISTINCT e.DeptID FROM employee e JOIN {staging} s ON e.EmpID = s.EmpID")
+    old_depts = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"SELECT DISTINCT DeptID FROM {staging}")
+    new_depts = [row[0] for row in cursor.fetchall()]
+    cursor.execute(_merge_sql("employee", EMPLOYEE_COLUMNS, staging))
+    Score_rollups.refresh_departments(cursor, old_depts + new_depts)
+
+@instrumented
+@invalidates("employee")
 def create_or_update_employee(emp_data):
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-
-        query = """
-        INSERT INTO employee (EmpID, DeptID, AttendanceID, EmailID, DOB, Address, WorkEx, Salary, Name)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-            DeptID=VALUES(DeptID),
-            AttendanceID=VALUES(AttendanceID),
-            EmailID=VALUES(EmailID),
-            DOB=VALUES(DOB),
-            Address=VALUES(Address),
-            WorkEx=VALUES(WorkEx),
-            Salary=VALUES(Salary),
-            Name=VALUES(Name);
-        """
-
-        cursor.execute(query, (
-            emp_data['EmpID'],
-            emp_data['DeptID'],
-            emp_data['AttendanceID'],
-            emp_data['EmailID'],
-            emp_data['DOB'],
-            emp_data['Address'],
-            emp_data['WorkEx'],
-            emp_data['Salary'],
-            emp_data['Name']
-        ))
-
-        conn.commit()
-        conn.close()
+        ensure_rollups()
+        with db_session(commit=True) as cursor:
+            _upsert_employees(cursor, [tuple(emp_data[col] for col in EMPLOYEE_COLUMNS)])
         return True
     except mysql.connector.Error as err:
         print(f"Error: {err}")
@@ -207,65 +1029,146 @@ def create_or_update_employee(emp_data):
 
 # Delete Employee Record
 
+@instrumented
+@invalidates("employee")
 def delete_employee(emp_id):
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-
-        cursor.execute("DELETE FROM employee WHERE EmpID = %s", (emp_id,))
-        conn.commit()
-        conn.close()
+        ensure_rollups()
+        with db_session(commit=True) as cursor:
+            _delete_employees(cursor, [emp_id])
         return True
     except mysql.connector.Error as err:
         print(f"Error: {err}")
         return False
 
 
+# Bulk Employee Upsert: chunked multi-row INSERT ... ON DUPLICATE KEY UPDATE; every chunk commits on its own
+@instrumented
+@invalidates("employee")
+def bulk_upsert_employees(df, chunk_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    try:
+        rows = _last_per_key(_frame_rows(df, EMPLOYEE_COLUMNS))
+    except KeyError as e:
+        error_log.error("Bulk upsert error: missing column %s", e)
+        return BulkInsertResult(False, 0, 0, len(df))
+
+    ensure_rollups()
+    return _write_chunked(rows, _upsert_employees, chunk_size, progress, action="Bulk upsert")
+
+# Bulk Employee Delete: DELETE ... WHERE EmpID IN (...) per chunk of IDs
+@instrumented
+@invalidates("employee")
+def bulk_delete_employees(emp_ids, chunk_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    ensure_rollups()
+    return _write_chunked(list(dict.fromkeys(emp_ids)), _delete_employees, chunk_size, progress,
+                          action="Bulk delete")
+
+# Staged Employee Merge: all-or-nothing; `frames` is a DataFrame or an iterable of them (e.g. CSV chunks)
+@instrumented
+@invalidates("employee")
+def merge_employees(frames, chunk_size=BULK_INSERT_CHUNK_SIZE):
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    ensure_rollups()
+    batches = (_frame_rows(df, EMPLOYEE_COLUMNS) for df in frames)
+    return _merge_via_staging("employee", EMPLOYEE_COLUMNS, batches, _merge_employees, chunk_size)
+
+
+# Pre-binned distribution of a numeric column, computed in SQL
+# method="fixed": `bins` equal-width bins between MIN and MAX
+# method="quantile": `bins` equal-count bins (NTILE)
+@read_helper(tables=lambda table_name, *args, **kwargs: (table_name,))
+def get_histogram(table_name, column, bins=10, method="fixed"):
+    _checked_columns(table_name, [column])
+    bins = int(bins)
+    if bins < 1:
+        raise ValueError("bins must be at least 1")
+
+    if method == "fixed":
+        query = f"""
+            SELECT COALESCE(LEAST(FLOOR((t.{column} - s.lo) / s.width), %s), 0) AS Bin,
+                   MIN(s.lo) AS Lo, MIN(s.width) AS Width, COUNT(*) AS Count
+            FROM {table_name} t
+            CROSS JOIN (
+                SELECT MIN({column}) AS lo, NULLIF(MAX({column}) - MIN({column}), 0) / %s AS width
+                FROM {table_name}
+            ) s
+            WHERE t.{column} IS NOT NULL
+            GROUP BY Bin
+            ORDER BY Bin
+        """
+        rows = yield Query(query, (bins - 1, bins))
+        data = []
+        for bin_no, lo, width, count in rows:
+            lo, width = float(lo), float(width or 0)
+            data.append((lo + bin_no * width, lo + (bin_no + 1) * width, int(count)))
+    elif method == "quantile":
+        query = f"""
+            SELECT Bin, MIN(v) AS BinStart, MAX(v) AS BinEnd, COUNT(*) AS Count
+            FROM (
+                SELECT {column} AS v, NTILE(%s) OVER (ORDER BY {column}) AS Bin
+                FROM {table_name}
+                WHERE {column} IS NOT NULL
+            ) q
+            GROUP BY Bin
+            ORDER BY Bin
+        """
+        rows = yield Query(query, (bins,))
+        data = [(float(lo), float(hi), int(count)) for _, lo, hi, count in rows]
+    else:
+        raise ValueError(f"Unknown binning method: {method}")
+
+    df = pd.DataFrame(data, columns=["BinStart", "BinEnd", "Count"])
+    df["Label"] = [f"{lo:,.0f}–{hi:,.0f}" for lo, hi in zip(df["BinStart"], df["BinEnd"])]
+    return df
+
+# Headcount per department, counted in SQL
+@read_helper(tables=("employee",))
+def get_department_distribution():
+    return (yield Query("SELECT DeptID, COUNT(*) AS Count FROM employee GROUP BY DeptID ORDER BY DeptID",
+                        frame=True))
+
 # Get All Employee IDs for Dropdown
 
+@instrumented
 def get_employee_ids():
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-        cursor.execute("SELECT EmpID FROM employee")
-        ids = [row[0] for row in cursor.fetchall()]
-        conn.close()
-        return ids
+        return _fetch_employee_ids()
     except:
         return []
 
+@read_helper(tables=("employee",), ttl=300)
+def _fetch_employee_ids():
+    rows = yield Query("SELECT EmpID FROM employee")
+    return [row[0] for row in rows]
+
 """
 Performance.py
 """
+@read_helper(tables=("performance", "employee"), snapshot="performance_view")
 def get_all_performance_records():
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute("""
+    return (yield Query("""
         SELECT e.EmpID, e.Name, p.ProjectID, 
                p.EfficiencyScore, p.TimelineScore, 
                p.QualityScore, p.AccuracyScore
         FROM performance p
         JOIN employee e ON p.EmpID = e.EmpID;
-    """)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+    """, frame=True))
 
-def get_performance_averages():
-    conn = connect_db()
-    cursor = conn.cursor()
+# Same rows as get_all_performance_records, as DataFrame chunks straight from the database (see iter_query)
+def iter_all_performance_records(batch_size=STREAM_BATCH_ROWS):
+    return iter_query(_helper_query("get_all_performance_records"), batch_size)
 
-    cursor.execute("""
+@read_helper(tables=("performance",))
+def get_performance_averages():
+    averages = yield Query("""
         SELECT 
             ROUND(AVG(EfficiencyScore), 2),
             ROUND(AVG(TimelineScore), 2),
             ROUND(AVG(QualityScore), 2),
             ROUND(AVG(AccuracyScore), 2)
         FROM performance;
-    """)
-    averages = cursor.fetchone()
-    conn.close()
+    """, one=True)
 
     return {
         "Efficiency": averages[0],
@@ -274,96 +1177,210 @@ def get_performance_averages():
         "Accuracy": averages[3],
     }
 
+# Percentile bands of the employee ranking (NTILE); band 1 holds the best scores
+SCORE_BANDS = 10
+
+RANKING_COLUMNS = ["EmpID", "Name", "AvgScore"]
+
+# Every scored employee, ranked once: composite score, RANK() and percentile band.
+# Top-N, bottom-N, band and threshold helpers all slice this one cached result.
+@read_helper(tables=("performance", "employee"), rollups=True)
+def get_employee_rankings():
+    return (yield Query("""
+        SELECT e.EmpID, e.Name, s.AvgScore,
+               RANK() OVER (ORDER BY s.AvgScore DESC) AS ScoreRank,
+               NTILE(%s) OVER (ORDER BY s.AvgScore DESC, e.EmpID) AS ScoreBand
+        FROM (
+            SELECT EmpID, ROUND(SumComposite / CntComposite, 2) AS AvgScore
+            FROM employee_score_rollup
+            WHERE CntComposite > 0
+        ) s
+        JOIN employee e ON s.EmpID = e.EmpID
+        ORDER BY ScoreRank, e.EmpID
+    """, (SCORE_BANDS,), frame=True))
+
+# Slices of a ranking frame (shared with the async helpers)
+def top_ranked(rankings, limit):
+    return rankings.loc[rankings.index[:int(limit)], RANKING_COLUMNS].reset_index(drop=True)
+
+def bottom_ranked(rankings, limit):
+    return rankings.loc[rankings.index[::-1][:int(limit)], RANKING_COLUMNS].reset_index(drop=True)
+
+# Scores below `threshold`, lowest first (compared at the 2 decimals they were rounded to)
+def ranked_below(rankings, threshold):
+    below = rankings["AvgScore"].astype("float64").round(2) < threshold
+    return bottom_ranked(rankings[below], len(rankings))
+
+def ranked_in_band(rankings, band):
+    return rankings.loc[rankings["ScoreBand"] == int(band), RANKING_COLUMNS].reset_index(drop=True)
+
+@instrumented
 def get_top_performers(limit=5):
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
+    return top_ranked(get_employee_rankings(), limit)
 
-    cursor.execute(f"""
-        SELECT e.EmpID, e.Name, 
-               ROUND(AVG((p.EfficiencyScore + p.TimelineScore + p.QualityScore + p.AccuracyScore)/4), 2) AS AvgScore
-        FROM performance p
-        JOIN employee e ON p.EmpID = e.EmpID
-        GROUP BY e.EmpID, e.Name
-        ORDER BY AvgScore DESC
-        LIMIT {limit};
-    """)
-    results = cursor.fetchall()
-    conn.close()
-    return results
+@instrumented
+def get_bottom_performers(limit=5):
+    return bottom_ranked(get_employee_rankings(), limit)
 
+@instrumented
 def get_underperformers(threshold=60):
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
-
-    cursor.execute(f"""
-        SELECT e.EmpID, e.Name, 
-               ROUND(AVG((p.EfficiencyScore + p.TimelineScore + p.QualityScore + p.AccuracyScore)/4), 2) AS AvgScore
-        FROM performance p
-        JOIN employee e ON p.EmpID = e.EmpID
-        GROUP BY e.EmpID, e.Name
-        HAVING AvgScore < {threshold}
-        ORDER BY AvgScore ASC;
-    """)
-    results = cursor.fetchall()
-    conn.close()
-    return results
-
-def bulk_insert_performance(df):
+    return ranked_below(get_employee_rankings(), threshold)
+
+# Employees in one percentile band (1 = top 1/SCORE_BANDS)
+@instrumented
+def get_performance_band(band):
+    return ranked_in_band(get_employee_rankings(), band)
+
+PERFORMANCE_UPLOAD_COLUMNS = ["EmpID", "ProjectID", "AccuracyScore", "EfficiencyScore", "QualityScore", "TimelineScore"]
+
+
+class BulkInsertResult(NamedTuple):
+    ok: bool
+    rows: int
+    chunks: int
+    total_rows: int
+
+    # Truthy only on success, so `if bulk_insert_performance(df):` keeps working
+    def __bool__(self):
+        return self.ok
+
+
+# Pull upload columns by name as Python scalars (NaN -> None), without per-row Series
+def _frame_rows(df, columns):
+    arrays = []
+    for col in columns:
+        series = df[col]
+        arrays.append(series.astype(object).where(series.notna(), None).tolist())
+    return list(zip(*arrays))
+
+# Multi-row INSERT of `rows` rows; with update_columns, an upsert on the table's primary key
+def _insert_sql(table, columns, rows, update_columns=()):
+    row_placeholder = "(" + ", ".join(["%s"] * len(columns)) + ")"
+    query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ", ".join([row_placeholder] * rows)
+    if update_columns:
+        query += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{col}=VALUES({col})" for col in update_columns)
+    return query
+
+def _delete_sql(table, key, rows):
+    return f"DELETE FROM {table} WHERE {key} IN ({', '.join(['%s'] * rows)})"
+
+# Drop repeated keys (first column), keeping each key's last row so that later rows win
+def _last_per_key(rows):
+    return list({row[0]: row for row in rows}.values())
+
+# Call write(cursor, chunk) for each chunk of `rows`; every chunk is its own transaction
+def _write_chunked(rows, write, chunk_size=BULK_INSERT_CHUNK_SIZE, progress=None, action="Bulk insert"):
+    total = len(rows)
+    done = chunks = 0
     try:
-        conn = connect_db()
-        cursor = conn.cursor()
-
-        for _, row in df.iterrows():
-            cursor.execute("""
-                INSERT INTO performance (EmpID, ProjectID, AccuracyScore, EfficiencyScore, QualityScore, TimelineScore)
-                VALUES (%s, %s, %s, %s, %s, %s)
-                ON DUPLICATE KEY UPDATE
-                    AccuracyScore=VALUES(AccuracyScore),
-                    EfficiencyScore=VALUES(EfficiencyScore),
-                    QualityScore=VALUES(QualityScore),
-                    TimelineScore=VALUES(TimelineScore);
-            """, tuple(row))
-
-        conn.commit()
-        conn.close()
-        return True
+        with connect_db() as conn:
+            cursor = _session_cursor(conn)
+            for start in range(0, total, chunk_size):
+                chunk = rows[start:start + chunk_size]
+                write(cursor, chunk)
+                conn.commit()
+                done += len(chunk)
+                chunks += 1
+                if progress:
+                    progress(done, total)
+            cursor.close()
     except Exception as e:
-        print(f"Bulk insert error: {e}")
-        return False
+        error_log.error("%s error after %d of %d rows: %s", action, done, total, e)
+        return BulkInsertResult(False, done, chunks, total)
+    return BulkInsertResult(True, done, chunks, total)
+
+# Chunked multi-row INSERT; every chunk is its own transaction
+def _bulk_insert_rows(table, columns, rows, update_columns=(), chunk_size=BULK_INSERT_CHUNK_SIZE,
+                      progress=None, after_chunk=None):
+    def write(cursor, chunk):
+        cursor.execute(_insert_sql(table, columns, len(chunk), update_columns),
+                       [value for row in chunk for value in row])
+        if after_chunk:
+            # Runs inside the chunk's transaction
+            after_chunk(cursor, chunk)
+
+    return _write_chunked(rows, write, chunk_size, progress)
+
+# Load batches of rows (key first) into a temporary copy of `table`, then hand it to
+# merge(cursor, staging) and commit: the whole upload is applied in one transaction or not at all
+def _merge_via_staging(table, columns, batches, merge, chunk_size=BULK_INSERT_CHUNK_SIZE):
+    key = columns[0]
+    staging = f"{table}_staging"
+    rows = chunks = 0
+    try:
+        with connect_db() as conn:
+            cursor = _session_cursor(conn)
+            cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+            cursor.execute(f"CREATE TEMPORARY TABLE {staging} AS SELECT {', '.join(columns)} FROM {table} WHERE 1 = 0")
+            cursor.execute(f"CREATE INDEX {staging}_key ON {staging} ({key})")
+            try:
+                for batch in batches:
+                    for start in range(0, len(batch), chunk_size):
+                        chunk = _last_per_key(batch[start:start + chunk_size])
+                        keys = [row[0] for row in chunk]
+                        # A key staged by an earlier chunk is replaced, so the last row of the upload wins
+                        cursor.execute(_delete_sql(staging, key, len(keys)), keys)
+                        cursor.execute(_insert_sql(staging, columns, len(chunk)), [value for row in chunk for value in row])
+                        chunks += 1
+                    rows += len(batch)
+                merge(cursor, staging)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {staging}")
+                cursor.close()
+    except Exception as e:
+        error_log.error("Staged merge into %s failed after staging %d rows; nothing was applied: %s", table, rows, e)
+        return BulkInsertResult(False, 0, chunks, rows)
+    return BulkInsertResult(True, rows, chunks, rows)
+
+# INSERT ... SELECT from a staging table, updating the rows whose key already exists
+def _merge_sql(table, columns, staging):
+    return (f"INSERT INTO {table} ({', '.join(columns)}) SELECT {', '.join(columns)} FROM {staging} WHERE 1 = 1"
+            " ON DUPLICATE KEY UPDATE " + ", ".join(f"{col}=VALUES({col})" for col in columns[1:]))
+
+@instrumented
+@invalidates("performance")
+def bulk_insert_performance(df, chunk_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    try:
+        rows = _frame_rows(df, PERFORMANCE_UPLOAD_COLUMNS)
+    except KeyError as e:
+        error_log.error("Bulk insert error: missing column %s", e)
+        return BulkInsertResult(False, 0, 0, len(df))
+
+    ensure_rollups()
+    return _bulk_insert_rows(
+        "performance", PERFORMANCE_UPLOAD_COLUMNS, rows,
+        update_columns=PERFORMANCE_UPLOAD_COLUMNS[2:],
+        chunk_size=chunk_size, progress=progress, after_chunk=_refresh_performance_rollups
+    )
 
-def get_analytics():
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
+# Keep score rollups in step with a chunk of (EmpID, ProjectID, ...) rows
+def _refresh_performance_rollups(cursor, chunk):
+    Score_rollups.refresh_for_performance_rows(cursor, [row[0] for row in chunk], [row[1] for row in chunk])
 
-    cursor.execute("""
-        SELECT e.EmpID, e.Name, 
-               ROUND(AVG((AccuracyScore + EfficiencyScore + QualityScore + TimelineScore)/4), 2) AS AvgScore
-        FROM performance p
-        JOIN employee e ON p.EmpID = e.EmpID
-        GROUP BY e.EmpID, e.Name
-        ORDER BY AvgScore DESC
-        LIMIT 3;
-    """)
-    top_employees = cursor.fetchall()
+# Top and bottom three employees
+@instrumented
+def get_analytics():
+    rankings = get_employee_rankings()
+    return top_ranked(rankings, 3), bottom_ranked(rankings, 3)
 
-    cursor.execute("""
-        SELECT e.EmpID, e.Name, 
-               ROUND(AVG((AccuracyScore + EfficiencyScore + QualityScore + TimelineScore)/4), 2) AS AvgScore
+# Every performance record with its employee's department: the rows of the performance cube
+@read_helper(tables=("performance", "employee"))
+def _performance_cube_rows():
+    query = """
+        SELECT e.EmpID, e.Name, e.DeptID, p.ProjectID,
+               ROUND((p.AccuracyScore + p.EfficiencyScore + p.QualityScore + p.TimelineScore)/4, 2) AS AvgScore
         FROM performance p
         JOIN employee e ON p.EmpID = e.EmpID
-        GROUP BY e.EmpID, e.Name
-        ORDER BY AvgScore ASC
-        LIMIT 3;
-    """)
-    low_employees = cursor.fetchall()
-
-    conn.close()
-    return top_employees, low_employees
-
-def filter_performance(dept_id=None, project_id=None):
-    conn = connect_db()
-    cursor = conn.cursor(dictionary=True)
+    """
+    return (yield Query(query, frame=True))
 
+# Same records filtered in SQL (the async layer, and PERFORMANCE_CUBE=0)
+@read_helper(tables=("performance", "employee"))
+def _filter_performance_rows(dept_id=None, project_id=None):
     query = """
         SELECT e.EmpID, e.Name, e.DeptID, p.ProjectID, 
                ROUND((p.AccuracyScore + p.EfficiencyScore + p.QualityScore + p.TimelineScore)/4, 2) AS AvgScore
@@ -381,73 +1398,109 @@ def filter_performance(dept_id=None, project_id=None):
         query += " AND p.ProjectID = %s"
         params.append(project_id)
 
-    cursor.execute(query, tuple(params))
-    data = cursor.fetchall()
-    conn.close()
-    return data
+    return (yield Query(query, tuple(params), frame=True))
+
+# Performance records of a department and/or project, answered from the in-memory
+# performance cube (Helpers/Performance_cube.py) without a database round trip
+@instrumented
+def filter_performance(dept_id=None, project_id=None):
+    from Helpers import Performance_cube
+    if not Performance_cube.PERFORMANCE_CUBE:
+        return _filter_performance_rows(dept_id, project_id)
+    return Performance_cube.get_cube().filter(dept_id=dept_id, project_id=project_id)
 
 
 """
 Department.py
 """
 
+@read_helper(tables=("department",))
 def get_all_departments():
-    connection = connect_db()
-    cursor = connection.cursor()
-    cursor.execute("SELECT * FROM department")
-    data = cursor.fetchall()
-    columns = [col[0] for col in cursor.description]
-    connection.close()
-    return [dict(zip(columns, row)) for row in data]
+    return (yield Query("SELECT * FROM department", frame=True))
 
+def iter_all_departments(batch_size=STREAM_BATCH_ROWS):
+    return iter_query(_helper_query("get_all_departments"), batch_size)
+
+@read_helper(tables=("department",), ttl=300)
 def get_department_names():
-    connection = connect_db()
-    cursor = connection.cursor()
-    cursor.execute("SELECT DISTINCT Name FROM department")
-    names = [row[0] for row in cursor.fetchall()]
-    connection.close()
-    return names
+    rows = yield Query("SELECT DISTINCT Name FROM department")
+    return [row[0] for row in rows]
 
+@read_helper(tables=("department", "employee"))
 def get_department_employee_count():
-    connection = connect_db()
-    cursor = connection.cursor()
-    cursor.execute("SELECT d.Name, COUNT(e.EmpID) AS Count FROM department d LEFT JOIN employee e ON d.DeptID = e.DeptID GROUP BY d.Name")
-    data = cursor.fetchall()
-    connection.close()
-    return data
+    return (yield Query("SELECT d.Name, COUNT(e.EmpID) AS Count FROM department d LEFT JOIN employee e ON d.DeptID = e.DeptID GROUP BY d.Name", frame=True))
 
+@read_helper(tables=("department", "employee"))
 def get_budget_distribution():
-    connection = connect_db()
-    cursor = connection.cursor()
-    cursor.execute("""
+    return (yield Query("""
         SELECT d.Name, SUM(e.Salary) AS Budget
         FROM department d
         JOIN employee e ON d.DeptID = e.DeptID
         GROUP BY d.Name
-    """)
-    return cursor.fetchall()
+    """, frame=True))
+
+# Average composite score per department, read from the department rollup
+@read_helper(tables=("performance", "employee", "department"), rollups=True)
+def get_department_scores():
+    return (yield Query("""
+        SELECT d.Name, ROUND(r.SumComposite / NULLIF(r.CntComposite, 0), 2) AS AvgScore
+        FROM department_score_rollup r
+        JOIN department d ON r.DeptID = d.DeptID
+        ORDER BY AvgScore DESC
+    """, frame=True))
+
+
+# Department columns in upload / upsert order (key first)
+DEPARTMENT_COLUMNS = TABLE_SCHEMA["department"][1]
+
+def _upsert_departments(cursor, chunk):
+    cursor.execute(_insert_sql("department", DEPARTMENT_COLUMNS, len(chunk), DEPARTMENT_COLUMNS[1:]),
+                   [value for row in chunk for value in row])
+
+def _delete_departments(cursor, dept_ids):
+    cursor.execute(_delete_sql("department", "DeptID", len(dept_ids)), dept_ids)
+    Score_rollups.refresh_departments(cursor, dept_ids)
 
+def _merge_departments(cursor, staging):
+    cursor.execute(_merge_sql("department", DEPARTMENT_COLUMNS, staging))
 
+@instrumented
+@invalidates("department")
 def add_or_update_department(dept_data):
-    connection = connect_db()
-    cursor = connection.cursor()
-    cursor.execute("""
-        INSERT INTO department (DeptID, Name, Budget, Head)
-        VALUES (%s, %s, %s, %s)
-        ON DUPLICATE KEY UPDATE
-        Name = VALUES(Name),
-        Budget = VALUES(Budget),
-        Head = VALUES(Head)
-    """, (dept_data['DeptID'], dept_data['Name'], dept_data['Budget'], dept_data['Head']))
-    connection.commit()
-    connection.close()
+    with db_session(commit=True) as cursor:
+        _upsert_departments(cursor, [tuple(dept_data[col] for col in DEPARTMENT_COLUMNS)])
 
+@instrumented
+@invalidates("department")
 def delete_department(dept_id):
-    connection = connect_db()
-    cursor = connection.cursor()
-    cursor.execute("DELETE FROM department WHERE DeptID = %s", (dept_id,))
-    connection.commit()
-    connection.close()
+    with db_session(commit=True) as cursor:
+        _delete_departments(cursor, [dept_id])
+
+# Bulk Department Upsert / Delete / Staged Merge (same contracts as the employee ones)
+@instrumented
+@invalidates("department")
+def bulk_upsert_departments(df, chunk_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    try:
+        rows = _last_per_key(_frame_rows(df, DEPARTMENT_COLUMNS))
+    except KeyError as e:
+        error_log.error("Bulk upsert error: missing column %s", e)
+        return BulkInsertResult(False, 0, 0, len(df))
+    return _write_chunked(rows, _upsert_departments, chunk_size, progress, action="Bulk upsert")
+
+@instrumented
+@invalidates("department")
+def bulk_delete_departments(dept_ids, chunk_size=BULK_INSERT_CHUNK_SIZE, progress=None):
+    ensure_rollups()
+    return _write_chunked(list(dict.fromkeys(dept_ids)), _delete_departments, chunk_size, progress,
+                          action="Bulk delete")
+
+@instrumented
+@invalidates("department")
+def merge_departments(frames, chunk_size=BULK_INSERT_CHUNK_SIZE):
+    if isinstance(frames, pd.DataFrame):
+        frames = [frames]
+    batches = (_frame_rows(df, DEPARTMENT_COLUMNS) for df in frames)
+    return _merge_via_staging("department", DEPARTMENT_COLUMNS, batches, _merge_departments, chunk_size)
 
 
 """
@@ -455,79 +1508,86 @@ Projects.py
 """
 
 
+@read_helper(tables=("project",), snapshot="project")
 def get_all_projects():
-    connection = connect_db()
-    cursor = connection.cursor()
     query = "SELECT * FROM project"
-    cursor.execute(query)
-    return cursor.fetchall()
+    return (yield Query(query, frame=True))
+
+def iter_all_projects(batch_size=STREAM_BATCH_ROWS):
+    return iter_query(_helper_query("get_all_projects"), batch_size)
 
+@read_helper(tables=("performance", "project"), rollups=True)
 def get_project_performance():
-    connection = connect_db()
-    cursor = connection.cursor()
     query = """
-        SELECT p.ProjectID, pr.ProjectInfo,
-               ROUND(AVG(EfficiencyScore), 2) AS AvgEfficiency,
-               ROUND(AVG(TimelineScore), 2) AS AvgTimeline,
-               ROUND(AVG(QualityScore), 2) AS AvgQuality,
-               ROUND(AVG(AccuracyScore), 2) AS AvgAccuracy
-        FROM performance p
-        JOIN project pr ON p.ProjectID = pr.ProjectID
-        GROUP BY p.ProjectID, pr.ProjectInfo
+        SELECT r.ProjectID, pr.ProjectInfo,
+               ROUND(r.SumEfficiency / NULLIF(r.CntEfficiency, 0), 2) AS AvgEfficiency,
+               ROUND(r.SumTimeline / NULLIF(r.CntTimeline, 0), 2) AS AvgTimeline,
+               ROUND(r.SumQuality / NULLIF(r.CntQuality, 0), 2) AS AvgQuality,
+               ROUND(r.SumAccuracy / NULLIF(r.CntAccuracy, 0), 2) AS AvgAccuracy
+        FROM project_score_rollup r
+        JOIN project pr ON r.ProjectID = pr.ProjectID
     """
-    cursor.execute(query)
-    return cursor.fetchall()
+    return (yield Query(query, frame=True))
+
+# Average score of the `limit` - 1 best projects, then one row (ProjectID NULL) averaging
+# all the others, so the chart gets at most `limit` rows however many projects there are
+@read_helper(tables=("performance", "project"), rollups=True)
+def get_project_score_chart(limit=20):
+    query = """
+        SELECT ChartID AS ProjectID,
+               MIN(ProjectInfo) AS ProjectInfo,
+               ROUND(SUM(SumComposite) / SUM(CntComposite), 2) AS AvgScore,
+               COUNT(*) AS Projects
+        FROM (
+            SELECT pr.ProjectInfo, r.SumComposite, r.CntComposite,
+                   ROW_NUMBER() OVER w AS Position,
+                   CASE WHEN ROW_NUMBER() OVER w < %s OR COUNT(*) OVER () <= %s THEN r.ProjectID END AS ChartID
+            FROM project_score_rollup r
+            JOIN project pr ON r.ProjectID = pr.ProjectID
+            WHERE r.CntComposite > 0
+            WINDOW w AS (ORDER BY r.SumComposite / r.CntComposite DESC, r.ProjectID)
+        ) ranked
+        GROUP BY ChartID
+        ORDER BY MIN(Position)
+    """
+    return (yield Query(query, (limit, limit), frame=True))
 
 
+@read_helper(tables=("performance", "project"), rollups=True)
 def get_top_projects(threshold=85):
-    connection = connect_db()
-    cursor = connection.cursor()
     query = """
         SELECT pr.ProjectID, pr.ProjectInfo,
-               ROUND(AVG((EfficiencyScore + TimelineScore + QualityScore + AccuracyScore)/4), 2) AS AvgScore
-        FROM performance p
-        JOIN project pr ON p.ProjectID = pr.ProjectID
-        GROUP BY pr.ProjectID, pr.ProjectInfo
-        HAVING AvgScore >= %s
+               ROUND(r.SumComposite / NULLIF(r.CntComposite, 0), 2) AS AvgScore
+        FROM project_score_rollup r
+        JOIN project pr ON r.ProjectID = pr.ProjectID
+        WHERE ROUND(r.SumComposite / NULLIF(r.CntComposite, 0), 2) >= %s
         ORDER BY AvgScore DESC
     """
-    cursor.execute(query, (threshold,))
-    return cursor.fetchall()
+    return (yield Query(query, (threshold,), frame=True))
 
+@read_helper(tables=("performance", "project"), rollups=True)
 def get_underperforming_projects(threshold=70):
-    connection = connect_db()
-    cursor = connection.cursor()
     query = """
         SELECT pr.ProjectID, pr.ProjectInfo,
-               ROUND(AVG((EfficiencyScore + TimelineScore + QualityScore + AccuracyScore)/4), 2) AS AvgScore
-        FROM performance p
-        JOIN project pr ON p.ProjectID = pr.ProjectID
-        GROUP BY pr.ProjectID, pr.ProjectInfo
-        HAVING AvgScore < %s
+               ROUND(r.SumComposite / NULLIF(r.CntComposite, 0), 2) AS AvgScore
+        FROM project_score_rollup r
+        JOIN project pr ON r.ProjectID = pr.ProjectID
+        WHERE ROUND(r.SumComposite / NULLIF(r.CntComposite, 0), 2) < %s
         ORDER BY AvgScore ASC
     """
-    cursor.execute(query, (threshold,))
-    return cursor.fetchall()
+    return (yield Query(query, (threshold,), frame=True))
 
-def bulk_insert_project_performance(df):
-    connection = connect_db()
-    cursor = connection.cursor()
+@instrumented
+@invalidates("performance")
+def bulk_insert_project_performance(df, chunk_size=BULK_INSERT_CHUNK_SIZE, progress=None):
     try:
-        query = """
-            INSERT INTO performance (EmpID, ProjectID, EfficiencyScore, TimelineScore, QualityScore, AccuracyScore)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        data = [
-            (
-                row["EmpID"], row["ProjectID"],
-                row["EfficiencyScore"], row["TimelineScore"],
-                row["QualityScore"], row["AccuracyScore"]
-            )
-            for _, row in df.iterrows()
-        ]
-        cursor.executemany(query, data)
-        connection.commit()
-        return True
-    except Exception as e:
-        print(f"Error uploading project performance: {e}")
-        return False
+        rows = _frame_rows(df, PERFORMANCE_UPLOAD_COLUMNS)
+    except KeyError as e:
+        error_log.error("Error uploading project performance: missing column %s", e)
+        return BulkInsertResult(False, 0, 0, len(df))
+
+    ensure_rollups()
+    return _bulk_insert_rows(
+        "performance", PERFORMANCE_UPLOAD_COLUMNS, rows,
+        chunk_size=chunk_size, progress=progress, after_chunk=_refresh_performance_rollups
+    )
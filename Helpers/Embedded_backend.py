@@ -0,0 +1,411 @@
+"""
+Embedded SQLite / DuckDB backend for Helpers/Database_connectors.py,
+selected with DB_BACKEND=sqlite or DB_BACKEND=duckdb (DB_PATH names the
+database file; the default ":memory:" lives as long as the process).
+
+Connections behave like mysql.connector ones as far as the pool and the
+helpers are concerned: statements are translated from the MySQL dialect on
+the fly, driver errors are re-raised as mysql.connector errors, and an empty
+database is seeded from SQLDump.zip on first use (then handed to an `on_seed`
+callback, in the same transaction).
+"""
+import math
+import re
+import sqlite3
+import threading
+import zipfile
+from itertools import count
+from pathlib import Path
+from Helpers.Lazy_imports import lazy_import
+
+mysql = lazy_import("mysql.connector", package=True)
+
+EMBEDDED_BACKENDS = ("sqlite", "duckdb")
+
+# Schema and data loaded into an empty database (DB_SEED overrides, "" disables)
+SEED_DUMP = Path(__file__).resolve().parent.parent / "SQLDump.zip"
+
+# Dump files in foreign-key order
+SEED_TABLES = ["department", "employee", "project", "performance", "evaluator"]
+
+# Columns declared AUTO_INCREMENT, remembered in the database itself
+AUTO_COLUMNS_TABLE = "embedded_auto_columns"
+
+# The upload paths insert performance rows without an ID; the dump doesn't declare it AUTO_INCREMENT
+SEED_AUTO_COLUMNS = {"performance": "PerformanceID"}
+
+_QUOTED = re.compile(r"('(?:[^'\\]|\\.|'')*')")
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\((.*)\)[^)]*$", re.I | re.S)
+_DROP_TABLE = re.compile(r"^\s*DROP\s+(TEMPORARY\s+)?TABLE\s+(?:IF\s+EXISTS\s+)?(\w+)", re.I)
+_INSERT_INTO = re.compile(r"^\s*INSERT\s+INTO\s+(\w+)", re.I)
+_INSERT = re.compile(r"^\s*INSERT\s+INTO\s+(\w+)\s*\(([^)]*)\)\s*VALUES\s*(.*?)(\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\s+.*)?$", re.I | re.S)
+_ON_DUPLICATE = re.compile(r"\s+ON\s+DUPLICATE\s+KEY\s+UPDATE\s+(.*)$", re.I | re.S)
+_INDEX_ITEM = re.compile(r"^(UNIQUE\s+)?(?:KEY|INDEX)\s+(\w+)\s*\(([^)]*)\)", re.I)
+_PRIMARY_ITEM = re.compile(r"^PRIMARY\s+KEY\s*\(([^)]*)\)", re.I)
+
+
+# Apply `func` to the parts of a statement outside string literals
+def _outside_quotes(sql, func):
+    parts = _QUOTED.split(sql)
+    return "".join(part if i % 2 else func(part) for i, part in enumerate(parts))
+
+# Split a column list on top-level commas (DECIMAL(10,2) stays whole)
+def _split_items(body):
+    items, depth, current = [], 0, ""
+    for char in body:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            items.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if current.strip():
+        items.append(current.strip())
+    return items
+
+def _column_list(text):
+    return [col.strip() for col in text.split(",")]
+
+def _least(*values):
+    # MySQL semantics: NULL if any argument is NULL
+    return None if any(v is None for v in values) else min(values)
+
+def _greatest(*values):
+    return None if any(v is None for v in values) else max(values)
+
+def _floor(value):
+    return None if value is None else math.floor(value)
+
+
+def _as_mysql_error(err, integrity_errors):
+    # Every helper (and page) catches mysql.connector.Error, whatever the backend
+    error_class = (mysql.connector.errors.IntegrityError if isinstance(err, integrity_errors)
+                   else mysql.connector.errors.DatabaseError)
+    return error_class(msg=f"{type(err).__name__}: {err}")
+
+
+class EmbeddedDatabase:
+    """One embedded database (engine + path) shared by every pooled connection."""
+
+    def __init__(self, backend, path, seed=SEED_DUMP, on_seed=None):
+        if backend not in EMBEDDED_BACKENDS:
+            raise ValueError(f"Unknown embedded backend: {backend}")
+        self.backend = backend
+        self.path = path
+        self._seed = Path(seed) if seed else None
+        # Re-entrant: seeding runs statements through translate() while holding it
+        self._lock = threading.RLock()
+        self._primary_keys = {}
+        self._auto_columns = None
+        self._next_ids = {}
+        self._seeded = False
+        self._on_seed = on_seed
+
+        if backend == "sqlite":
+            self.driver_errors = (sqlite3.Error,)
+            self.integrity_errors = (sqlite3.IntegrityError,)
+            if path == ":memory:":
+                # Shared-cache memory database, kept alive by a connection of our own
+                self._target = f"file:coremetrics_{id(self)}?mode=memory&cache=shared"
+                self._keeper = self._open_sqlite()
+            else:
+                self._target = path
+        else:
+            import duckdb
+            self.driver_errors = (duckdb.Error,)
+            self.integrity_errors = (duckdb.ConstraintException,)
+            self._root = duckdb.connect(path)
+            # Sort NULLs like MySQL: first ascending, last descending
+            self._root.execute("SET GLOBAL default_null_order = 'nulls_first_on_asc_last_on_desc'")
+
+    def _open_sqlite(self):
+        # isolation_level=None: EmbeddedConnection issues BEGIN itself, like the other engine
+        raw = sqlite3.connect(self._target, uri=self._target.startswith("file:"),
+                              check_same_thread=False, isolation_level=None)
+        raw.create_function("FLOOR", 1, _floor, deterministic=True)
+        raw.create_function("LEAST", -1, _least, deterministic=True)
+        raw.create_function("GREATEST", -1, _greatest, deterministic=True)
+        return raw
+
+    def open(self):
+        raw = self._open_sqlite() if self.backend == "sqlite" else self._root.cursor()
+        if not self._seeded:
+            with self._lock:
+                if not self._seeded:
+                    self._seeded = True
+                    self._seed_if_empty(raw)
+        return raw
+
+    # Cursor that shares the connection's transaction
+    def cursor(self, raw):
+        # DuckDB's cursor() opens a separate connection, so run on the connection itself
+        return raw.cursor() if self.backend == "sqlite" else raw
+
+    def has_table(self, raw, table):
+        if self.backend == "sqlite":
+            query = "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?"
+        else:
+            query = "SELECT 1 FROM information_schema.tables WHERE table_name = ?"
+        return raw.execute(query, [table]).fetchone() is not None
+
+    # Load SQLDump.zip into a database that has no CoreMetrics tables yet
+    def _seed_if_empty(self, raw):
+        if self._seed is None or not self._seed.exists() or self.has_table(raw, "employee"):
+            return
+        conn = EmbeddedConnection(self, raw)
+        cursor = conn.cursor()
+        with zipfile.ZipFile(self._seed) as archive:
+            names = {Path(name).stem.split("_", 1)[-1]: name for name in archive.namelist() if name.endswith(".sql")}
+            for table in SEED_TABLES:
+                if table in names:
+                    for statement in dump_statements(archive.read(names[table]).decode("utf-8")):
+                        cursor.execute(statement)
+        for table, column in SEED_AUTO_COLUMNS.items():
+            self._remember_auto_columns(cursor._cursor, table, [column])
+        if self._on_seed is not None:
+            self._on_seed(cursor)
+        conn.commit()
+
+    # MySQL -> embedded dialect
+    def translate(self, cursor, sql, params):
+        """Return ([setup statements..., statement], params) for the embedded engine."""
+        sql = _outside_quotes(sql.strip().rstrip(";"), lambda part: part.replace("%s", "?").replace("`", ""))
+
+        create = _CREATE_TABLE.match(sql)
+        if create:
+            return self._translate_create(cursor, create), params
+        drop = _DROP_TABLE.match(sql)
+        if drop:
+            self._forget(drop.group(2))
+            if drop.group(1):
+                # Temporary tables are dropped like any other
+                sql = sql[:drop.start(1)] + sql[drop.end(1):]
+            return [sql], params
+
+        insert = _INSERT.match(sql)
+        if insert:
+            sql, params = self._fill_auto_column(cursor, insert, sql, params)
+        target = _INSERT_INTO.match(sql)
+        if target:
+            duplicate = _ON_DUPLICATE.search(sql)
+            if duplicate:
+                # INSERT ... ON DUPLICATE KEY UPDATE c=VALUES(c) -> ON CONFLICT (pk) DO UPDATE SET c=excluded.c
+                # (INSERT ... SELECT needs a WHERE clause before it on SQLite)
+                table = target.group(1)
+                assignments = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", duplicate.group(1), flags=re.I)
+                sql = (sql[:duplicate.start()]
+                       + f" ON CONFLICT ({', '.join(self.primary_key(cursor, table))}) DO UPDATE SET {assignments}")
+
+        if self.backend == "sqlite":
+            # MySQL's "/" never truncates; SQLite's does between integers
+            sql = _outside_quotes(sql, lambda part: part.replace("/", " * 1.0 /"))
+        return [sql], params
+
+    def _translate_create(self, cursor, match):
+        if_not_exists, table, body = match.group(1) or "", match.group(2), match.group(3)
+        columns, primary, indexes, auto = [], None, [], []
+        for item in _split_items(body):
+            index = _INDEX_ITEM.match(item)
+            pk = _PRIMARY_ITEM.match(item)
+            if pk:
+                primary = _column_list(pk.group(1))
+            elif index:
+                indexes.append((index.group(2), index.group(3)))
+            elif re.match(r"^(CONSTRAINT|FOREIGN\s+KEY)\b", item, re.I):
+                # Foreign keys are not enforced by the embedded engines
+                continue
+            else:
+                name, _, rest = item.partition(" ")
+                if re.search(r"\bAUTO_INCREMENT\b", rest, re.I):
+                    auto.append(name.strip('"'))
+                    rest = re.sub(r"\s*\bAUTO_INCREMENT\b", "", rest, flags=re.I)
+                rest = re.sub(r"^int\b", "INTEGER", rest, flags=re.I)
+                # MySQL's default collations compare text case-insensitively
+                rest = re.sub(r"^(varchar\(\d+\)|text)", r"\1 COLLATE NOCASE", rest, flags=re.I)
+                columns.append(f"{name} {rest}")
+        if primary:
+            columns.append(f"PRIMARY KEY ({', '.join(primary)})")
+
+        statements = [f"CREATE TABLE {if_not_exists}{table} (\n    " + ",\n    ".join(columns) + "\n)"]
+        if self.backend == "sqlite":
+            # DuckDB scans columns instead; its ART indexes would only slow loading down
+            statements += [f"CREATE INDEX IF NOT EXISTS {table}_{name} ON {table} ({cols})" for name, cols in indexes]
+        self._forget(table)
+        self._remember_auto_columns(cursor, table, auto)
+        return statements
+
+    def primary_key(self, cursor, table):
+        if table not in self._primary_keys:
+            if self.backend == "sqlite":
+                cursor.execute(f"PRAGMA table_info({table})")
+                key = [row[1] for row in sorted(cursor.fetchall(), key=lambda r: r[5]) if row[5]]
+            else:
+                cursor.execute(
+                    "SELECT constraint_column_names FROM duckdb_constraints() "
+                    "WHERE table_name = ? AND constraint_type = 'PRIMARY KEY'", [table]
+                )
+                row = cursor.fetchone()
+                key = list(row[0]) if row else []
+            if not key:
+                raise mysql.connector.errors.ProgrammingError(msg=f"Table {table} has no primary key to upsert on")
+            self._primary_keys[table] = key
+        return self._primary_keys[table]
+
+    def _auto_column(self, cursor, table):
+        with self._lock:
+            if self._auto_columns is None:
+                cursor.execute(f"CREATE TABLE IF NOT EXISTS {AUTO_COLUMNS_TABLE} (TableName VARCHAR(100) PRIMARY KEY, ColumnName VARCHAR(100))")
+                cursor.execute(f"SELECT TableName, ColumnName FROM {AUTO_COLUMNS_TABLE}")
+                self._auto_columns = dict(cursor.fetchall())
+            return self._auto_columns.get(table)
+
+    def _remember_auto_columns(self, cursor, table, columns):
+        self._auto_column(cursor, table)
+        cursor.execute(f"DELETE FROM {AUTO_COLUMNS_TABLE} WHERE TableName = ?", [table])
+        self._auto_columns.pop(table, None)
+        if columns:
+            cursor.execute(f"INSERT INTO {AUTO_COLUMNS_TABLE} VALUES (?, ?)", [table, columns[0]])
+            self._auto_columns[table] = columns[0]
+
+    # AUTO_INCREMENT emulation: give rows inserted without the column the next IDs
+    def _fill_auto_column(self, cursor, insert, sql, params):
+        table, columns = insert.group(1), _column_list(insert.group(2))
+        auto = self._auto_column(cursor, table)
+        if not auto or auto in columns or not params:
+            return sql, params
+        width = len(columns)
+        rows = len(params) // width
+        with self._lock:
+            if table not in self._next_ids:
+                cursor.execute(f"SELECT COALESCE(MAX({auto}), 0) + 1 FROM {table}")
+                self._next_ids[table] = count(cursor.fetchone()[0])
+            ids = [next(self._next_ids[table]) for _ in range(rows)]
+        row_placeholder = "(" + ", ".join(["?"] * (width + 1)) + ")"
+        new_params = []
+        for i, new_id in enumerate(ids):
+            new_params.append(new_id)
+            new_params.extend(params[i * width:(i + 1) * width])
+        sql = (f"INSERT INTO {table} ({auto}, {', '.join(columns)}) VALUES "
+               + ", ".join([row_placeholder] * rows) + (insert.group(4) or ""))
+        return sql, new_params
+
+    def _forget(self, table):
+        with self._lock:
+            self._primary_keys.pop(table, None)
+            self._next_ids.pop(table, None)
+
+
+class EmbeddedConnection:
+    """mysql.connector-style connection over an embedded engine connection."""
+
+    def __init__(self, database, raw=None):
+        self._db = database
+        self._raw = raw if raw is not None else database.open()
+        self.in_transaction = False
+
+    def cursor(self, dictionary=False, **kwargs):
+        return EmbeddedCursor(self, dictionary)
+
+    # Statements run in an explicit transaction until commit()/rollback(), like MySQL with autocommit off
+    def _begin(self):
+        if not self.in_transaction:
+            self._raw.execute("BEGIN TRANSACTION")
+            self.in_transaction = True
+
+    def commit(self):
+        self._end("COMMIT")
+
+    def rollback(self):
+        self._end("ROLLBACK")
+
+    def _end(self, statement):
+        if self.in_transaction:
+            self.in_transaction = False
+            try:
+                self._raw.execute(statement)
+            except self._db.driver_errors as err:
+                raise _as_mysql_error(err, self._db.integrity_errors) from err
+
+    def ping(self, reconnect=False):
+        try:
+            self._raw.execute("SELECT 1").fetchall()
+        except self._db.driver_errors as err:
+            raise _as_mysql_error(err, self._db.integrity_errors) from err
+
+    def consume_results(self):
+        pass
+
+    def close(self):
+        self._raw.close()
+
+
+class EmbeddedCursor:
+    def __init__(self, conn, dictionary=False):
+        self._conn = conn
+        self._db = conn._db
+        self._dictionary = dictionary
+        self._cursor = self._db.cursor(conn._raw)
+        self.description = None
+        self.rowcount = -1
+
+    def execute(self, operation, params=None):
+        try:
+            self._conn._begin()
+            statements, params = self._db.translate(self._cursor, operation, list(params or ()))
+            for statement in statements[:-1]:
+                self._cursor.execute(statement)
+            self._cursor.execute(statements[-1], params)
+        except self._db.driver_errors as err:
+            raise _as_mysql_error(err, self._db.integrity_errors) from err
+        self.description = self._cursor.description
+        self.rowcount = self._cursor.rowcount
+
+    def _shape(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip([col[0] for col in self.description], row))
+
+    def fetchall(self):
+        return [self._shape(row) for row in self._cursor.fetchall()]
+
+    def fetchone(self):
+        return self._shape(self._cursor.fetchone())
+
+    def fetchmany(self, size=1):
+        return [self._shape(row) for row in self._cursor.fetchmany(size)]
+
+    def close(self):
+        if self._cursor is not self._conn._raw:
+            self._cursor.close()
+
+
+# Split a mysqldump file into executable statements, MySQL string escapes rewritten
+def dump_statements(text):
+    current = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not current and (not stripped or stripped.startswith(("--", "/*", "LOCK TABLES", "UNLOCK TABLES", "USE ", "CREATE DATABASE"))):
+            continue
+        current.append(line)
+        if stripped.endswith(";"):
+            yield _unescape_literals("\n".join(current))
+            current = []
+
+def _unescape_literals(sql):
+    # mysqldump writes O\'Neil; standard SQL wants O''Neil
+    return _QUOTED.sub(lambda m: "'" + m.group(1)[1:-1].replace("\\'", "''").replace('\\"', '"').replace("\\\\", "\\") + "'", sql)
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+# Open a pooled-connection stand-in on the embedded database at `path`
+def connect(backend, path=":memory:", seed=SEED_DUMP, on_seed=None):
+    with _databases_lock:
+        database = _databases.get((backend, path))
+        if database is None:
+            database = _databases[(backend, path)] = EmbeddedDatabase(backend, path, seed, on_seed)
+    return EmbeddedConnection(database)
@@ -0,0 +1,420 @@
+"""
+Per-helper instrumentation for Helpers/Database_connectors.py: wall time,
+rows and bytes fetched, pool wait and cache hits/misses, keyed by helper name
+and by the Streamlit page that made the call, plus executions, time and rows
+per statement, keyed by its registered name (Helpers/Queries.py). Exposed as Prometheus text
+(render_prometheus, or the optional METRICS_PORT endpoint) and on the hidden
+Diagnostics page; statements slower than SLOW_QUERY_MS are logged.
+"""
+import contextvars
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from Helpers.Config import load_config
+from Helpers.Queries import QUERY_REGISTRY_MAX, statement_name
+
+load_config()
+
+# Instrumentation Settings
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION", "1") != "0"
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Statements with their own metrics; later ones are counted under "<helper>:other"
+STATEMENT_METRICS_MAX = int(os.getenv("STATEMENT_METRICS_MAX", str(QUERY_REGISTRY_MAX)))
+
+# Latency histogram buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Rows sampled per result to estimate its size in bytes
+BYTES_SAMPLE_ROWS = 100
+
+slow_query_log = logging.getLogger("coremetrics.slow_queries")
+error_log = logging.getLogger("coremetrics.database")
+
+_current_page = contextvars.ContextVar("coremetrics_page", default="-")
+_current_call = contextvars.ContextVar("coremetrics_call", default=None)
+
+
+class _CallStats:
+    # What one helper call spent, filled in by the hooks below while it runs
+    __slots__ = ("helper", "statements", "rows", "bytes", "pool_wait", "cache_hits", "cache_misses", "errors")
+
+    def __init__(self, helper):
+        self.helper = helper
+        self.statements = self.rows = self.bytes = 0
+        self.pool_wait = 0.0
+        self.cache_hits = self.cache_misses = self.errors = 0
+
+
+class MetricsRegistry:
+    """Thread-safe totals per (helper, page), plus a latency histogram, and totals per statement."""
+
+    FIELDS = ("calls", "errors", "seconds", "statements", "rows", "bytes", "pool_wait_seconds",
+              "cache_hits", "cache_misses")
+    STATEMENT_FIELDS = ("executions", "errors", "seconds", "rows")
+
+    def __init__(self, buckets=LATENCY_BUCKETS, max_statements=STATEMENT_METRICS_MAX):
+        self.buckets = buckets
+        self.max_statements = max_statements
+        self._lock = threading.Lock()
+        self._totals = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+        self._histograms = defaultdict(lambda: [0] * (len(self.buckets) + 1))
+        self._statements = defaultdict(lambda: dict.fromkeys(self.STATEMENT_FIELDS, 0))
+        self._slow_statements = 0
+
+    def observe(self, helper, page, seconds, call, failed):
+        key = (helper, page)
+        with self._lock:
+            totals = self._totals[key]
+            totals["calls"] += 1
+            totals["errors"] += call.errors + (1 if failed else 0)
+            totals["seconds"] += seconds
+            totals["statements"] += call.statements
+            totals["rows"] += call.rows
+            totals["bytes"] += call.bytes
+            totals["pool_wait_seconds"] += call.pool_wait
+            totals["cache_hits"] += call.cache_hits
+            totals["cache_misses"] += call.cache_misses
+            self._histograms[key][bisect_left(self.buckets, seconds)] += 1
+
+    def observe_statement(self, statement, seconds, rows, failed=False):
+        with self._lock:
+            if statement not in self._statements and len(self._statements) >= self.max_statements:
+                statement = statement.partition(":")[0] + ":other"
+            totals = self._statements[statement]
+            totals["executions"] += 1
+            totals["errors"] += 1 if failed else 0
+            totals["seconds"] += seconds
+            totals["rows"] += rows
+
+    def count_slow_statement(self):
+        with self._lock:
+            self._slow_statements += 1
+
+    def snapshot(self):
+        with self._lock:
+            return (
+                {key: dict(totals) for key, totals in self._totals.items()},
+                {key: list(counts) for key, counts in self._histograms.items()},
+                self._slow_statements,
+            )
+
+    def statement_snapshot(self):
+        with self._lock:
+            return {statement: dict(totals) for statement, totals in self._statements.items()}
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+            self._histograms.clear()
+            self._statements.clear()
+            self._slow_statements = 0
+
+
+_registry = MetricsRegistry()
+
+
+# Attribute every instrumented call in this block (and threads it fans out to) to `page`
+@contextmanager
+def page_scope(page):
+    token = _current_page.set(page)
+    try:
+        yield
+    finally:
+        _current_page.reset(token)
+
+# Decorator timing a helper; nested helpers are recorded separately
+def instrumented(func=None, name=None):
+    if func is None:
+        return lambda f: instrumented(f, name)
+    helper = name or func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not INSTRUMENTATION_ENABLED:
+            return func(*args, **kwargs)
+        call = _CallStats(helper)
+        token = _current_call.set(call)
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            _current_call.reset(token)
+            _registry.observe(helper, _current_page.get(), time.perf_counter() - start, call, failed)
+
+    return wrapper
+
+
+"""
+Hooks called by Database_connectors and Query_cache
+"""
+
+def record_pool_wait(seconds):
+    call = _current_call.get()
+    if call is not None:
+        call.pool_wait += seconds
+
+def record_cache(hit):
+    call = _current_call.get()
+    if call is not None:
+        if hit:
+            call.cache_hits += 1
+        else:
+            call.cache_misses += 1
+
+def _value_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return 8
+
+# Approximate result size from a sample, so large results aren't walked value by value
+def _estimate_bytes(rows):
+    sample = rows[:BYTES_SAMPLE_ROWS]
+    if not sample:
+        return 0
+    sampled = sum(
+        _value_size(value)
+        for row in sample
+        for value in (row.values() if isinstance(row, dict) else row)
+    )
+    return int(sampled * len(rows) / len(sample))
+
+
+class InstrumentedCursor:
+    # Cursor proxy that times statements and counts fetched rows for the current helper call
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._operation = None
+        self._statement = None
+        self._elapsed = 0.0
+        self._fetched = 0
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        call = _current_call.get()
+        start = time.perf_counter()
+        try:
+            result = self._cursor.execute(operation, params, *args, **kwargs)
+        except Exception as err:
+            if call is not None:
+                call.errors += 1
+            _registry.observe_statement(statement_name(operation, _helper_name()),
+                                        time.perf_counter() - start, 0, failed=True)
+            error_log.error("Query failed in %s (page %s): %s | %s", _helper_name(), _current_page.get(), err,
+                            _short_sql(operation))
+            raise
+        self._operation = operation
+        self._statement = statement_name(operation, _helper_name())
+        self._elapsed = time.perf_counter() - start
+        self._fetched = 0
+        if call is not None:
+            call.statements += 1
+        if self._cursor.description is None:
+            # No result set to fetch: the statement is done
+            self._finish(0)
+        return result
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = self._cursor.fetchall()
+        self._elapsed += time.perf_counter() - start
+        self._count(rows)
+        self._finish(len(rows))
+        return rows
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = self._cursor.fetchone()
+        self._elapsed += time.perf_counter() - start
+        rows = [] if row is None else [row]
+        self._count(rows)
+        self._finish(len(rows))
+        return row
+
+    def fetchmany(self, size=1):
+        start = time.perf_counter()
+        rows = self._cursor.fetchmany(size)
+        self._elapsed += time.perf_counter() - start
+        self._count(rows)
+        self._fetched += len(rows)
+        if not rows:
+            # Batched reads end with an empty batch
+            self._finish(self._fetched)
+        return rows
+
+    def _count(self, rows):
+        call = _current_call.get()
+        if call is not None:
+            call.rows += len(rows)
+            call.bytes += _estimate_bytes(rows)
+
+    def _finish(self, rows):
+        if self._operation is None:
+            return
+        _registry.observe_statement(self._statement, self._elapsed, rows)
+        if self._elapsed * 1000 >= SLOW_QUERY_MS:
+            _registry.count_slow_statement()
+            slow_query_log.warning(
+                "Slow query %s: %.1f ms, %d rows in %s (page %s): %s", self._statement,
+                self._elapsed * 1000, rows, _helper_name(), _current_page.get(), _short_sql(self._operation)
+            )
+        self._operation = None
+
+
+def _helper_name():
+    call = _current_call.get()
+    return call.helper if call is not None else "-"
+
+def _short_sql(sql, limit=300):
+    sql = " ".join(str(sql).split())
+    return sql if len(sql) <= limit else sql[:limit] + " ..."
+
+
+"""
+Reporting
+"""
+
+# Totals per (helper, page) as plain rows, slowest first (for the Diagnostics page)
+def helper_stats():
+    totals, _, _ = _registry.snapshot()
+    rows = []
+    for (helper, page), t in totals.items():
+        calls = t["calls"] or 1
+        rows.append({
+            "helper": helper,
+            "page": page,
+            "calls": t["calls"],
+            "errors": t["errors"],
+            "avg_ms": round(t["seconds"] / calls * 1000, 2),
+            "total_s": round(t["seconds"], 3),
+            "rows": t["rows"],
+            "bytes": t["bytes"],
+            "pool_wait_ms": round(t["pool_wait_seconds"] * 1000, 2),
+            "cache_hits": t["cache_hits"],
+            "cache_misses": t["cache_misses"],
+        })
+    return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+# Totals per registered statement, slowest first (for the Diagnostics page)
+def statement_stats():
+    rows = []
+    for statement, t in _registry.statement_snapshot().items():
+        executions = t["executions"] or 1
+        rows.append({
+            "statement": statement,
+            "executions": t["executions"],
+            "errors": t["errors"],
+            "avg_ms": round(t["seconds"] / executions * 1000, 2),
+            "total_s": round(t["seconds"], 3),
+            "rows": t["rows"],
+        })
+    return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+def reset_metrics():
+    _registry.reset()
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Prometheus text exposition of every helper metric, plus optional extra gauges {name: value}
+def render_prometheus(gauges=None):
+    totals, histograms, slow = _registry.snapshot()
+    lines = []
+
+    def counter(name, field, help_text):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for (helper, page), t in sorted(totals.items()):
+            lines.append(f'{name}{{helper="{_label(helper)}",page="{_label(page)}"}} {t[field]}')
+
+    counter("coremetrics_helper_calls_total", "calls", "Helper calls.")
+    counter("coremetrics_helper_errors_total", "errors", "Helper calls or statements that raised.")
+    counter("coremetrics_helper_statements_total", "statements", "SQL statements executed.")
+    counter("coremetrics_helper_rows_total", "rows", "Rows fetched.")
+    counter("coremetrics_helper_bytes_total", "bytes", "Approximate bytes fetched.")
+    counter("coremetrics_helper_pool_wait_seconds_total", "pool_wait_seconds", "Time spent waiting for a pooled connection.")
+    counter("coremetrics_helper_cache_hits_total", "cache_hits", "Query cache hits.")
+    counter("coremetrics_helper_cache_misses_total", "cache_misses", "Query cache misses.")
+
+    name = "coremetrics_helper_duration_seconds"
+    lines.append(f"# HELP {name} Helper wall time.")
+    lines.append(f"# TYPE {name} histogram")
+    for (helper, page), counts in sorted(histograms.items()):
+        labels = f'helper="{_label(helper)}",page="{_label(page)}"'
+        cumulative = 0
+        for bound, bucket_count in zip(_registry.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {totals[(helper, page)]['seconds']}")
+        lines.append(f"{name}_count{{{labels}}} {cumulative}")
+
+    statements = _registry.statement_snapshot()
+    for name, field, help_text in (
+        ("coremetrics_statement_executions_total", "executions", "Executions per registered statement."),
+        ("coremetrics_statement_errors_total", "errors", "Failed executions per registered statement."),
+        ("coremetrics_statement_seconds_total", "seconds", "Execute and fetch time per registered statement."),
+        ("coremetrics_statement_rows_total", "rows", "Rows fetched per registered statement."),
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for statement, t in sorted(statements.items()):
+            lines.append(f'{name}{{statement="{_label(statement)}"}} {t[field]}')
+
+    lines.append("# HELP coremetrics_slow_queries_total Statements slower than SLOW_QUERY_MS.")
+    lines.append("# TYPE coremetrics_slow_queries_total counter")
+    lines.append(f"coremetrics_slow_queries_total {slow}")
+
+    for gauge, value in (gauges or {}).items():
+        lines.append(f"# TYPE {gauge} gauge")
+        lines.append(f"{gauge} {value}")
+    return "\n".join(lines) + "\n"
+
+
+_server = None
+_server_lock = threading.Lock()
+
+# Serve render_prometheus() on http://<host>:<port>/metrics from a daemon thread (idempotent)
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0", gauges=None):
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            # Only needed when METRICS_PORT is set
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+            class MetricsHandler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] != "/metrics":
+                        self.send_error(404)
+                        return
+                    body = render_prometheus(gauges() if gauges else None).encode()
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="coremetrics-metrics", daemon=True).start()
+    return _server
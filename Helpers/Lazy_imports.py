@@ -0,0 +1,55 @@
+"""
+Deferred imports for the heavy modules (pandas, numpy, plotly, the MySQL
+driver), so that importing a page or a helper module stays cheap and the cost
+is paid by the first call that actually needs the module.
+
+    pd = lazy_import("pandas")                            # like: import pandas as pd
+    mysql = lazy_import("mysql.connector", package=True)  # like: import mysql.connector
+
+The real import happens on first attribute access, under Python's import lock.
+"""
+import importlib
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in module that imports the real one on first attribute access."""
+
+    def __init__(self, name, target):
+        super().__init__(name)
+        self._lazy_target = target  # module to import; `name` is the one to hand out
+        self._lazy_module = None
+        self._lazy_lock = threading.Lock()
+
+    def _load(self):
+        if self._lazy_module is None:
+            with self._lazy_lock:
+                if self._lazy_module is None:
+                    importlib.import_module(self._lazy_target)
+                    self._lazy_module = sys.modules[self.__name__]
+        return self._lazy_module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+# Module `name`, imported on first use. With package=True, return its top-level package
+# (as `import a.b` binds `a`), still importing all of `name` on first use.
+def lazy_import(name, package=False):
+    bound = name.partition(".")[0] if package else name
+    if name in sys.modules:
+        return sys.modules[bound]
+    return LazyModule(bound, name)
+
+# Whether a module has really been imported (a lazy stand-in doesn't count)
+def is_loaded(name):
+    return name in sys.modules
@@ -0,0 +1,319 @@
+"""
+Versioned schema migrations and an index advisor for the queries issued by
+Helpers/Database_connectors.py.
+
+    python -m Helpers.Migrations --status    # applied / pending migrations
+    python -m Helpers.Migrations --explain   # EXPLAIN every hot query, flag full scans
+    python -m Helpers.Migrations --apply     # apply pending migrations
+    python -m Helpers.Migrations --report    # explain + time, apply, explain + time again
+"""
+import argparse
+import json
+import re
+import statistics
+import time
+from Helpers import Database_connectors as db
+from Helpers import Change_log, Score_rollups
+from Helpers.Query_cache import bypass_cache, clear_cache
+
+# Covering indexes for the hot queries: (table, index name, columns)
+HOT_QUERY_INDEXES = [
+    # Employee rollup refresh, filter_performance by employee, performance JOIN employee
+    ("performance", "idx_performance_emp_scores",
+     ("EmpID", "ProjectID", "EfficiencyScore", "TimelineScore", "QualityScore", "AccuracyScore")),
+    # Project rollup refresh and filter_performance by project
+    ("performance", "idx_performance_project_scores",
+     ("ProjectID", "EmpID", "EfficiencyScore", "TimelineScore", "QualityScore", "AccuracyScore")),
+    # Active / high-success project counts and lists on the Dashboard
+    ("project", "idx_project_success", ("SuccessIndicator", "ProjectID")),
+    # Most-projects-per-employee join
+    ("project", "idx_project_employee", ("EmployeeID",)),
+    # Headcount, budget and department filters (covers SUM(Salary) GROUP BY DeptID)
+    ("employee", "idx_employee_dept_salary", ("DeptID", "Salary")),
+]
+
+
+def _existing_indexes(cursor, table):
+    if db.DB_BACKEND == "sqlite":
+        cursor.execute(f"PRAGMA index_list({table})")
+        indexes = {}
+        for row in cursor.fetchall():
+            cursor.execute(f"PRAGMA index_info({row[1]})")
+            indexes[row[1]] = [col[2] for col in sorted(cursor.fetchall())]
+        return indexes
+    cursor.execute("""
+        SELECT INDEX_NAME, COLUMN_NAME
+        FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+        ORDER BY INDEX_NAME, SEQ_IN_INDEX
+    """, (table,))
+    indexes = {}
+    for index_name, column in cursor.fetchall():
+        indexes.setdefault(index_name, []).append(column)
+    return indexes
+
+# Create an index unless an existing one already leads with the same columns
+def ensure_index(cursor, table, name, columns):
+    if db.DB_BACKEND == "duckdb":
+        # Columnar scans serve these queries; DuckDB's ART indexes would only slow writes down
+        return False
+    for existing in _existing_indexes(cursor, table).values():
+        if existing[:len(columns)] == list(columns):
+            return False
+    cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})")
+    return True
+
+# Tables plus a full backfill; from then on the write helpers keep them current
+def _create_rollup_tables(cursor):
+    Score_rollups.create_rollup_tables(cursor)
+    if Score_rollups.needs_rebuild(cursor):
+        Score_rollups.rebuild_rollups(cursor)
+
+def _create_change_log(cursor):
+    if db.DB_BACKEND == "duckdb":
+        print("  skipped: DuckDB has no triggers; pages reload changed tables in full")
+        return
+    Change_log.create_change_log(cursor, db.DB_BACKEND)
+
+def _create_hot_query_indexes(cursor):
+    for table, name, columns in HOT_QUERY_INDEXES:
+        if ensure_index(cursor, table, name, columns):
+            print(f"  created {name} on {table}({', '.join(columns)})")
+
+
+# (version, description, step); versions are applied in order and recorded once
+MIGRATIONS = [
+    (1, "Score rollup tables", _create_rollup_tables),
+    (2, "Covering indexes for hot queries", _create_hot_query_indexes),
+    (3, "Trigger-maintained change log", _create_change_log),
+]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            Version INT NOT NULL PRIMARY KEY,
+            Name VARCHAR(255) NOT NULL,
+            AppliedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+def applied_versions():
+    with db.db_session(commit=True) as cursor:
+        _ensure_migrations_table(cursor)
+        cursor.execute("SELECT Version FROM schema_migrations")
+        return {row[0] for row in cursor.fetchall()}
+
+# Apply the migrations up to `through` on an open cursor, for a database that has none yet
+# (an embedded one being seeded); the caller commits
+def apply_initial(cursor, through):
+    _ensure_migrations_table(cursor)
+    for version, name, step in MIGRATIONS:
+        if version > through:
+            break
+        step(cursor)
+        cursor.execute("INSERT INTO schema_migrations (Version, Name) VALUES (%s, %s)", (version, name))
+
+def pending_migrations():
+    applied = applied_versions()
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+# Apply pending migrations in order (only those up to version `through`, if given)
+def migrate(through=None):
+    applied = []
+    for version, name, step in pending_migrations():
+        if through is not None and version > through:
+            break
+        print(f"Applying migration {version}: {name}")
+        with db.db_session(commit=True) as cursor:
+            step(cursor)
+            cursor.execute("INSERT INTO schema_migrations (Version, Name) VALUES (%s, %s)", (version, name))
+        applied.append(version)
+    return applied
+
+
+"""
+Index advisor
+"""
+
+def _sample_ids():
+    with db.db_session() as cursor:
+        samples = {}
+        for key, query in (
+            ("dept_id", "SELECT DeptID FROM employee WHERE DeptID IS NOT NULL LIMIT 1"),
+            ("emp_id", "SELECT EmpID FROM performance WHERE EmpID IS NOT NULL LIMIT 1"),
+            ("project_id", "SELECT ProjectID FROM performance WHERE ProjectID IS NOT NULL LIMIT 1"),
+        ):
+            cursor.execute(query)
+            row = cursor.fetchone()
+            samples[key] = row[0] if row else 1
+        return samples
+
+# Run a rollup refresh without committing it, just to capture its statements
+def _rollup_refresh(emp_id, project_id):
+    with db.db_session() as cursor:
+        Score_rollups.refresh_for_performance_rows(cursor, [emp_id], [project_id])
+
+# (label, callable) for every query path the pages exercise
+def hot_query_calls():
+    ids = _sample_ids()
+    return [
+        ("get_dashboard_kpis", db.get_dashboard_kpis),
+        ("view_records(employee)", lambda: db.view_records("employee")),
+        ("get_records_page(employee, Name)", lambda: db.get_records_page("employee", order_by="Name")),
+        ("get_records_page(employee, DeptID=)", lambda: db.get_records_page("employee", filters={"DeptID": ids["dept_id"]})),
+        ("get_histogram(employee.Salary)", lambda: db.get_histogram("employee", "Salary", bins=20)),
+        ("get_department_distribution", db.get_department_distribution),
+        ("get_employee_ids", db.get_employee_ids),
+        ("get_all_performance_records", db.get_all_performance_records),
+        ("get_performance_averages", db.get_performance_averages),
+        ("get_employee_rankings", db.get_employee_rankings),
+        ("get_top_performers", db.get_top_performers),
+        ("get_underperformers", db.get_underperformers),
+        ("get_analytics", db.get_analytics),
+        ("filter_performance(dept)", lambda: db.filter_performance(ids["dept_id"], None)),
+        ("filter_performance(project)", lambda: db.filter_performance(None, ids["project_id"])),
+        ("_filter_performance_rows(dept)", lambda: db._filter_performance_rows(ids["dept_id"], None)),
+        ("_filter_performance_rows(project)", lambda: db._filter_performance_rows(None, ids["project_id"])),
+        ("_performance_cube_rows", db._performance_cube_rows),
+        ("get_all_departments", db.get_all_departments),
+        ("get_department_names", db.get_department_names),
+        ("get_department_employee_count", db.get_department_employee_count),
+        ("get_budget_distribution", db.get_budget_distribution),
+        ("get_department_scores", db.get_department_scores),
+        ("get_all_projects", db.get_all_projects),
+        ("get_project_performance", db.get_project_performance),
+        ("get_project_score_chart", db.get_project_score_chart),
+        ("get_top_projects", db.get_top_projects),
+        ("get_underperforming_projects", db.get_underperforming_projects),
+        ("rollup refresh", lambda: _rollup_refresh(ids["emp_id"], ids["project_id"])),
+    ]
+
+# Run every hot helper (uncached) and collect the statements it issues
+def capture_hot_queries():
+    # Most hot helpers read the score rollups, so even a "before" capture needs migration 1
+    migrate(through=1)
+    captured = []
+    with bypass_cache():
+        for label, call in hot_query_calls():
+            with db.record_statements() as statements:
+                call()
+            for sql, params in statements:
+                captured.append((label, " ".join(sql.split()).rstrip(";"), params))
+    return captured
+
+def _is_plain_full_read(sql):
+    upper = sql.upper()
+    return not any(word in upper for word in (" WHERE ", " JOIN ", " GROUP BY ", " ORDER BY "))
+
+def explain(cursor, sql, params):
+    if db.DB_BACKEND == "sqlite":
+        return _explain_sqlite(cursor, sql, params)
+    if db.DB_BACKEND == "duckdb":
+        # Every DuckDB table access is a columnar scan; nothing to flag
+        return [], []
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = cursor.fetchall()
+    full_scans = [
+        row["table"] for row in plan
+        if row.get("type") == "ALL" and not _is_plain_full_read(sql)
+    ]
+    return plan, full_scans
+
+# EXPLAIN QUERY PLAN rows in the MySQL EXPLAIN shape advise() reports
+def _explain_sqlite(cursor, sql, params):
+    cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+    plan = []
+    for row in cursor.fetchall():
+        detail = row["detail"]
+        match = re.match(r"(SCAN|SEARCH) (\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX (\w+))?", detail)
+        if match:
+            plan.append({"table": match.group(2), "type": "ALL" if match.group(1) == "SCAN" and not match.group(3) else "ref",
+                         "key": match.group(3), "rows": None, "Extra": detail})
+    full_scans = [row["table"] for row in plan if row["type"] == "ALL" and not _is_plain_full_read(sql)]
+    return plan, full_scans
+
+def time_statement(cursor, sql, params, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+# EXPLAIN (and optionally time) every captured statement
+def advise(timed=True):
+    results = []
+    for label, sql, params in capture_hot_queries():
+        is_select = sql.lstrip().upper().startswith("SELECT")
+        with db.db_session(dictionary=True) as cursor:
+            plan, full_scans = explain(cursor, sql, params)
+            elapsed = time_statement(cursor, sql, params) if timed and is_select else None
+        results.append({
+            "helper": label,
+            "sql": sql,
+            "full_scans": full_scans,
+            "plan": [{k: plan_row.get(k) for k in ("table", "type", "key", "rows", "Extra")} for plan_row in plan],
+            "median_ms": elapsed,
+        })
+    return results
+
+def print_advice(results):
+    for result in results:
+        flag = "FULL SCAN " + ", ".join(result["full_scans"]) if result["full_scans"] else "ok"
+        timing = f"{result['median_ms']:.2f} ms" if result["median_ms"] is not None else "-"
+        print(f"{result['helper']:<38} {timing:>10}  {flag}")
+
+# Before/after timing of every hot query around applying pending migrations
+def timing_report():
+    before = advise()
+    migrate()
+    clear_cache()
+    after = advise()
+    rows = []
+    for old, new in zip(before, after):
+        rows.append({
+            "helper": old["helper"],
+            "sql": old["sql"],
+            "before_ms": old["median_ms"],
+            "after_ms": new["median_ms"],
+            "full_scans_before": old["full_scans"],
+            "full_scans_after": new["full_scans"],
+        })
+    return rows
+
+def print_timing_report(rows):
+    print(f"{'query':<38} {'before':>10} {'after':>10}  full scans (before -> after)")
+    for row in rows:
+        before = f"{row['before_ms']:.2f}" if row["before_ms"] is not None else "-"
+        after = f"{row['after_ms']:.2f}" if row["after_ms"] is not None else "-"
+        scans = f"{','.join(row['full_scans_before']) or '-'} -> {','.join(row['full_scans_after']) or '-'}"
+        print(f"{row['helper']:<38} {before:>10} {after:>10}  {scans}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CoreMetrics schema migrations and index advisor")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--explain", action="store_true", help="EXPLAIN every hot query and flag full scans")
+    parser.add_argument("--apply", action="store_true", help="apply pending migrations")
+    parser.add_argument("--report", action="store_true", help="time hot queries before and after applying migrations")
+    parser.add_argument("--json", metavar="PATH", help="also write --explain/--report output as JSON")
+    args = parser.parse_args()
+
+    output = None
+    if args.status or not any((args.explain, args.apply, args.report)):
+        applied = applied_versions()
+        for version, name, _ in MIGRATIONS:
+            print(f"{version:>3}  {'applied' if version in applied else 'pending':<8} {name}")
+    if args.explain:
+        output = advise()
+        print_advice(output)
+    if args.apply:
+        print(f"Applied: {migrate() or 'nothing pending'}")
+    if args.report:
+        output = timing_report()
+        print_timing_report(output)
+    if args.json and output is not None:
+        with open(args.json, "w") as f:
+            json.dump(output, f, indent=2, default=str)
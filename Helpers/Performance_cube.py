@@ -0,0 +1,154 @@
+"""
+In-memory performance cube behind filter_performance.
+
+One columnar copy of the performance records joined to their employee
+(EmpID, Name, DeptID, ProjectID, AvgScore), loaded through the query cache
+(_performance_cube_rows), with an inverted index per key column: key value ->
+sorted row positions. A filter looks up the posting list of each given key
+and intersects them, shortest first, by binary search of the shorter list in
+the longer one (np.searchsorted), so any combination of department, project
+and employee is answered in microseconds without touching the database.
+
+The cube is rebuilt on the next filter after a write to performance or
+employee (Query_cache invalidation), and at the latest PERFORMANCE_CUBE_TTL
+seconds after it was built, as a cached query result would be.
+"""
+import os
+import threading
+import time
+from Helpers import Database_connectors as db
+from Helpers.Config import load_config
+from Helpers.Lazy_imports import lazy_import
+from Helpers.Query_cache import QUERY_CACHE_TTL, on_invalidate
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+load_config()
+
+# Cube Settings (PERFORMANCE_CUBE=0 filters in SQL instead)
+PERFORMANCE_CUBE = os.getenv("PERFORMANCE_CUBE", "1") != "0"
+PERFORMANCE_CUBE_TTL = float(os.getenv("PERFORMANCE_CUBE_TTL", str(QUERY_CACHE_TTL)))
+
+# Tables the cube is built from, and the columns it indexes
+CUBE_TABLES = ("performance", "employee")
+INDEXED_COLUMNS = ("DeptID", "ProjectID", "EmpID")
+
+
+# Inverted index of one column: {value: ascending row positions}, built with one stable sort
+def _inverted_index(column):
+    codes, uniques = pd.factorize(column)  # missing values get code -1
+    if not len(codes):
+        return {}
+    order = np.argsort(codes, kind="stable")
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(np.diff(sorted_codes)) + 1
+    index = {}
+    for code, rows in zip(sorted_codes[np.r_[0, starts]], np.split(order, starts)):
+        if code >= 0:
+            value = uniques[code]
+            index[value.item() if hasattr(value, "item") else value] = rows
+    return index
+
+# A filter value as the index stores it. Integer columns compare numerically, as MySQL
+# would: "12" and "12.0" match DeptID 12, while "12.5" or "abc" match nothing
+def _index_key(value, integer):
+    if integer:
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None
+        return int(number) if number.is_integer() else None
+    return value
+
+# Intersection of two ascending position arrays, in O(len(small) * log(len(large)))
+def _intersect(small, large):
+    found = np.searchsorted(large, small)
+    found[found == len(large)] = 0
+    return small[large[found] == small]
+
+
+class PerformanceCube:
+    """Read-only columnar copy of the performance records, with an inverted index per key column."""
+
+    def __init__(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self.indexes = {column: _inverted_index(self.frame[column]) for column in INDEXED_COLUMNS}
+        self._integer = {column: pd.api.types.is_integer_dtype(self.frame[column].dtype) for column in INDEXED_COLUMNS}
+        self.built_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.frame)
+
+    # Row positions matching every given {column: value} (None or "" means no filter on that column)
+    def rows(self, **filters):
+        postings = []
+        for column, value in filters.items():
+            if value is None or value == "":
+                continue
+            rows = self.indexes[column].get(_index_key(value, self._integer[column]))
+            if rows is None:
+                return np.empty(0, dtype=np.intp)
+            postings.append(rows)
+        if not postings:
+            return np.arange(len(self.frame))
+
+        postings.sort(key=len)
+        matched = postings[0]
+        for rows in postings[1:]:
+            matched = _intersect(matched, rows)
+            if not len(matched):
+                break
+        return matched
+
+    # filter_performance's result: the matching records, in table order
+    def filter(self, dept_id=None, project_id=None, emp_id=None):
+        rows = self.rows(DeptID=dept_id, ProjectID=project_id, EmpID=emp_id)
+        return self.frame.take(rows).reset_index(drop=True)
+
+
+_cube = None
+_stale = True
+_lock = threading.Lock()
+
+
+def _mark_stale(tables):
+    global _stale
+    if any(table in CUBE_TABLES for table in tables):
+        _stale = True
+
+on_invalidate(_mark_stale)
+
+
+def _fresh(cube):
+    return cube is not None and not _stale and time.monotonic() - cube.built_at < PERFORMANCE_CUBE_TTL
+
+# The current cube, rebuilt first if a write or the TTL made it stale
+def get_cube():
+    global _cube, _stale
+    cube = _cube
+    if _fresh(cube):
+        return cube
+    with _lock:
+        if _fresh(_cube):
+            return _cube
+        # Cleared before loading, so a write landing during the load marks the new cube stale again
+        _stale = False
+        try:
+            _cube = PerformanceCube(db._performance_cube_rows())
+        except Exception:
+            _stale = True
+            raise
+        return _cube
+
+# Rows, index sizes and age of the current cube (None before the first filter)
+def get_cube_stats():
+    cube = _cube
+    if cube is None:
+        return None
+    return {
+        "rows": len(cube),
+        "keys": {column: len(index) for column, index in cube.indexes.items()},
+        "age_s": round(time.monotonic() - cube.built_at, 1),
+        "stale": not _fresh(cube),
+    }
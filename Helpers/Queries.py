@@ -0,0 +1,193 @@
+"""
+Registry of the parameterized statements the helpers run, and the prepared
+cursors that execute them.
+
+Every statement executed through Database_connectors has a registered name:
+either given explicitly (register_query) or derived from the helper that first
+ran it and a digest of its text ("get_top_projects:1c9e0f4a"), so it stays the
+same across processes and restarts. Per-statement metrics are keyed by it.
+Runs of placeholders are collapsed before hashing, so generated SQL such as a
+multi-row INSERT ... VALUES (%s, %s), (%s, %s) or an IN (%s, %s, %s) list
+keeps one name whatever its row count.
+
+Query plans run on server-side prepared cursors (PREPARED_STATEMENTS=1, the
+default): each pooled connection keeps up to PREPARED_CACHE_SIZE of them, one
+per statement text, so a repeated dashboard query is parsed once per
+connection and afterwards only its parameters travel. Values always go as
+parameters (%s), never into the SQL text. The embedded backends ignore the
+`prepared` flag and simply reuse their cursors.
+"""
+import hashlib
+import os
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from typing import NamedTuple
+from Helpers.Config import load_config
+
+load_config()
+
+# Prepared Statement Settings
+PREPARED_STATEMENTS = os.getenv("PREPARED_STATEMENTS", "1") != "0"
+PREPARED_CACHE_SIZE = int(os.getenv("PREPARED_CACHE_SIZE", "64"))  # prepared cursors per pooled connection
+
+# Names remembered for statements nobody registered (dynamic SQL beyond this still gets a name)
+QUERY_REGISTRY_MAX = int(os.getenv("QUERY_REGISTRY_MAX", "1000"))
+
+
+class NamedQuery(NamedTuple):
+    name: str
+    sql: str
+    explicit: bool  # registered by name, rather than named after the helper that ran it
+
+
+_queries = {}  # name -> NamedQuery
+_names = {}  # SQL text -> name
+_registry_lock = threading.Lock()
+
+
+# "(%s, %s, %s)" / "(?, ?)" -> "(%s, ...)", then "(%s, ...), (%s, ...)" -> "(%s, ...)"
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_ROW_LIST = re.compile(r"\(%s, \.\.\.\)(?:\s*,\s*\(%s, \.\.\.\))+")
+
+# Statement text with whitespace and placeholder runs in one canonical form
+def normalize_sql(sql):
+    sql = _PLACEHOLDER_LIST.sub("(%s, ...)", " ".join(sql.split()))
+    return _ROW_LIST.sub("(%s, ...)", sql)
+
+def _digest(sql):
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()[:8]
+
+# Register a statement under `name`; returns the SQL so it can be kept as a module constant
+def register_query(name, sql):
+    with _registry_lock:
+        existing = _queries.get(name)
+        if existing is not None and existing.sql != sql:
+            raise ValueError(f"Query {name!r} is already registered with different SQL")
+        _queries[name] = NamedQuery(name, sql, True)
+        _names[sql] = name
+    return sql
+
+# Registered name of a statement, registering it under `<helper>:<digest>` the first time it runs
+def statement_name(sql, helper="-"):
+    name = _names.get(sql)
+    if name is not None:
+        return name
+    name = f"{helper}:{_digest(sql)}"
+    with _registry_lock:
+        if sql not in _names and len(_names) < QUERY_REGISTRY_MAX:
+            _queries.setdefault(name, NamedQuery(name, normalize_sql(sql), False))
+            _names[sql] = name
+    return name
+
+def get_query(name):
+    return _queries[name].sql
+
+# Every registered statement, by name
+def registered_queries():
+    with _registry_lock:
+        return dict(_queries)
+
+
+"""
+Prepared cursors
+"""
+
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+_stats_lock = threading.Lock()
+
+
+def _count(field):
+    with _stats_lock:
+        _stats[field] += 1
+
+
+class StatementCache:
+    """Prepared cursors of one connection, one per statement text, least recently used first out.
+
+    Only the thread that has borrowed the connection uses it, so it needs no lock.
+    """
+
+    def __init__(self, conn, size=PREPARED_CACHE_SIZE):
+        self._conn = conn
+        self._size = size
+        self._cursors = OrderedDict()  # SQL -> prepared cursor
+
+    def cursor(self, sql):
+        cursor = self._cursors.pop(sql, None)
+        if cursor is not None:
+            _count("hits")
+        else:
+            _count("misses")
+            if len(self._cursors) >= self._size:
+                _, oldest = self._cursors.popitem(last=False)
+                self._close(oldest)
+                _count("evictions")
+            cursor = self._conn.cursor(prepared=True)
+        self._cursors[sql] = cursor
+        return cursor
+
+    # Drop a statement whose cursor may be in a bad state (after an error)
+    def discard(self, sql):
+        cursor = self._cursors.pop(sql, None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def _close(cursor):
+        try:
+            # Deallocates the statement on the server
+            cursor.close()
+        except Exception:
+            pass
+
+
+class PreparedCursor:
+    """Cursor-like front of a StatementCache: each execute() runs on the prepared cursor of its SQL."""
+
+    def __init__(self, statements):
+        self._statements = statements
+        self._cursor = None
+
+    def __getattr__(self, name):
+        if self._cursor is None:
+            raise AttributeError(name)
+        return getattr(self._cursor, name)
+
+    def execute(self, operation, params=None):
+        cursor = self._statements.cursor(operation)
+        try:
+            result = cursor.execute(operation, params)
+        except Exception:
+            self._statements.discard(operation)
+            raise
+        self._cursor = cursor
+        return result
+
+    def close(self):
+        # The prepared cursors stay open with their connection, for its next borrower
+        self._cursor = None
+
+
+_caches = weakref.WeakKeyDictionary()  # raw connection -> StatementCache, gone with the connection
+_caches_lock = threading.Lock()
+
+
+# Cursor running every statement of a session on `conn`'s cached prepared cursors
+def prepared_cursor(conn):
+    with _caches_lock:
+        statements = _caches.get(conn)
+        if statements is None:
+            statements = _caches[conn] = StatementCache(conn)
+    return PreparedCursor(statements)
+
+# Prepared statement cache figures across all connections
+def get_statement_cache_stats():
+    with _caches_lock:
+        cached = sum(len(statements) for statements in _caches.values())
+    with _stats_lock:
+        return dict(_stats, cached=cached, size=PREPARED_CACHE_SIZE)
@@ -0,0 +1,219 @@
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from functools import wraps
+from Helpers.Config import load_config
+from Helpers.Instrumentation import record_cache
+
+load_config()
+
+# Cache Settings
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", "60"))
+QUERY_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "256"))
+
+
+class QueryCache:
+    """Process-wide LRU cache of helper results with per-entry TTL.
+
+    Every entry remembers the tables it was read from, so a write to a table
+    drops exactly the results that depend on it. Concurrent misses on the same
+    key are coalesced: one caller runs the query, the rest wait for its result.
+    """
+
+    def __init__(self, max_entries=QUERY_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (value, expires_at, tables)
+        self._keys_by_table = defaultdict(set)
+        self._generations = defaultdict(int)
+        self._loading = {}  # key -> threading.Event
+        self._lock = threading.Lock()
+        self._stats = defaultdict(lambda: {"hits": 0, "misses": 0, "evictions": 0})
+        self._invalidations = defaultdict(int)
+        self._listeners = []
+
+    def get_or_load(self, name, key, tables, ttl, loader):
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._stats[name]["hits"] += 1
+                    record_cache(True)
+                    return _copy_result(entry[0])
+                waiter = self._loading.get(key)
+                if waiter is None:
+                    self._loading[key] = threading.Event()
+                    self._stats[name]["misses"] += 1
+                    record_cache(False)
+                    generations = [self._generations[table] for table in tables]
+                    break
+            # Someone else is already running this query; wait and re-check
+            waiter.wait()
+
+        try:
+            value = loader()
+            with self._lock:
+                # Skip the store if a write invalidated these tables mid-query
+                if generations == [self._generations[table] for table in tables]:
+                    self._store(name, key, value, time.monotonic() + ttl, tables)
+        finally:
+            with self._lock:
+                self._loading.pop(key).set()
+        return _copy_result(value)
+
+    # Non-blocking halves of get_or_load, for callers that must not wait on a
+    # threading.Event (coroutines). Concurrent async misses are not coalesced.
+    def lookup(self, name, key, tables):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats[name]["hits"] += 1
+                record_cache(True)
+                return True, _copy_result(entry[0]), None
+            self._stats[name]["misses"] += 1
+            record_cache(False)
+            return False, None, [self._generations[table] for table in tables]
+
+    def store(self, name, key, tables, ttl, value, generations):
+        with self._lock:
+            if generations == [self._generations[table] for table in tables]:
+                self._store(name, key, value, time.monotonic() + ttl, tables)
+
+    def invalidate(self, *tables):
+        with self._lock:
+            for table in tables:
+                self._generations[table] += 1
+                self._invalidations[table] += 1
+                for key in self._keys_by_table.pop(table, ()):
+                    self._drop(key)
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(tables)
+
+    # Call `listener(tables)` after every invalidation (e.g. to drop derived copies of those tables)
+    def add_listener(self, listener):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self):
+        with self._lock:
+            helpers = {name: dict(counts) for name, counts in self._stats.items()}
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": sum(c["hits"] for c in helpers.values()),
+                "misses": sum(c["misses"] for c in helpers.values()),
+                "invalidations": dict(self._invalidations),
+                "helpers": helpers,
+            }
+
+    # Must be called with self._lock held
+    def _store(self, name, key, value, expires_at, tables):
+        self._drop(key)
+        self._entries[key] = (value, expires_at, tables)
+        for table in tables:
+            self._keys_by_table[table].add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self._stats[oldest[0]]["evictions"] += 1
+
+    # Must be called with self._lock held
+    def _drop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            for table in entry[2]:
+                self._keys_by_table[table].discard(key)
+
+
+# Hand each caller its own copy so page code can't mutate a cached result
+def _copy_result(value):
+    if hasattr(value, "to_numpy"):  # pandas DataFrame / Series
+        return value.copy()
+    return copy.deepcopy(value)
+
+
+_cache = QueryCache()
+_local = threading.local()
+
+# Run cached helpers straight through to the database in this thread (diagnostics, benchmarks)
+@contextmanager
+def bypass_cache():
+    previous = getattr(_local, "bypass", False)
+    _local.bypass = True
+    try:
+        yield
+    finally:
+        _local.bypass = previous
+
+# Decorator for read helpers; `tables` may be a callable of the helper's arguments
+def cached(tables, ttl=QUERY_CACHE_TTL):
+    def decorator(func):
+        name = func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if ttl <= 0 or getattr(_local, "bypass", False):
+                return func(*args, **kwargs)
+            read_tables = tuple(tables(*args, **kwargs) if callable(tables) else tables)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            return _cache.get_or_load(name, key, read_tables, ttl, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
+
+# Coroutine counterpart of `cached`; shares entries (and keys) with the sync helper of the same name
+def acached(tables, ttl=QUERY_CACHE_TTL):
+    def decorator(func):
+        name = func.__name__
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            if ttl <= 0 or getattr(_local, "bypass", False):
+                return await func(*args, **kwargs)
+            read_tables = tuple(tables(*args, **kwargs) if callable(tables) else tables)
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hit, value, generations = _cache.lookup(name, key, read_tables)
+            if hit:
+                return value
+            value = await func(*args, **kwargs)
+            _cache.store(name, key, read_tables, ttl, value, generations)
+            return _copy_result(value)
+
+        return wrapper
+    return decorator
+
+# Decorator for write helpers: drop cached reads of `tables` once the write finishes
+def invalidates(*tables):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                # Runs on failure too: a partly applied write still changed the table
+                _cache.invalidate(*tables)
+
+        return wrapper
+    return decorator
+
+def invalidate_tables(*tables):
+    _cache.invalidate(*tables)
+
+def on_invalidate(listener):
+    _cache.add_listener(listener)
+
+def clear_cache():
+    _cache.clear()
+
+def get_cache_stats():
+    return _cache.stats()
@@ -0,0 +1,208 @@
+"""
+Score rollups: per-employee, per-project and per-department sum/count of every
+performance metric. They are kept up to date incrementally by the performance
+write paths, so ranking and threshold queries scan O(groups) rows instead of
+the whole performance table.
+
+Every function takes an open cursor and leaves committing to the caller, so a
+refresh lands in the same transaction as the write that caused it.
+"""
+
+METRICS = ["Efficiency", "Timeline", "Quality", "Accuracy"]
+COMPOSITE_SCORE = "(AccuracyScore + EfficiencyScore + QualityScore + TimelineScore) / 4"
+
+# Rollup table -> grouping key
+ROLLUP_TABLES = {
+    "employee_score_rollup": "EmpID",
+    "project_score_rollup": "ProjectID",
+    "department_score_rollup": "DeptID",
+}
+
+ROLLUP_COLUMNS = (
+    ["ScoreRows"]
+    + [f"{prefix}{metric}" for metric in METRICS for prefix in ("Sum", "Cnt")]
+    + ["SumComposite", "CntComposite"]
+)
+
+# Aggregates over raw performance rows, in ROLLUP_COLUMNS order
+_PERFORMANCE_AGGREGATE_LIST = (
+    ["COUNT(*)"]
+    + [f"{fn}({metric}Score)" for metric in METRICS for fn in ("SUM", "COUNT")]
+    + [f"SUM({COMPOSITE_SCORE})", f"COUNT({COMPOSITE_SCORE})"]
+)
+_PERFORMANCE_AGGREGATES = ", ".join(_PERFORMANCE_AGGREGATE_LIST)
+
+# Aggregates over employee rollups (department level), in ROLLUP_COLUMNS order
+_ROLLUP_AGGREGATES = ", ".join(f"SUM(r.{col})" for col in ROLLUP_COLUMNS)
+
+
+def _ddl(table, key):
+    metric_columns = ",\n".join(
+        f"    Sum{metric} DECIMAL(16,2) NULL,\n    Cnt{metric} INT NOT NULL DEFAULT 0" for metric in METRICS
+    )
+    return f"""
+CREATE TABLE IF NOT EXISTS {table} (
+    {key} INT NOT NULL PRIMARY KEY,
+    ScoreRows INT NOT NULL DEFAULT 0,
+{metric_columns},
+    SumComposite DECIMAL(18,4) NULL,
+    CntComposite INT NOT NULL DEFAULT 0
+)"""
+
+
+ROLLUP_DDL = [_ddl(table, key) for table, key in ROLLUP_TABLES.items()]
+
+
+def _placeholders(values):
+    return ", ".join(["%s"] * len(values))
+
+def _clean_ids(ids):
+    return sorted({int(i) for i in ids if i is not None})
+
+
+def create_rollup_tables(cursor):
+    for ddl in ROLLUP_DDL:
+        cursor.execute(ddl)
+
+# Recompute every rollup row from scratch
+def rebuild_rollups(cursor):
+    for table in ROLLUP_TABLES:
+        cursor.execute(f"DELETE FROM {table}")
+    cursor.execute(f"""
+        INSERT INTO employee_score_rollup (EmpID, {', '.join(ROLLUP_COLUMNS)})
+        SELECT EmpID, {_PERFORMANCE_AGGREGATES}
+        FROM performance
+        WHERE EmpID IS NOT NULL
+        GROUP BY EmpID
+    """)
+    cursor.execute(f"""
+        INSERT INTO project_score_rollup (ProjectID, {', '.join(ROLLUP_COLUMNS)})
+        SELECT ProjectID, {_PERFORMANCE_AGGREGATES}
+        FROM performance
+        WHERE ProjectID IS NOT NULL
+        GROUP BY ProjectID
+    """)
+    cursor.execute(f"""
+        INSERT INTO department_score_rollup (DeptID, {', '.join(ROLLUP_COLUMNS)})
+        SELECT e.DeptID, {_ROLLUP_AGGREGATES}
+        FROM employee_score_rollup r
+        JOIN employee e ON r.EmpID = e.EmpID
+        WHERE e.DeptID IS NOT NULL
+        GROUP BY e.DeptID
+    """)
+
+# Recompute the rollup rows of the given keys from performance
+def _refresh_from_performance(cursor, table, key, ids):
+    ids = _clean_ids(ids)
+    if not ids:
+        return
+    cursor.execute(f"DELETE FROM {table} WHERE {key} IN ({_placeholders(ids)})", ids)
+    cursor.execute(f"""
+        INSERT INTO {table} ({key}, {', '.join(ROLLUP_COLUMNS)})
+        SELECT {key}, {_PERFORMANCE_AGGREGATES}
+        FROM performance
+        WHERE {key} IN ({_placeholders(ids)})
+        GROUP BY {key}
+    """, ids)
+
+def refresh_employees(cursor, emp_ids):
+    _refresh_from_performance(cursor, "employee_score_rollup", "EmpID", emp_ids)
+
+def refresh_projects(cursor, project_ids):
+    _refresh_from_performance(cursor, "project_score_rollup", "ProjectID", project_ids)
+
+# Department rows are re-summed from the (already fresh) employee rollups
+def refresh_departments(cursor, dept_ids):
+    dept_ids = _clean_ids(dept_ids)
+    if not dept_ids:
+        return
+    cursor.execute(f"DELETE FROM department_score_rollup WHERE DeptID IN ({_placeholders(dept_ids)})", dept_ids)
+    cursor.execute(f"""
+        INSERT INTO department_score_rollup (DeptID, {', '.join(ROLLUP_COLUMNS)})
+        SELECT e.DeptID, {_ROLLUP_AGGREGATES}
+        FROM employee_score_rollup r
+        JOIN employee e ON r.EmpID = e.EmpID
+        WHERE e.DeptID IN ({_placeholders(dept_ids)})
+        GROUP BY e.DeptID
+    """, dept_ids)
+
+def departments_of(cursor, emp_ids):
+    emp_ids = _clean_ids(emp_ids)
+    if not emp_ids:
+        return []
+    cursor.execute(f"SELECT DISTINCT DeptID FROM employee WHERE EmpID IN ({_placeholders(emp_ids)})", emp_ids)
+    return [row[0] for row in cursor.fetchall()]
+
+# Refresh everything touched by a batch of performance rows
+def refresh_for_performance_rows(cursor, emp_ids, project_ids):
+    emp_ids = _clean_ids(emp_ids)
+    refresh_employees(cursor, emp_ids)
+    refresh_projects(cursor, project_ids)
+    refresh_departments(cursor, departments_of(cursor, emp_ids))
+
+
+"""
+Drift: the rollups are refreshed by the app's own write helpers only, so rows
+inserted, updated or deleted by other tools or in a SQL console leave them out
+of date until the next full rebuild.
+"""
+
+# What each rollup table should hold, recomputed from performance: (RollupKey, ROLLUP_COLUMNS...)
+_EXPECTED = {
+    "employee_score_rollup": "SELECT EmpID AS RollupKey, {aggregates} FROM performance "
+                             "WHERE EmpID IS NOT NULL GROUP BY EmpID",
+    "project_score_rollup": "SELECT ProjectID AS RollupKey, {aggregates} FROM performance "
+                            "WHERE ProjectID IS NOT NULL GROUP BY ProjectID",
+    "department_score_rollup": "SELECT e.DeptID AS RollupKey, {aggregates} FROM performance "
+                               "JOIN employee e ON performance.EmpID = e.EmpID "
+                               "WHERE e.DeptID IS NOT NULL GROUP BY e.DeptID",
+}
+
+def _drift_query(table, key):
+    aggregates = ", ".join(f"{agg} AS {col}" for agg, col in zip(_PERFORMANCE_AGGREGATE_LIST, ROLLUP_COLUMNS))
+    expected = _EXPECTED[table].format(aggregates=aggregates)
+    # Sums are compared to the cent, as DECIMAL(16,2) stores them
+    mismatch = " OR ".join(
+        f"ABS(COALESCE(r.{col}, 0) - COALESCE(x.{col}, 0)) >= 0.01" if col.startswith("Sum") else f"r.{col} <> x.{col}"
+        for col in ROLLUP_COLUMNS
+    )
+    return f"""
+        SELECT COUNT(*) FROM (
+            SELECT x.RollupKey FROM ({expected}) x
+            LEFT JOIN {table} r ON r.{key} = x.RollupKey
+            WHERE r.{key} IS NULL OR {mismatch}
+            UNION ALL
+            SELECT r.{key} FROM {table} r
+            LEFT JOIN ({expected}) x ON x.RollupKey = r.{key}
+            WHERE x.RollupKey IS NULL
+        ) drifted
+    """
+
+# Rollup table -> number of keys whose row is missing, stale or left over (a full scan of performance)
+def drifted_keys(cursor):
+    drift = {}
+    for table, key in ROLLUP_TABLES.items():
+        cursor.execute(_drift_query(table, key))
+        drift[table] = cursor.fetchone()[0]
+    return drift
+
+
+NEEDS_REBUILD_QUERY = "SELECT EXISTS(SELECT 1 FROM employee_score_rollup), EXISTS(SELECT 1 FROM performance)"
+
+# True when the employee rollup is empty although performance has rows
+def needs_rebuild(cursor):
+    cursor.execute(NEEDS_REBUILD_QUERY)
+    return rebuild_needed(cursor.fetchone())
+
+def rebuild_needed(row):
+    has_rollups, has_performance = row
+    return bool(has_performance) and not has_rollups
+
+
+if __name__ == "__main__":
+    # Full rebuild, e.g. after performance rows were changed outside the app
+    from Helpers.Database_connectors import db_session
+    with db_session(commit=True) as cursor:
+        create_rollup_tables(cursor)
+        rebuild_rollups(cursor)
+    print("Score rollups rebuilt.")
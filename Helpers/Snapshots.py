@@ -0,0 +1,383 @@
+"""
+Versioned Arrow snapshots of the analytical tables, for warm starts.
+
+Each dataset (the employee, project and performance tables, and the joined
+performance view behind get_all_performance_records) is written to
+SNAPSHOT_DIR as an Arrow IPC file named after its watermark: the row count
+and largest key of every table it reads. A load compares the stored watermark
+with the database's (one COUNT/MAX per table) and then
+
+  * memory-maps the snapshot when nothing changed,
+  * fetches only the appended rows (key > stored max) when rows were only added,
+  * re-exports the whole dataset otherwise, streamed from the database in
+    chunks (Database_connectors.iter_query) and written batch by batch.
+
+In-place UPDATEs and DELETEs don't move that watermark, so each snapshot also
+records the change-log watermark (Helpers/Change_log.py) it was taken at: any
+row of its tables updated or deleted since, by this process or any other,
+forces a re-export. Without a change log (DuckDB, or before migration 3) only
+this process's own writes can be seen, so tables written through
+Database_connectors are remembered instead (except appends to an append-only
+dataset's own table), and snapshots older than SNAPSHOT_MAX_AGE are
+re-exported.
+
+    python -m Helpers.Snapshots --status           # snapshot version and freshness per dataset
+    python -m Helpers.Snapshots --refresh          # bring every snapshot up to date
+    python -m Helpers.Snapshots --parquet exports  # zstd Parquet copies for analysts
+
+Refreshing a snapshot and exporting it to Parquet hold one chunk in memory at
+a time (apart from appending a delta, which rewrites the snapshot in memory);
+only load() builds the whole DataFrame.
+
+Needs pyarrow (pip install pyarrow).
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import NamedTuple, Optional
+from Helpers import Change_log, Queries
+from Helpers import Database_connectors as db
+from Helpers.Columnar import append_rows, column_dtype, python_value
+from Helpers.Lazy_imports import lazy_import
+from Helpers.Query_cache import QUERY_CACHE_TTL, on_invalidate
+
+pd = lazy_import("pandas")
+pa = lazy_import("pyarrow.ipc", package=True)  # like: import pyarrow as pa; import pyarrow.ipc
+pq = lazy_import("pyarrow.parquet")
+
+# Snapshot Settings
+SNAPSHOT_COMPRESSION = os.getenv("SNAPSHOT_COMPRESSION", "lz4")  # lz4, zstd or none (none maps zero-copy)
+# Only used without a change log, where outside UPDATEs go unseen: no staler than a cached query
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE", str(QUERY_CACHE_TTL)))
+
+
+class Dataset(NamedTuple):
+    sql: str  # full SELECT without WHERE; deltas append "WHERE <key> > %s"
+    key: str  # ever-growing key expression, used to fetch appended rows
+    tables: tuple  # (table, primary key) pairs; the first is the one rows are appended to
+    columns: Optional[tuple] = None  # columns handed to callers (None = all)
+    append_only: bool = False  # the app never updates rows of the first table in place
+
+
+DATASETS = {
+    "employee": Dataset("SELECT * FROM employee", "EmpID", (("employee", "EmpID"),)),
+    "project": Dataset("SELECT * FROM project", "ProjectID", (("project", "ProjectID"),)),
+    "performance": Dataset("SELECT * FROM performance", "PerformanceID", (("performance", "PerformanceID"),),
+                           append_only=True),
+    # get_all_performance_records, plus the key its deltas need
+    "performance_view": Dataset(
+        """
+        SELECT p.PerformanceID, e.EmpID, e.Name, p.ProjectID,
+               p.EfficiencyScore, p.TimelineScore,
+               p.QualityScore, p.AccuracyScore
+        FROM performance p
+        JOIN employee e ON p.EmpID = e.EmpID""",
+        "p.PerformanceID",
+        (("performance", "PerformanceID"), ("employee", "EmpID")),
+        ("EmpID", "Name", "ProjectID", "EfficiencyScore", "TimelineScore", "QualityScore", "AccuracyScore"),
+        append_only=True,
+    ),
+}
+
+_locks = {name: threading.Lock() for name in DATASETS}
+_written = {name: set() for name in DATASETS}  # tables this process wrote since each dataset's last refresh
+_written_lock = threading.Lock()
+
+
+def _mark_written(tables):
+    with _written_lock:
+        for name, dataset in DATASETS.items():
+            _written[name].update(table for table, _ in dataset.tables if table in tables)
+
+on_invalidate(_mark_written)
+
+
+def _version(watermark):
+    return hashlib.sha1(json.dumps(watermark, sort_keys=True).encode()).hexdigest()[:12]
+
+def _manifest_path(directory, name):
+    return os.path.join(directory, f"{name}.json")
+
+def _write_manifest(directory, manifest):
+    manifest_path = _manifest_path(directory, manifest["dataset"])
+    with open(manifest_path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+def read_manifest(name, directory=None):
+    try:
+        with open(_manifest_path(directory or db.SNAPSHOT_DIR, name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _open_snapshot(directory, manifest):
+    return pa.ipc.open_file(pa.memory_map(os.path.join(directory, manifest["file"]), "r"))
+
+# Memory-map a snapshot file and convert it to pandas (category columns are stored as strings)
+def _read_snapshot(directory, manifest):
+    frame = _open_snapshot(directory, manifest).read_all().to_pandas()
+    categories = [col for col in frame.columns if column_dtype(col) == "category"]
+    return frame.astype(dict.fromkeys(categories, "category")) if categories else frame
+
+# Chunks may each have their own categories, which an Arrow file can't hold as one dictionary
+def _plain(frame):
+    categories = [col for col, dtype in frame.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    return frame.astype(dict.fromkeys(categories, object)) if categories else frame
+
+# Write a new snapshot version from DataFrame chunks (the first one fixes the schema),
+# then point the manifest at it and drop older versions
+def _write_snapshot(directory, name, frames, watermark, change_id=None):
+    os.makedirs(directory, exist_ok=True)
+    version = _version(watermark)
+    filename = f"{name}-{version}.arrow"
+    path = os.path.join(directory, filename)
+    options = pa.ipc.IpcWriteOptions(compression=None if SNAPSHOT_COMPRESSION == "none" else SNAPSHOT_COMPRESSION)
+    rows = 0
+    with pa.OSFile(path + ".tmp", "wb") as sink:
+        writer = None
+        try:
+            for frame in frames:
+                frame = _plain(frame)
+                if writer is None:
+                    schema = pa.Schema.from_pandas(frame, preserve_index=False)
+                    writer = pa.ipc.new_file(sink, schema, options=options)
+                writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+                rows += len(frame)
+        finally:
+            if writer is not None:
+                writer.close()
+    if writer is None:
+        os.remove(path + ".tmp")
+        raise ValueError(f"Snapshot {name}: no data to write")
+    os.replace(path + ".tmp", path)
+
+    manifest = {
+        "dataset": name,
+        "version": version,
+        "file": filename,
+        "watermark": watermark,
+        "change_id": change_id,  # change-log watermark the snapshot was taken at (None: no change log)
+        "rows": rows,
+        "created": time.time(),
+    }
+    _write_manifest(directory, manifest)
+
+    for other in os.listdir(directory):
+        if other.startswith(f"{name}-") and other.endswith(".arrow") and other != filename:
+            try:
+                os.remove(os.path.join(directory, other))
+            except OSError:
+                pass  # still mapped by another process (Windows); removed next time
+    return manifest
+
+
+# Query plan: {table: [row count, max key]} for every table of a dataset
+def _watermark_plan(dataset):
+    watermark = {}
+    for table, pk in dataset.tables:
+        count, max_key = yield db.Query(f"SELECT COUNT(*), MAX({pk}) FROM {table}", one=True)
+        watermark[table] = [int(count), python_value(max_key)]
+    return watermark
+
+CHANGED_IN_PLACE = Queries.register_query(
+    "snapshot_changed_in_place",
+    f"SELECT DISTINCT TableName FROM {Change_log.CHANGE_LOG_TABLE} WHERE ChangeID > %s AND ChangeID <= %s AND Op <> 'I'"
+)
+
+# Query plan: the dataset's tables with rows updated or deleted between two change-log
+# watermarks, or None when the log no longer covers `since` (pruned or recreated)
+def _changed_in_place_plan(dataset, since, until):
+    if since is None or since > until:
+        return None
+    if since == until:
+        return set()
+    min_id, _, _ = yield db.Query(db.CHANGE_LOG_BOUNDS, one=True)
+    if min_id is None or since < min_id - 1:
+        return None
+    rows = yield db.Query(CHANGED_IN_PLACE, (since, until))
+    names = {name for (name,) in rows}
+    return {table for table, _ in dataset.tables if table in names}
+
+# Query plan: current watermarks, then whatever the snapshot is missing.
+# Returns (watermark, change_id, mode, frame) with mode "current", "delta" or "full".
+def _refresh_plan(dataset, previous, written=(), tracked=False):
+    watermark = yield from _watermark_plan(dataset)
+
+    table, pk = dataset.tables[0]
+    change_id = None
+    if tracked:
+        change_id = yield from db._change_watermark_plan()
+        since = previous.get("change_id") if previous is not None else None
+        in_place = yield from _changed_in_place_plan(dataset, since, change_id)
+        if in_place is None:
+            previous = None
+    else:
+        # Written tables may have changed in place, which the watermark can't show
+        in_place = set(written) - ({table} if dataset.append_only else set())
+    if previous is not None and not in_place:
+        old = previous["watermark"]
+        if old == watermark:
+            return watermark, change_id, "current", None
+
+        # Only the first table grew, and every new row has a key above the old maximum
+        (old_count, old_max), (new_count, new_max) = old.get(table, [0, None]), watermark[table]
+        others_unchanged = all(old.get(t) == watermark[t] for t, _ in dataset.tables[1:])
+        if others_unchanged and old_max is not None and new_max is not None and new_max > old_max:
+            (appended,) = yield db.Query(f"SELECT COUNT(*) FROM {table} WHERE {pk} > %s", (old_max,), one=True)
+            if old_count + int(appended) == new_count:
+                delta = yield db.Query(f"{dataset.sql} WHERE {dataset.key} > %s", (old_max,), frame=True)
+                return watermark, change_id, "delta", delta
+
+    return watermark, change_id, "full", None
+
+def _full_plan(query):
+    return (yield query)
+
+# Export the whole dataset as of `watermark` into a new snapshot, streamed chunk by chunk.
+# Rows are capped at the watermark's largest key, so rows appended meanwhile are left to the next delta.
+def _export_full(directory, name, dataset, watermark, change_id):
+    table, _ = dataset.tables[0]
+    max_key = watermark[table][1]
+    if max_key is None:
+        query = db.Query(dataset.sql, frame=True)
+    else:
+        query = db.Query(f"{dataset.sql} WHERE {dataset.key} <= %s", (max_key,), frame=True)
+    chunks = db.iter_query(query)
+    try:
+        return _write_snapshot(directory, name, chunks, watermark, change_id)
+    except (ValueError, pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        # No rows to take a schema from, or a later chunk that doesn't fit the first one's (e.g. a
+        # column that was all NULL at first): export it in one piece instead
+        print(f"Snapshot {name}: streaming export failed, exporting in one piece: {e}")
+        chunks.close()
+        return _write_snapshot(directory, name, [db.run_plan(_full_plan(query))], watermark, change_id)
+    finally:
+        chunks.close()
+
+def _readable(directory, manifest):
+    try:
+        _open_snapshot(directory, manifest)
+        return True
+    except (OSError, pa.ArrowInvalid) as e:
+        print(f"Snapshot {manifest['dataset']} unreadable, re-exporting: {e}")
+        return False
+
+# Bring a dataset's snapshot up to date and return its manifest (caller holds the dataset's lock)
+def _refresh(name, directory):
+    dataset = DATASETS[name]
+    with _written_lock:
+        written, _written[name] = _written[name], set()
+    tracked = db.change_tracking_enabled()
+    previous = read_manifest(name, directory)
+    if previous is not None and not tracked and time.time() - previous["created"] > SNAPSHOT_MAX_AGE:
+        previous = None
+
+    # The watermarks and a delta come from one session (one transaction on MySQL), so they agree
+    try:
+        watermark, change_id, mode, delta = db.run_plan(_refresh_plan(dataset, previous, written, tracked))
+    except Exception:
+        _mark_written(written)
+        raise
+    if mode == "current" and _readable(directory, previous):
+        if change_id != previous.get("change_id"):
+            # Only other tables changed: same snapshot, later change-log watermark
+            previous = dict(previous, change_id=change_id)
+            _write_manifest(directory, previous)
+        return previous
+    if mode == "delta":
+        try:
+            snapshot = _read_snapshot(directory, previous)
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"Snapshot {name} unreadable, re-exporting: {e}")
+        else:
+            return _write_snapshot(directory, name, [append_rows(snapshot, delta)], watermark, change_id)
+    return _export_full(directory, name, dataset, watermark, change_id)
+
+# Bring a dataset's snapshot up to date without loading it; returns its manifest
+def refresh(name, directory=None):
+    with _locks[name]:
+        return _refresh(name, directory or db.SNAPSHOT_DIR)
+
+# Load a dataset from its snapshot, bringing the snapshot up to date first
+def load(name, directory=None):
+    directory = directory or db.SNAPSHOT_DIR
+    dataset = DATASETS[name]
+    with _locks[name]:
+        frame = _read_snapshot(directory, _refresh(name, directory))
+    return frame[list(dataset.columns)] if dataset.columns else frame
+
+# Bring every snapshot up to date; returns {name: rows}
+def refresh_all(directory=None):
+    return {name: refresh(name, directory)["rows"] for name in DATASETS}
+
+# Write each dataset as zstd-compressed Parquet for analysts, record batch by record batch
+# from the memory-mapped snapshots (so mostly no DB reads, and one batch in memory at a time)
+def export_parquet(output_dir, names=None, directory=None):
+    directory = directory or db.SNAPSHOT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {}
+    for name in names or DATASETS:
+        dataset = DATASETS[name]
+        paths[name] = os.path.join(output_dir, f"{name}.parquet")
+        with _locks[name]:
+            reader = _open_snapshot(directory, _refresh(name, directory))
+            schema = reader.schema
+            if dataset.columns:
+                schema = pa.schema([schema.field(col) for col in dataset.columns])
+            with pq.ParquetWriter(paths[name], schema, compression="zstd") as writer:
+                for i in range(reader.num_record_batches):
+                    writer.write_table(pa.Table.from_batches([reader.get_batch(i)]).select(schema.names))
+    return paths
+
+# Query plan: whether a snapshot still matches the database
+def _current_plan(dataset, manifest, tracked):
+    if manifest is None:
+        return False
+    watermark = yield from _watermark_plan(dataset)
+    if manifest["watermark"] != watermark:
+        return False
+    if not tracked:
+        return True
+    change_id = yield from db._change_watermark_plan()
+    return (yield from _changed_in_place_plan(dataset, manifest.get("change_id"), change_id)) == set()
+
+# Per dataset: snapshot version, rows, age and whether it matches the database right now
+def status(directory=None):
+    directory = directory or db.SNAPSHOT_DIR
+    tracked = db.change_tracking_enabled()
+    rows = []
+    for name, dataset in DATASETS.items():
+        manifest = read_manifest(name, directory)
+        rows.append({
+            "dataset": name,
+            "version": manifest["version"] if manifest else None,
+            "rows": manifest["rows"] if manifest else None,
+            "age_s": round(time.time() - manifest["created"]) if manifest else None,
+            "current": db.run_plan(_current_plan(dataset, manifest, tracked)),
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CoreMetrics Arrow snapshots")
+    parser.add_argument("--dir", default=db.SNAPSHOT_DIR or "snapshots", help="snapshot directory (default: SNAPSHOT_DIR)")
+    parser.add_argument("--status", action="store_true", help="show snapshot versions and freshness")
+    parser.add_argument("--refresh", action="store_true", help="bring every snapshot up to date")
+    parser.add_argument("--parquet", metavar="DIR", help="also write zstd Parquet copies to DIR")
+    args = parser.parse_args()
+
+    if args.refresh:
+        for name, count in refresh_all(args.dir).items():
+            print(f"{name:<18} {count:>10,} rows")
+    if args.parquet:
+        for name, path in export_parquet(args.parquet, directory=args.dir).items():
+            print(f"{name:<18} -> {path}")
+    if args.status or not (args.refresh or args.parquet):
+        for row in status(args.dir):
+            state = "current" if row["current"] else "outdated" if row["version"] else "missing"
+            rows = f"{row['rows']:,}" if row["rows"] is not None else "-"
+            print(f"{row['dataset']:<18} {row['version'] or '-':<12} {rows:>10} rows  {state}")
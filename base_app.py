@@ -1,4 +1,7 @@
+import os
 import streamlit as st
+from Helpers.Database_connectors import start_metrics_endpoint
+from Helpers.Instrumentation import page_scope
 
 # Define the pages
 Dashboard = st.Page("pages/Dashboard.py", title="Dashboard", icon=":material/dashboard:")
@@ -18,8 +21,18 @@ pages = {
         Projects
     ],
 }
+
+# Hidden diagnostics page (helper timings, pool and cache), only when SHOW_DIAGNOSTICS=1
+if os.getenv("SHOW_DIAGNOSTICS") == "1":
+    Diagnostics = st.Page("pages/Diagnostics.py", title="Diagnostics", icon=":material/monitor_heart:")
+    pages["Admin"] = [Diagnostics]
+
+# Prometheus endpoint on METRICS_PORT, if set (started once per process)
+start_metrics_endpoint()
+
 # Set up navigation
 pg = st.navigation(pages)
 
-# Run the selected page
-pg.run()
\ No newline at end of file
+# Run the selected page, attributing its queries to it
+with page_scope(pg.title):
+    pg.run()
\ No newline at end of file
@@ -0,0 +1,266 @@
+"""
+Time every Database_connectors helper against synthetic data at one or more
+scales and write a JSON report that can be diffed between versions.
+
+    python -m benchmarks.run_benchmarks --scale 1k 100k --output bench.json
+    python -m benchmarks.run_benchmarks --scale 1k --compare bench.json
+
+On MySQL the benchmark drops and recreates the SQLDump tables in its own
+database (BENCH_DB_NAME, default coremetrics_bench) on the DB_HOST / DB_USER
+server from .env; it refuses to run against the application's DB_NAME.
+With DB_BACKEND=sqlite or duckdb it runs in-process, in memory unless
+--database names a file.
+
+    DB_BACKEND=duckdb python -m benchmarks.run_benchmarks --scale 100k
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from Helpers.Config import load_config
+
+BENCH_DB_NAME = "coremetrics_bench"
+
+# Timed calls per helper, after one untimed warm-up call
+DEFAULT_REPEAT = 10
+
+# Rows per synthetic upload in the write benchmarks
+UPLOAD_ROWS = 1000
+
+
+def _percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+# Run `setup` untimed, then `call`, timed (and traced: peak memory allocated during the call).
+# Memory held by C drivers outside Python's allocators (e.g. the MySQL client's buffers) is not counted.
+def _run(label, call, setup=None, traced=False):
+    if setup is not None:
+        _checked(f"{label} setup", setup())
+    if traced:
+        tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = call()
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if traced else None
+    finally:
+        if traced:
+            tracemalloc.stop()
+    return _checked(label, result), seconds, peak
+
+# A failed write returns False or a falsy BulkInsertResult; never time it as a success
+def _checked(label, result):
+    if result is False or getattr(result, "ok", True) is False:
+        raise RuntimeError(f"{label} failed: {result!r}")
+    return result
+
+# Rows in a helper result: DataFrames and lists count their rows, containers sum their parts
+def count_rows(result):
+    import pandas as pd
+    if isinstance(result, bool):
+        return int(result)
+    if hasattr(result, "ok"):
+        # BulkInsertResult: the rows it wrote
+        return result.rows
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, (list, tuple)):
+        parts = [part for part in result if isinstance(part, (list, pd.DataFrame))]
+        if parts:
+            return sum(count_rows(part) for part in parts)
+        return len(result)
+    return 0 if result is None else 1
+
+# One untimed warm-up, then `repeat` calls, each after its (untimed) setup. The last call runs
+# under tracemalloc for the peak memory and is left out of the latencies, which tracing skews.
+def measure(label, call, repeat=DEFAULT_REPEAT, setup=None):
+    _run(label, call, setup)
+    timings = []
+    for _ in range(repeat - 1):
+        _, seconds, _ = _run(label, call, setup)
+        timings.append(seconds)
+    result, _, peak = _run(label, call, setup, traced=True)
+    timings.sort()
+    rows = count_rows(result)
+    p50 = _percentile(timings, 0.50)
+    return {
+        "calls": repeat,
+        "rows": rows,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(_percentile(timings, 0.95) * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+        "rows_per_s": round(rows / p50, 1) if p50 > 0 else None,
+        "peak_alloc_mb": round(peak / (1024 * 1024), 1),
+    }
+
+
+# (label, callable, setup or None) for the write helpers; a delete's setup recreates what it deletes
+def write_calls(db, performance_rows):
+    import pandas as pd
+    from benchmarks.synthetic_data import FIRST_ID, table_sizes
+
+    sizes = table_sizes(performance_rows)
+    upload = pd.DataFrame({
+        "EmpID": [FIRST_ID + i % sizes["employee"] for i in range(UPLOAD_ROWS)],
+        "ProjectID": [FIRST_ID + i % sizes["project"] for i in range(UPLOAD_ROWS)],
+        "AccuracyScore": [float(i % 101) for i in range(UPLOAD_ROWS)],
+        "EfficiencyScore": [float((i * 7) % 101) for i in range(UPLOAD_ROWS)],
+        "QualityScore": [float((i * 3) % 101) for i in range(UPLOAD_ROWS)],
+        "TimelineScore": [float((i * 5) % 101) for i in range(UPLOAD_ROWS)],
+    })
+    employee = {
+        "EmpID": FIRST_ID + sizes["employee"], "DeptID": FIRST_ID, "AttendanceID": None,
+        "EmailID": "bench@example.com", "DOB": "1990-01-01", "Address": "Benchmark Lane",
+        "WorkEx": 1, "Salary": 50000, "Name": "Bench Mark",
+    }
+    # New employees past the synthetic ones, so the bulk upserts insert on the first call and update after
+    employees = pd.DataFrame([
+        {**employee, "EmpID": FIRST_ID + sizes["employee"] + 1 + i, "DeptID": FIRST_ID + i % sizes["department"]}
+        for i in range(UPLOAD_ROWS)
+    ])
+    # Likewise new departments, with no employees, so the bulk delete removes them all
+    departments = pd.DataFrame({
+        "DeptID": [FIRST_ID + sizes["department"] + i for i in range(UPLOAD_ROWS)],
+        "Name": [f"Bench Department {i}" for i in range(UPLOAD_ROWS)],
+    })
+    return [
+        ("bulk_insert_performance", lambda: db.bulk_insert_performance(upload), None),
+        ("bulk_insert_project_performance", lambda: db.bulk_insert_project_performance(upload), None),
+        ("create_or_update_employee", lambda: db.create_or_update_employee(employee), None),
+        ("delete_employee", lambda: db.delete_employee(employee["EmpID"]),
+         lambda: db.create_or_update_employee(employee)),
+        ("bulk_upsert_employees", lambda: db.bulk_upsert_employees(employees), None),
+        ("merge_employees", lambda: db.merge_employees(employees), None),
+        ("bulk_delete_employees", lambda: db.bulk_delete_employees(employees["EmpID"].tolist()),
+         lambda: db.bulk_upsert_employees(employees)),
+        ("bulk_upsert_departments", lambda: db.bulk_upsert_departments(departments), None),
+        ("merge_departments", lambda: db.merge_departments(departments), None),
+        ("bulk_delete_departments", lambda: db.bulk_delete_departments(departments["DeptID"].tolist()),
+         lambda: db.bulk_upsert_departments(departments)),
+    ]
+
+def run_scale(scale, repeat, helper_filter=None, migrate=True):
+    from Helpers import Database_connectors as db
+    from Helpers import Migrations
+    from Helpers.Query_cache import bypass_cache, clear_cache
+    from benchmarks import synthetic_data
+
+    performance_rows = synthetic_data.SCALES[scale]
+    print(f"[{scale}] loading {performance_rows:,} performance rows ...")
+    start = time.perf_counter()
+    counts = synthetic_data.load(performance_rows, progress=lambda table, n: print(f"  {table}: {n:,}", end="\r"))
+    load_seconds = time.perf_counter() - start
+    print(f"[{scale}] loaded in {load_seconds:.1f}s: {counts}")
+    if migrate:
+        Migrations.migrate()
+    clear_cache()
+
+    helpers = {}
+    calls = [(label, call, None) for label, call in Migrations.hot_query_calls()]
+    calls += write_calls(db, performance_rows)
+    with bypass_cache():
+        for label, call, setup in calls:
+            if helper_filter and not re.search(helper_filter, label):
+                continue
+            helpers[label] = measure(label, call, repeat, setup)
+            stats = helpers[label]
+            print(f"  {label:<38} p50 {stats['p50_ms']:>10.2f} ms  p95 {stats['p95_ms']:>10.2f} ms"
+                  f"  {stats['rows']:>9,} rows  {stats['peak_alloc_mb']:>8.1f} MB")
+    return {
+        "performance_rows": performance_rows,
+        "table_rows": counts,
+        "load_seconds": round(load_seconds, 2),
+        "migrated": migrate,
+        "helpers": helpers,
+    }
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# Print p50 old -> new for every helper present in both reports
+def compare(baseline, report):
+    print(f"{'scale/helper':<48} {'p50 before':>12} {'p50 after':>12} {'ratio':>7}")
+    for scale, result in report["scales"].items():
+        old_helpers = baseline.get("scales", {}).get(scale, {}).get("helpers", {})
+        for label, stats in result["helpers"].items():
+            old = old_helpers.get(label)
+            if not old:
+                continue
+            ratio = stats["p50_ms"] / old["p50_ms"] if old["p50_ms"] else float("nan")
+            print(f"{scale + '/' + label:<48} {old['p50_ms']:>12.2f} {stats['p50_ms']:>12.2f} {ratio:>7.2f}")
+
+def _create_database(name):
+    import mysql.connector
+    conn = mysql.connector.connect(host=os.getenv("DB_HOST"), user=os.getenv("DB_USER"),
+                                   password=os.getenv("DB_PASSWORD"))
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{name}`")
+        cursor.close()
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CoreMetrics helper benchmarks on synthetic data")
+    parser.add_argument("--scale", nargs="+", default=["1k"], choices=["1k", "100k", "10m"],
+                        help="performance-row scales to run (default: 1k)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="calls per helper after a warm-up; the last is traced for memory")
+    parser.add_argument("--helpers", metavar="REGEX", help="only run helpers whose label matches")
+    parser.add_argument("--no-migrate", action="store_true", help="benchmark without the migration indexes")
+    parser.add_argument("--database", default=os.getenv("BENCH_DB_NAME"),
+                        help=f"scratch database to (re)create tables in (MySQL default: {BENCH_DB_NAME}; "
+                             "embedded: a file path, default in memory)")
+    parser.add_argument("--output", metavar="PATH", default="benchmark_report.json", help="JSON report path")
+    parser.add_argument("--compare", metavar="PATH", help="print p50 changes against an earlier report")
+    args = parser.parse_args()
+    if args.repeat < 2:
+        parser.error("--repeat must be at least 2 (the last call is traced for memory, not timed)")
+
+    load_config()
+    backend = os.getenv("DB_BACKEND", "mysql").lower()
+    # Must be set before Helpers.Database_connectors opens its first connection
+    if backend == "mysql":
+        database = args.database or BENCH_DB_NAME
+        if database == os.getenv("DB_NAME"):
+            sys.exit(f"Refusing to benchmark in the application database '{database}'.")
+        _create_database(database)
+        os.environ["DB_NAME"] = database
+    else:
+        if args.database and args.database == os.getenv("DB_PATH"):
+            sys.exit(f"Refusing to benchmark in the application database '{args.database}'.")
+        os.environ["DB_PATH"] = args.database or ":memory:"
+        # The synthetic data replaces the SQLDump seed
+        os.environ["DB_SEED"] = ""
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "backend": backend,
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "scales": {},
+    }
+    for scale in args.scale:
+        report["scales"][scale] = run_scale(scale, args.repeat, args.helpers, not args.no_migrate)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
@@ -0,0 +1,174 @@
+"""
+Cold-start cost of every Streamlit page: each page is imported (not run) in a
+fresh interpreter under `python -X importtime`. The report gives the time to
+import it, its most expensive imports, and which heavy modules it loaded
+before drawing anything.
+
+    python -m benchmarks.startup_profile                  # report
+    python -m benchmarks.startup_profile --check          # exit 1 if a page is over budget
+    python -m benchmarks.startup_profile --write-budget   # re-base the budgets on this machine
+
+Budgets live in benchmarks/startup_budget.json. Each target has an import-time
+budget in milliseconds (default_ms unless listed under "targets"), and none may
+load a module listed under "deferred_modules". Those modules are imported
+lazily (Helpers/Lazy_imports.py) by the first helper or chart that needs them.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+BUDGET_PATH = Path(__file__).resolve().parent / "startup_budget.json"
+
+# Shared module every page imports, then every page script
+MODULE_TARGETS = ["Helpers.Database_connectors"]
+
+# Heavy modules listed in the report whenever a target loads them
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "mysql.connector", "pyarrow", "duckdb", "streamlit"]
+
+# Fresh runs per target; the median is reported
+DEFAULT_RUNS = 3
+
+# Slowest imports listed per target
+TOP_IMPORTS = 5
+
+# Headroom added on top of measured times by --write-budget
+BUDGET_HEADROOM = 1.25
+
+# Runs in the child interpreter: import one target, then report on stdout
+_CHILD = """
+import json, runpy, sys, time
+sys.path.insert(0, {root!r})
+before = set(sys.modules)
+error = None
+start = time.perf_counter()
+try:
+    {action}
+except BaseException as e:
+    error = type(e).__name__ + ": " + str(e)
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "import_ms": elapsed * 1000,
+    "new_modules": sorted(set(sys.modules) - before),
+    "error": error,
+}}))
+"""
+
+
+def targets():
+    pages = {path.stem: path for path in sorted((ROOT / "pages").glob("*.py"))}
+    return [(name, None) for name in MODULE_TARGETS] + list(pages.items())
+
+def _action(name, path):
+    if path is None:
+        return f"__import__({name!r})"
+    # Any run_name but "__main__" imports the page without rendering it
+    return f"runpy.run_path({str(path)!r}, run_name='__startup_profile__')"
+
+# Top-level entries of `-X importtime` output as {module: cumulative ms}
+def _top_level_imports(stderr):
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):
+            imports[name.strip()] = int(cumulative) / 1000
+    return imports
+
+def profile_once(name, path):
+    code = _CHILD.format(root=str(ROOT), action=_action(name, path))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=ROOT)
+    lines = proc.stdout.strip().splitlines()
+    if not lines:
+        return {"import_ms": None, "new_modules": [], "error": proc.stderr.strip()[-500:], "imports": {}}
+    result = json.loads(lines[-1])
+    new_modules = set(result["new_modules"])
+    result["imports"] = {module: ms for module, ms in _top_level_imports(proc.stderr).items()
+                         if module in new_modules}
+    return result
+
+def profile(name, path, runs=DEFAULT_RUNS):
+    results = [profile_once(name, path) for _ in range(runs)]
+    timings = [r["import_ms"] for r in results if r["import_ms"] is not None]
+    last = results[-1]
+    loaded = set(last["new_modules"])
+    return {
+        "import_ms": round(statistics.median(timings), 1) if timings else None,
+        "modules": len(loaded),
+        "heavy_modules": [m for m in HEAVY_MODULES if m in loaded],
+        "slowest_imports": [
+            {"module": module, "ms": round(ms, 1)}
+            for module, ms in sorted(last["imports"].items(), key=lambda item: -item[1])[:TOP_IMPORTS]
+        ],
+        "error": last["error"],
+    }
+
+
+def load_budget(path=BUDGET_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+# Budget violations for one target's profile, as readable strings
+def check(name, stats, budget):
+    problems = []
+    if stats["error"]:
+        problems.append(f"import failed: {stats['error']}")
+        return problems
+    limit = budget.get("targets", {}).get(name, budget["default_ms"])
+    if stats["import_ms"] > limit:
+        problems.append(f"{stats['import_ms']:.0f} ms > budget {limit:.0f} ms")
+    eager = [m for m in budget.get("deferred_modules", []) if m in stats["heavy_modules"]]
+    if eager:
+        problems.append(f"imports {', '.join(eager)} eagerly")
+    return problems
+
+def write_budget(report, path=BUDGET_PATH, headroom=BUDGET_HEADROOM):
+    budget = load_budget(path)
+    budget["targets"] = {name: round(stats["import_ms"] * headroom)
+                         for name, stats in report.items() if stats["import_ms"] is not None}
+    with open(path, "w") as f:
+        json.dump(budget, f, indent=2)
+        f.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CoreMetrics page cold-start profile")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="fresh interpreters per target")
+    parser.add_argument("--only", metavar="NAME", nargs="+", help="profile only these targets")
+    parser.add_argument("--budget", default=str(BUDGET_PATH), help="budget file")
+    parser.add_argument("--check", action="store_true", help="exit 1 if any target is over budget")
+    parser.add_argument("--write-budget", action="store_true",
+                        help=f"set every target's budget to its time here x{BUDGET_HEADROOM}")
+    parser.add_argument("--output", metavar="PATH", help="also write the report as JSON")
+    args = parser.parse_args()
+
+    budget = load_budget(args.budget)
+    report, failures = {}, {}
+    for name, path in targets():
+        if args.only and name not in args.only:
+            continue
+        stats = report[name] = profile(name, path, args.runs)
+        problems = check(name, stats, budget)
+        if problems:
+            failures[name] = problems
+        took = f"{stats['import_ms']:>8.1f} ms" if stats["import_ms"] is not None else "  failed"
+        slowest = ", ".join(f"{i['module']} {i['ms']:.0f}" for i in stats["slowest_imports"][:3])
+        print(f"{name:<30} {took}  {stats['modules']:>5} modules  heavy: {', '.join(stats['heavy_modules']) or '-'}"
+              f"  slowest: {slowest or '-'}")
+        for problem in problems:
+            print(f"  ! {problem}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+    if args.write_budget:
+        write_budget(report, args.budget)
+        print(f"Budgets written to {args.budget}")
+    if args.check and failures:
+        sys.exit(f"{len(failures)} target(s) over the startup budget: {', '.join(failures)}")
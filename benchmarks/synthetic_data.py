@@ -0,0 +1,204 @@
+"""
+Synthetic CoreMetrics data following the SQLDump schema, at a chosen number
+of performance rows. Generation is deterministic for a given seed and streams
+rows in batches, so the 10M scale never holds a whole table in memory.
+"""
+import random
+from datetime import date, timedelta
+from Helpers import Database_connectors as db
+from Helpers import Change_log, Score_rollups
+
+# Named scales -> performance rows
+SCALES = {
+    "1k": 1_000,
+    "100k": 100_000,
+    "10m": 10_000_000,
+}
+
+# Rows generated (and inserted) per batch
+GENERATE_BATCH_ROWS = 50_000
+
+# IDs start where the SQLDump data starts
+FIRST_ID = 100
+
+DEPARTMENT_NAMES = [
+    "Human Resources", "Finance", "Marketing", "Information Technology", "Operations",
+    "Sales", "Legal", "Customer Support", "Product Development", "R&D",
+    "Quality Assurance", "Procurement", "Training and Development",
+]
+
+SUCCESS_INDICATORS = [
+    "Cancelled", "Completed on time", "Delayed", "Exceeded expectations", "In progress",
+    "Not started", "On hold", "Over budget", "Under review", "Within budget",
+]
+
+FIRST_NAMES = ["Greggory", "Der", "Alys", "Marta", "Tobin", "Ines", "Kofi", "Priya", "Wen", "Lars"]
+LAST_NAMES = ["Daniel", "Coatman", "Okafor", "Lindqvist", "Moreau", "Sato", "Iyer", "Novak", "Reyes", "Brandt"]
+PROJECT_WORDS = ["Predictive", "Telehealth", "Voice-Activated", "Digital", "AR", "Supply Chain", "Fraud", "Inventory"]
+PROJECT_SUBJECTS = ["Platform", "Assistant", "Dashboard", "Pipeline", "Experience", "Tracker", "Engine"]
+
+# SQLDump DDL. PerformanceID is AUTO_INCREMENT here because the upload paths
+# insert performance rows without an ID.
+SCHEMA_DDL = [
+    """
+    CREATE TABLE department (
+        DeptID int NOT NULL,
+        Name varchar(100) NOT NULL,
+        PRIMARY KEY (DeptID)
+    )""",
+    """
+    CREATE TABLE employee (
+        EmpID int NOT NULL,
+        Name varchar(100) NOT NULL,
+        DeptID int DEFAULT NULL,
+        AttendanceID int DEFAULT NULL,
+        EmailID varchar(100) DEFAULT NULL,
+        DOB date DEFAULT NULL,
+        Address varchar(255) DEFAULT NULL,
+        WorkEx int DEFAULT NULL,
+        Salary decimal(10,2) DEFAULT NULL,
+        PRIMARY KEY (EmpID),
+        KEY DeptID (DeptID)
+    )""",
+    """
+    CREATE TABLE project (
+        ProjectID int NOT NULL,
+        EmployeeID int DEFAULT NULL,
+        ProjectInfo varchar(255) DEFAULT NULL,
+        SuccessIndicator varchar(50) DEFAULT NULL,
+        PRIMARY KEY (ProjectID),
+        KEY EmployeeID (EmployeeID)
+    )""",
+    """
+    CREATE TABLE performance (
+        PerformanceID int NOT NULL AUTO_INCREMENT,
+        EmpID int DEFAULT NULL,
+        ProjectID int DEFAULT NULL,
+        EfficiencyScore decimal(5,2) DEFAULT NULL,
+        TimelineScore decimal(5,2) DEFAULT NULL,
+        QualityScore decimal(5,2) DEFAULT NULL,
+        AccuracyScore decimal(5,2) DEFAULT NULL,
+        PRIMARY KEY (PerformanceID),
+        KEY EmpID (EmpID),
+        KEY ProjectID (ProjectID)
+    )""",
+    """
+    CREATE TABLE evaluator (
+        EvaluatorID int NOT NULL,
+        EmpID int DEFAULT NULL,
+        PRIMARY KEY (EvaluatorID),
+        KEY EmpID (EmpID)
+    )""",
+]
+
+# Every table the benchmark owns, dependants first
+TABLES = ["evaluator", "performance", "project", "employee", "department",
+          "schema_migrations", Change_log.CHANGE_LOG_TABLE, *Score_rollups.ROLLUP_TABLES]
+
+
+# Row counts per table for a number of performance rows (SQLDump has ~1 of each per employee)
+def table_sizes(performance_rows):
+    employees = max(100, performance_rows // 100)
+    return {
+        "department": len(DEPARTMENT_NAMES),
+        "employee": employees,
+        "project": employees,
+        "performance": performance_rows,
+        "evaluator": employees,
+    }
+
+
+def _departments(rng, count):
+    for i in range(count):
+        yield (FIRST_ID + i, DEPARTMENT_NAMES[i % len(DEPARTMENT_NAMES)])
+
+def _employees(rng, count, departments):
+    for i in range(count):
+        emp_id = FIRST_ID + i
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield (
+            emp_id,
+            f"{first} {last}",
+            FIRST_ID + rng.randrange(departments),
+            emp_id,
+            f"{first.lower()}.{last.lower()}{emp_id}@gmail.com",
+            date(1950, 1, 1) + timedelta(days=rng.randrange(20000)),
+            f"{rng.randrange(1, 9999)} {last} Lane, Springfield, United States, {rng.randrange(10000, 99999)}",
+            rng.randrange(0, 40),
+            round(rng.uniform(30000, 150000), 2),
+        )
+
+def _projects(rng, count, employees):
+    for i in range(count):
+        yield (
+            FIRST_ID + i,
+            FIRST_ID + rng.randrange(employees),
+            f"{rng.choice(PROJECT_WORDS)} {rng.choice(PROJECT_SUBJECTS)} {i}",
+            rng.choice(SUCCESS_INDICATORS),
+        )
+
+def _performance(rng, count, employees, projects):
+    for i in range(count):
+        yield (
+            FIRST_ID + i,
+            FIRST_ID + rng.randrange(employees),
+            FIRST_ID + rng.randrange(projects),
+            *(float(rng.randrange(0, 101)) for _ in range(4)),
+        )
+
+def _evaluators(rng, count, employees):
+    for i in range(count):
+        yield (FIRST_ID + i, FIRST_ID + rng.randrange(employees))
+
+def _batches(rows, size=GENERATE_BATCH_ROWS):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# (table, columns, row generator) for every table, in insert order
+def generate(performance_rows, seed=42):
+    rng = random.Random(seed)
+    sizes = table_sizes(performance_rows)
+    return [
+        ("department", db.TABLE_SCHEMA["department"][1],
+         _departments(rng, sizes["department"])),
+        ("employee", ["EmpID", "Name", "DeptID", "AttendanceID", "EmailID", "DOB", "Address", "WorkEx", "Salary"],
+         _employees(rng, sizes["employee"], sizes["department"])),
+        ("project", db.TABLE_SCHEMA["project"][1],
+         _projects(rng, sizes["project"], sizes["employee"])),
+        ("performance", db.TABLE_SCHEMA["performance"][1],
+         _performance(rng, sizes["performance"], sizes["employee"], sizes["project"])),
+        ("evaluator", db.TABLE_SCHEMA["evaluator"][1],
+         _evaluators(rng, sizes["evaluator"], sizes["employee"])),
+    ]
+
+# Drop and recreate the benchmark tables, then fill them; returns rows per table
+def load(performance_rows, seed=42, progress=None):
+    with db.db_session(commit=True) as cursor:
+        for table in TABLES:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+        for ddl in SCHEMA_DDL:
+            cursor.execute(ddl)
+
+    counts = {}
+    for table, columns, rows in generate(performance_rows, seed):
+        counts[table] = 0
+        for batch in _batches(rows):
+            result = db._bulk_insert_rows(table, columns, batch)
+            if not result:
+                raise RuntimeError(f"Loading {table} failed after {counts[table] + result.rows} rows")
+            counts[table] += result.rows
+            if progress:
+                progress(table, counts[table])
+
+    # Rollups were dropped with the tables; rebuild them from the new data
+    with db.db_session(commit=True) as cursor:
+        Score_rollups.create_rollup_tables(cursor)
+        Score_rollups.rebuild_rollups(cursor)
+    return counts
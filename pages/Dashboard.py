@@ -1,6 +1,10 @@
 import streamlit as st
-from Helpers.Database_connectors import connect_db, get_dashboard_stats, get_performance_insights
-import pandas as pd
+from Helpers import Database_connectors as db
+from Helpers.Database_connectors import get_dashboard_kpis
+from Helpers.Lazy_imports import lazy_import
+
+# Imported on first use, so the page starts rendering before they load
+pd = lazy_import("pandas")
 
 # Streamlit UI
 def main():
@@ -10,13 +14,17 @@ def main():
     st.title("Employee Management Dashboard")
     st.markdown("### Key Metrics & Performance Overview")
 
-    connection = connect_db()
-    if not connection:
+    # Fetch every figure on this page in one round trip
+    try:
+        kpis = get_dashboard_kpis()
+    except db.DatabaseError:
         st.error("Database connection failed.")
         st.stop()
 
-    # Fetch data
-    total_employees, total_departments, active_projects, average_performance = get_dashboard_stats()
+    total_employees = kpis.total_employees
+    total_departments = kpis.total_departments
+    active_projects = kpis.active_projects
+    average_performance = kpis.average_performance
 
     # KPI Cards Layout
     st.markdown("#### Key Performance Indicators")
@@ -36,7 +44,9 @@ def main():
 
     st.markdown("---")
 
-    top_performers, most_projects, high_success_projects = get_performance_insights()
+    top_performers = kpis.top_performers
+    most_projects = kpis.most_projects
+    high_success_projects = kpis.high_success_projects
 
     # Display Performance Insights
     st.markdown("#### Top 5 Employees with Best Performance")
@@ -60,7 +70,5 @@ def main():
     else:
         st.info("No successful projects data available.")
 
-    connection.close()
-
 if __name__ == "__main__":
     main()
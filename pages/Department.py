@@ -1,14 +1,23 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 from Helpers.Database_connectors import (
     get_all_departments,
     get_department_names,
     get_department_employee_count,
     get_budget_distribution,
+    get_department_scores,
     add_or_update_department,
-    delete_department
+    bulk_upsert_departments,
+    merge_departments,
+    bulk_delete_departments,
+    run_queries
 )
+from Helpers.Csv_ingestion import DEPARTMENT_CSV_DTYPES, read_csv_preview, ingest_department_csv
+from Helpers import Chart_data
+from Helpers.Lazy_imports import lazy_import
+
+# Imported on first use, so the page starts rendering before they load
+pd = lazy_import("pandas")
+px = lazy_import("plotly.express")
 
 def main():
     st.set_page_config(page_title="Departments", page_icon="🏢", layout="wide")
@@ -16,15 +25,23 @@ def main():
     st.markdown("Gain quick insights into department structures, employee distributions, and budget allocation.")
     st.logo("https://streamlit.io/images/brand/streamlit-mark-color.png")
     
+    # All department queries are independent; run them in parallel
+    results = run_queries(
+        names=get_department_names,
+        departments=get_all_departments,
+        budget=get_budget_distribution,
+        counts=get_department_employee_count,
+        scores=get_department_scores
+    )
+
     # --- Pills Navigation ---
     st.markdown("### 📂 Departments")
-    dept_names = get_department_names()
-    dept_names.insert(0, "All Departments")
+    dept_names = ["All Departments"] + results["names"]
     selected = st.pills("Select a Department", options=dept_names, default="All Departments", label_visibility="collapsed")
 
     # --- KPI Cards ---
-    budget_data = pd.DataFrame(get_budget_distribution(), columns=["Name", "Budget"])
-    count_data = pd.DataFrame(get_department_employee_count(), columns=["Name", "EmployeeCount"])
+    budget_data = results["budget"]
+    count_data = results["counts"].rename(columns={"Count": "EmployeeCount"})
     merged_df = pd.merge(count_data, budget_data, on="Name", how="outer").fillna(0)
 
     if selected != "All Departments":
@@ -42,6 +59,8 @@ def main():
     st.markdown("---")
     st.subheader("💸 Budget Distribution by Department")
     if not budget_data.empty:
+        # Largest budgets plus one "Other" slice
+        budget_data = Chart_data.top_k(budget_data, "Name", "Budget")
         fig_budget = px.pie(
             budget_data,
             names="Name",
@@ -72,39 +91,88 @@ def main():
     else:
         st.info("No employee data available.")
 
+    # --- Performance by Department ---
+    st.markdown("---")
+    st.subheader("📈 Average Performance by Department")
+    score_data = results["scores"]
+    if not score_data.empty:
+        fig_score = px.bar(
+            score_data,
+            x="Name",
+            y="AvgScore",
+            title="Average Composite Score per Department",
+            text_auto=True,
+            color="AvgScore",
+            color_continuous_scale="Tealgrn"
+        )
+        fig_score.update_layout(xaxis_title="Department", yaxis_title="Average Score")
+        st.plotly_chart(fig_score, use_container_width=True)
+    else:
+        st.info("No performance data available.")
+
     # --- Add or Update Department Form ---
     st.markdown("---")
     st.subheader("➕ Add or Update Department")
     with st.form("add_update_dept", clear_on_submit=True):
-        col1, col2, col3 = st.columns(3)
+        col1, col2 = st.columns(2)
         with col1:
             dept_id = st.number_input("Department ID", min_value=1, step=1)
         with col2:
             dept_name = st.text_input("Department Name")
-        with col3:
-            budget = st.number_input("Budget ($)", min_value=0.0, step=1000.0)
 
         submitted = st.form_submit_button("💾 Save Department")
         if submitted:
             dept_data = {
                 "DeptID": dept_id,
-                "Name": dept_name,
-                "Budget": budget
+                "Name": dept_name
             }
             add_or_update_department(dept_data)
             st.success(f"Department '{dept_name}' saved successfully!")
 
-    # --- Delete Department ---
+    # --- Bulk Upload (CSV) ---
+    st.markdown("---")
+    st.subheader("📤 Upload Departments")
+    st.markdown("Upload a `.csv` file with the columns `DeptID` and `Name`. Existing departments are renamed, new ones are added.")
+    uploaded_file = st.file_uploader("Choose a CSV file", type="csv", key="department_csv")
+    if uploaded_file:
+        try:
+            st.dataframe(read_csv_preview(uploaded_file, DEPARTMENT_CSV_DTYPES), use_container_width=True)
+        except ValueError as e:
+            st.error(f"Could not read the file: {e}")
+            st.stop()
+
+        atomic = st.checkbox("All or nothing (stage the file and apply it in one transaction)", value=True)
+        if st.button("🚀 Upload Departments"):
+            result = ingest_department_csv(
+                uploaded_file,
+                merge_departments if atomic else bulk_upsert_departments,
+                staged=atomic
+            )
+            if result:
+                st.success(f"{result.rows:,} departments saved.")
+                if result.rejected:
+                    st.warning(f"{result.rejected:,} rows were skipped (missing or invalid ID or name).")
+            else:
+                st.error(f"Upload failed after {result.rows:,} rows ({result.error}).")
+
+    # --- Delete Departments ---
     st.markdown("---")
-    st.subheader("🗑️ Delete Department")
+    st.subheader("🗑️ Delete Departments")
+    departments = results["departments"]
+    dept_labels = dict(zip(departments["DeptID"].tolist(), departments["Name"].tolist()))
     delete_col1, delete_col2 = st.columns([3, 1])
     with delete_col1:
-        del_options = get_department_names()
-        del_dept = st.selectbox("Choose a department to delete", del_options)
+        del_depts = st.multiselect(
+            "Choose departments to delete",
+            list(dept_labels),
+            format_func=lambda dept_id: f"{dept_labels[dept_id]} ({dept_id})"
+        )
     with delete_col2:
-        if st.button("Delete"):
-            delete_department(del_dept)
-            st.warning(f"Department '{del_dept}' has been deleted.")
+        if st.button("Delete", disabled=not del_depts):
+            if bulk_delete_departments(del_depts):
+                st.warning(f"Deleted {len(del_depts)} department(s): {', '.join(dept_labels[d] for d in del_depts)}.")
+            else:
+                st.error("Deletion failed. Departments that still have employees can't be deleted.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,81 @@
+import streamlit as st
+from Helpers.Database_connectors import get_connection_stats, get_metrics_text, get_rollup_drift, rebuild_score_rollups
+from Helpers.Instrumentation import SLOW_QUERY_MS, helper_stats, reset_metrics, statement_stats
+from Helpers.Queries import get_statement_cache_stats
+from Helpers.Query_cache import get_cache_stats
+from Helpers.Lazy_imports import lazy_import
+
+# Imported on first use, so the page starts rendering before they load
+pd = lazy_import("pandas")
+
+# Streamlit UI
+def main():
+    st.set_page_config(page_title="Diagnostics", layout="wide")
+    st.title("Diagnostics")
+    st.markdown("### Database helper timings, connection pool and query cache")
+
+    # Pool & Cache
+    pool = get_connection_stats()
+    cache = get_cache_stats()
+    col1, col2, col3, col4, col5 = st.columns(5)
+    col1.metric("Open Connections", f"{pool['open']} / {pool['size']}")
+    col2.metric("Borrowed", pool["borrowed"])
+    col3.metric("Pool Timeouts", pool["timeouts"])
+    col4.metric("Cache Entries", f"{cache['entries']} / {cache['max_entries']}")
+    total_lookups = cache["hits"] + cache["misses"]
+    col5.metric("Cache Hit Rate", f"{cache['hits'] / total_lookups:.0%}" if total_lookups else "-")
+
+    st.markdown("---")
+
+    # Per-helper Timings
+    st.markdown("#### Helpers by total time")
+    stats = helper_stats()
+    if stats:
+        df = pd.DataFrame(stats)
+        pages = ["All"] + sorted(df["page"].unique())
+        page = st.selectbox("Page", pages)
+        if page != "All":
+            df = df[df["page"] == page]
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    else:
+        st.info("No helper calls recorded yet.")
+    st.caption(f"Statements slower than {SLOW_QUERY_MS:.0f} ms are logged to `coremetrics.slow_queries`.")
+
+    # Per-statement Timings
+    st.markdown("#### Statements by total time")
+    prepared = get_statement_cache_stats()
+    prepared_lookups = prepared["hits"] + prepared["misses"]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Prepared Statements", prepared["cached"])
+    col2.metric("Prepared Reuse", f"{prepared['hits'] / prepared_lookups:.0%}" if prepared_lookups else "-")
+    col3.metric("Evictions", prepared["evictions"])
+    statements = statement_stats()
+    if statements:
+        st.dataframe(pd.DataFrame(statements), use_container_width=True, hide_index=True)
+    else:
+        st.info("No statements recorded yet.")
+
+    if st.button("Reset Metrics"):
+        reset_metrics()
+        st.rerun()
+
+    # Score Rollups
+    st.markdown("#### Score rollups")
+    st.caption("The rollups behind rankings and averages are refreshed by this app's own writes only; "
+               "rows changed by other tools or in a SQL console leave them out of date until a rebuild.")
+    col1, col2 = st.columns(2)
+    if col1.button("Check Rollups"):
+        drift = get_rollup_drift()
+        if any(drift.values()):
+            st.warning("Out-of-date rollup rows: " + ", ".join(f"{table} {n:,}" for table, n in drift.items()))
+        else:
+            st.success("The rollups match the performance table.")
+    if col2.button("Rebuild Rollups"):
+        rebuild_score_rollups()
+        st.success("Rollups rebuilt.")
+
+    with st.expander("Prometheus metrics"):
+        st.code(get_metrics_text(), language="text")
+
+if __name__ == "__main__":
+    main()
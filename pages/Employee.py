@@ -1,11 +1,60 @@
+import math
 import streamlit as st
-import plotly.express as px
 from Helpers.Database_connectors import (
-    view_records,
+    TABLE_SCHEMA,
+    get_records_page,
+    get_histogram,
+    get_department_distribution,
     create_or_update_employee,
-    delete_employee,
-    get_employee_ids
+    bulk_upsert_employees,
+    merge_employees,
+    bulk_delete_employees,
+    get_employee_ids,
+    get_all_departments,
+    submit_queries
 )
+from Helpers.Csv_ingestion import EMPLOYEE_CSV_DTYPES, read_csv_preview, ingest_employee_csv
+from Helpers import Chart_data
+from Helpers.Lazy_imports import lazy_import
+
+# Imported on first use, so the page starts rendering before they load
+px = lazy_import("plotly.express")
+
+DIRECTORY_COLUMNS = ["EmpID", "Name", "DeptID", "EmailID", "WorkEx", "Salary"]
+
+# Paged Employee Directory (keyset pagination, one page per rerun)
+def employee_directory():
+    all_columns = TABLE_SCHEMA["employee"][1]
+    ctrl1, ctrl2, ctrl3, ctrl4 = st.columns([3, 2, 1, 1])
+    columns = ctrl1.multiselect("Columns", all_columns, default=DIRECTORY_COLUMNS)
+    sort_col = ctrl2.selectbox("Sort by", all_columns, index=0)
+    descending = ctrl3.toggle("Descending")
+    page_size = ctrl4.selectbox("Rows per page", [25, 50, 100, 250], index=1)
+    dept_filter = st.number_input("Filter by Department ID (0 = all)", min_value=0, step=1)
+    filters = {"DeptID": dept_filter} if dept_filter else None
+
+    # Stack of page cursors; reset whenever the query itself changes
+    query = (tuple(columns), sort_col, descending, page_size, dept_filter)
+    if st.session_state.get("directory_query") != query:
+        st.session_state["directory_query"] = query
+        st.session_state["directory_cursors"] = [None]
+    cursors = st.session_state["directory_cursors"]
+
+    page = get_records_page(
+        "employee", columns=columns or None, page_size=page_size, after=cursors[-1],
+        order_by=sort_col, descending=descending, filters=filters
+    )
+    st.dataframe(page.records, use_container_width=True)
+
+    nav1, nav2, nav3 = st.columns([1, 1, 4])
+    if nav1.button("◀ Previous", disabled=len(cursors) == 1):
+        cursors.pop()
+        st.rerun()
+    if nav2.button("Next ▶", disabled=page.next_key is None):
+        cursors.append(page.next_key)
+        st.rerun()
+    total_pages = max(1, math.ceil(page.total_estimate / page_size))
+    nav3.caption(f"Page {len(cursors)} of ~{total_pages} · about {page.total_estimate:,} employees")
 
 def main():
     st.set_page_config(page_title="Employee Management", page_icon=":material/monitoring:", layout="wide")
@@ -14,15 +63,14 @@ def main():
     st.logo("https://streamlit.io/images/brand/streamlit-mark-color.png")
     
     # Tabs
-    tab1, tab2, tab3 = st.tabs(["📋 View Employees", "➕ Add/Update Employee", "❌ Delete Employee"])
+    tab1, tab2, tab3, tab4 = st.tabs(["📋 View Employees", "➕ Add/Update Employee", "📤 Bulk Upload", "❌ Delete Employees"])
 
     # ============================
     # 📋 TAB 1: View Employees
     # ============================
     with tab1:
-        df = view_records("employee")
         st.markdown("### Employee Directory")
-        st.dataframe(df, use_container_width=True)
+        employee_directory()
 
 
     # ============================
@@ -62,39 +110,93 @@ def main():
             st.success("✅ Employee record successfully saved or updated.")
 
     # ============================
-    # ❌ TAB 3: Delete Employee
+    # 📤 TAB 3: Bulk Upload (CSV)
     # ============================
     with tab3:
-        st.markdown("### Delete an Employee Record")
+        st.markdown("### Upload Employee Records")
+        st.markdown("""
+            Upload a `.csv` file with the columns `EmpID` and `Name` (required) and any of
+            `DeptID`, `AttendanceID`, `EmailID`, `DOB` (YYYY-MM-DD), `Address`, `WorkEx`, `Salary`.
+            Existing employees are updated, new ones are added.
+        """)
+        uploaded_file = st.file_uploader("Choose a CSV file", type="csv", key="employee_csv")
+
+        if uploaded_file:
+            try:
+                st.caption("Preview of the first rows")
+                st.dataframe(read_csv_preview(uploaded_file, EMPLOYEE_CSV_DTYPES), use_container_width=True)
+            except ValueError as e:
+                st.error(f"Could not read the file: {e}")
+                st.stop()
+
+            atomic = st.checkbox("All or nothing (stage the file and apply it in one transaction)", value=True)
+            if st.button("🚀 Upload Employees"):
+                progress_bar = st.progress(0.0, text="Uploading...")
+
+                def show_progress(rows, rejected, fraction):
+                    progress_bar.progress(fraction or 0.0, text=f"Processed {rows:,} rows ({rejected:,} rejected)")
+
+                result = ingest_employee_csv(
+                    uploaded_file,
+                    merge_employees if atomic else bulk_upsert_employees,
+                    dept_ids=get_all_departments()["DeptID"],
+                    staged=atomic,
+                    progress=show_progress
+                )
+                if result:
+                    st.success(f"✅ {result.rows:,} employee records saved or updated.")
+                    if result.rejected:
+                        st.warning(f"{result.rejected:,} rows were skipped (missing ID or name, unknown "
+                                   "department, or an invalid email, date, experience or salary).")
+                else:
+                    st.error(f"Upload failed after {result.rows:,} rows ({result.error}).")
+
+    # ============================
+    # ❌ TAB 4: Delete Employees
+    # ============================
+    with tab4:
+        st.markdown("### Delete Employee Records")
         emp_ids = get_employee_ids()
         if emp_ids:
-            emp_to_delete = st.selectbox("Select Employee ID to delete", emp_ids)
-            if st.button("⚠️ Confirm Deletion"):
-                delete_employee(emp_to_delete)
-                st.warning(f"🚫 Employee {emp_to_delete} has been removed from the system.")
+            emps_to_delete = st.multiselect("Select Employee IDs to delete", emp_ids)
+            if st.button("⚠️ Confirm Deletion", disabled=not emps_to_delete):
+                if bulk_delete_employees(emps_to_delete):
+                    st.warning(f"🚫 {len(emps_to_delete):,} employee(s) removed from the system.")
+                else:
+                    st.error("Deletion failed. Please try again.")
         else:
             st.info("No employees available to delete.")
-    if not df.empty:
-        st.markdown("---")
-        st.markdown("### Workforce Insights")
-        col1, col2 = st.columns(2)
-
-        with col1:
-            if "DeptID" in df.columns:
-                dept_count = df["DeptID"].value_counts().reset_index()
-                dept_count.columns = ["DeptID", "Count"]
-                fig1 = px.pie(dept_count, names='DeptID', values='Count', title="Department-wise Distribution")
-                st.plotly_chart(fig1, use_container_width=True)
-        
-        with col2:
-            if "WorkEx" in df.columns:
-                fig2 = px.histogram(df, x="WorkEx", nbins=10, title="Work Experience Distribution (Years)")
-                st.plotly_chart(fig2, use_container_width=True)
-        st.markdown("### Salary Analysis")
-        if "Salary" in df.columns:
-            fig3 = px.histogram(df, x="Salary", nbins=20, title="Employee Salary Distribution")
-            st.plotly_chart(fig3, use_container_width=True)
+    # Charts are built from a few dozen pre-aggregated rows, not from every employee
+    st.markdown("---")
+    st.markdown("### Workforce Insights")
+    binning = st.radio("Binning", ["fixed", "quantile"], horizontal=True,
+                       format_func=lambda m: "Equal width" if m == "fixed" else "Equal count (quantiles)")
+    charts = submit_queries(
+        depts=get_department_distribution,
+        workex=(get_histogram, "employee", "WorkEx", 10, binning),
+        salary=(get_histogram, "employee", "Salary", 20, binning)
+    )
+    col1, col2 = st.columns(2)
+
+    with col1:
+        dept_count = charts["depts"].result()
+        if not dept_count.empty:
+            fig1 = px.pie(Chart_data.top_k(dept_count, 'DeptID', 'Count'), names='DeptID', values='Count', title="Department-wise Distribution")
+            st.plotly_chart(fig1, use_container_width=True)
+
+    with col2:
+        workex = charts["workex"].result()
+        if not workex.empty:
+            fig2 = px.bar(workex, x="Label", y="Count", title="Work Experience Distribution (Years)")
+            fig2.update_layout(xaxis_title="WorkEx", bargap=0.05)
+            st.plotly_chart(fig2, use_container_width=True)
 
+    st.markdown("### Salary Analysis")
+    salary = charts["salary"].result()
+    if not salary.empty:
+        fig3 = px.bar(salary, x="Label", y="Count", title="Employee Salary Distribution")
+        fig3.update_layout(xaxis_title="Salary", bargap=0.05)
+        st.plotly_chart(fig3, use_container_width=True)
 
 if __name__ == "__main__":
     main()
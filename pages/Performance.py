@@ -1,14 +1,20 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 from Helpers.Database_connectors import (
     get_all_performance_records,
     bulk_insert_performance,
     get_performance_averages,
     get_top_performers,
     get_underperformers,
-    filter_performance    
+    filter_performance,
+    submit_queries
 )
+from Helpers.Csv_ingestion import read_csv_preview, ingest_performance_csv
+from Helpers import Chart_data
+from Helpers.Lazy_imports import lazy_import
+
+# Imported on first use, so the page starts rendering before they load
+pd = lazy_import("pandas")
+px = lazy_import("plotly.express")
 
 def main():
     st.set_page_config(page_title="Performance Insights", page_icon="📊", layout="wide")
@@ -16,6 +22,13 @@ def main():
     st.markdown("Analyze individual and team performance trends to make informed organizational decisions.")
     st.logo("https://streamlit.io/images/brand/streamlit-mark-color.png")
     
+    # Start the independent page queries now; they run in parallel while the page renders
+    queries = submit_queries(
+        averages=get_performance_averages,
+        top=get_top_performers,
+        under=get_underperformers
+    )
+
     st.divider()
 
     # ================================
@@ -28,8 +41,7 @@ def main():
         proj_input = col2.text_input("Project ID", placeholder="e.g., P105")
 
         if st.button("🔍 Filter Records"):
-            filtered = filter_performance(dept_input or None, proj_input or None)
-            df_filtered = pd.DataFrame(filtered)
+            df_filtered = filter_performance(dept_input or None, proj_input or None)
 
             if df_filtered.empty:
                 st.warning("No matching performance records found.")
@@ -37,15 +49,28 @@ def main():
                 st.success(f"Displaying {len(df_filtered)} filtered performance records.")
                 st.dataframe(df_filtered, use_container_width=True)
 
-                fig = px.bar(
-                    df_filtered,
-                    x="Name",
-                    y="AvgScore",
-                    color="AvgScore",
-                    color_continuous_scale="Viridis",
-                    title="Filtered Employee Performance Overview",
-                    text_auto=True
-                )
+                # One bar per record while that stays readable, then one WebGL point per record
+                if len(df_filtered) <= Chart_data.CHART_MAX_CATEGORIES:
+                    fig = px.bar(
+                        df_filtered,
+                        x="Name",
+                        y="AvgScore",
+                        color="AvgScore",
+                        color_continuous_scale="Viridis",
+                        title="Filtered Employee Performance Overview",
+                        text_auto=True
+                    )
+                else:
+                    fig = Chart_data.scatter(
+                        df_filtered,
+                        x="EmpID",
+                        y="AvgScore",
+                        hover_name="Name",
+                        hover_data=["ProjectID"],
+                        color="AvgScore",
+                        color_continuous_scale="Viridis",
+                        title="Filtered Employee Performance Overview"
+                    )
                 fig.update_layout(xaxis_title="Employee", yaxis_title="Average Score")
                 st.plotly_chart(fig, use_container_width=True)
 
@@ -55,7 +80,7 @@ def main():
     # 📈 Performance Averages Overview
     # ================================
     st.subheader("📈 Performance Averages Across Categories")
-    averages = get_performance_averages()
+    averages = queries["averages"].result()
     avg_df = pd.DataFrame({
         "Metric": list(averages.keys()),
         "Average Score": list(averages.values())
@@ -79,7 +104,7 @@ def main():
     # 🏅 Top Performers
     # ================================
     st.subheader("🏅 Top Performing Employees")
-    top_df = pd.DataFrame(get_top_performers())
+    top_df = queries["top"].result()
 
     if not top_df.empty:
         st.dataframe(top_df, use_container_width=True)
@@ -104,13 +129,14 @@ def main():
     # ⚠️ Underperformers
     # ================================
     st.subheader("⚠️ Employees Requiring Attention")
-    under_df = pd.DataFrame(get_underperformers())
+    under_df = queries["under"].result()
 
     if not under_df.empty:
         st.dataframe(under_df, use_container_width=True)
 
+        # Lowest scores first; the rest share one "Other" bar
         fig_under = px.bar(
-            under_df,
+            Chart_data.top_k(under_df, "Name", "AvgScore", agg="mean", ascending=True, key="EmpID"),
             x="Name",
             y="AvgScore",
             color="Name",
@@ -142,15 +168,29 @@ def main():
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
     if uploaded_file:
-        df_upload = pd.read_csv(uploaded_file)
-        st.dataframe(df_upload, use_container_width=True)
+        try:
+            st.caption("Preview of the first rows")
+            st.dataframe(read_csv_preview(uploaded_file), use_container_width=True)
+        except ValueError as e:
+            st.error(f"Could not read the file: {e}")
+            st.stop()
 
         if st.button("🚀 Upload Data"):
-            success = bulk_insert_performance(df_upload)
-            if success:
-                st.success("Performance data uploaded successfully!")
+            progress_bar = st.progress(0.0, text="Uploading...")
+
+            def show_progress(rows, rejected, fraction):
+                progress_bar.progress(fraction or 0.0, text=f"Uploaded {rows:,} rows ({rejected:,} rejected)")
+
+            result = ingest_performance_csv(uploaded_file, bulk_insert_performance, progress=show_progress)
+            if result:
+                st.success(f"Performance data uploaded successfully! {result.rows:,} rows inserted.")
+                if result.rejected:
+                    st.warning(f"{result.rejected:,} rows were skipped (missing IDs or scores outside 0-100).")
             else:
-                st.error("Upload failed. Please check your file format and data consistency.")
+                st.error(
+                    f"Upload failed after {result.rows:,} rows ({result.error}). "
+                    "Please check your file format and data consistency."
+                )
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,29 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
 from Helpers.Database_connectors import (
     get_all_projects,
-    get_project_performance,
+    get_project_score_chart,
     get_top_projects,
     get_underperforming_projects,
-    bulk_insert_project_performance
+    bulk_insert_project_performance,
+    refresh_frame,
+    submit_queries
 )
+from Helpers.Csv_ingestion import read_csv_preview, ingest_performance_csv
+from Helpers import Chart_data
+from Helpers.Lazy_imports import lazy_import
+
+# Imported on first use, so the page starts rendering before they load
+px = lazy_import("plotly.express")
+
+# Projects kept in the session and patched with only the rows changed since the last rerun
+def load_projects():
+    cache = st.session_state.get("projects_cache") or {"frame": None, "watermark": None}
+    frame, watermark, changed = refresh_frame("project", cache["frame"], cache["watermark"], get_all_projects)
+    if changed:
+        cache = {"frame": frame, "status_counts": frame["SuccessIndicator"].value_counts()}
+    cache["watermark"] = watermark
+    st.session_state["projects_cache"] = cache
+    return cache["frame"], cache["status_counts"]
 
 def main():
     st.set_page_config(page_title="Project Tracker", page_icon=":bar_chart:")
@@ -15,6 +31,13 @@ def main():
     st.markdown("Monitor project progress, success rates, and performance metrics across all departments.")
     st.logo("https://streamlit.io/images/brand/streamlit-mark-color.png")
     
+    # The project queries are independent; run them in parallel
+    queries = submit_queries(
+        performance=lambda: get_project_score_chart(Chart_data.CHART_MAX_CATEGORIES),
+        top=get_top_projects,
+        under=get_underperforming_projects
+    )
+
     st.divider()
 
     # ====================================================
@@ -22,13 +45,8 @@ def main():
     # ====================================================
     st.subheader("📌 Key Project Metrics")
 
-    all_projects = pd.DataFrame(
-        get_all_projects(),
-        columns=["ProjectID", "EmployeeID", "ProjectInfo", "SuccessIndicator"]
-    )
-
+    all_projects, status_counts = load_projects()
     total_projects = len(all_projects)
-    status_counts = all_projects['SuccessIndicator'].value_counts()
 
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("Total Projects", total_projects)
@@ -43,9 +61,11 @@ def main():
     # ====================================================
     st.subheader("🧭 Project Status Distribution")
 
+    # One slice per status (already counted), not one row per project
     fig_status = px.pie(
-        all_projects,
+        Chart_data.count_top_k(status_counts, "SuccessIndicator"),
         names="SuccessIndicator",
+        values="Count",
         title="Project Completion Breakdown",
         hole=0.4
     )
@@ -69,19 +89,15 @@ def main():
     # ====================================================
     st.subheader("📈 Project Performance Overview")
 
-    performance_data = pd.DataFrame(
-        get_project_performance(),
-        columns=["ProjectID", "ProjectInfo", "EfficiencyScore", "TimelineScore", "QualityScore", "AccuracyScore"]
-    )
+    # Best projects plus one "Other" bar, aggregated in SQL
+    performance_data = queries["performance"].result()
 
     if not performance_data.empty:
-        performance_data["AvgScore"] = performance_data[
-            ["EfficiencyScore", "TimelineScore", "QualityScore", "AccuracyScore"]
-        ].mean(axis=1)
+        performance_data["Project"] = Chart_data.bucket_labels(performance_data, "ProjectInfo", "ProjectID", "Projects")
 
         fig_perf = px.bar(
             performance_data,
-            x="ProjectInfo",
+            x="Project",
             y="AvgScore",
             color="AvgScore",
             title="Average Performance by Project",
@@ -98,7 +114,7 @@ def main():
     # ====================================================
     st.subheader("🏆 Top Performing Projects")
 
-    top_projects = pd.DataFrame(get_top_projects())
+    top_projects = queries["top"].result()
     if not top_projects.empty:
         st.dataframe(top_projects, use_container_width=True)
     else:
@@ -111,7 +127,7 @@ def main():
     # ====================================================
     st.subheader("⚠️ Underperforming Projects")
 
-    under_projects = pd.DataFrame(get_underperforming_projects())
+    under_projects = queries["under"].result()
     if not under_projects.empty:
         st.dataframe(under_projects, use_container_width=True)
     else:
@@ -134,12 +150,21 @@ def main():
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
 
     if uploaded_file is not None:
-        upload_df = pd.read_csv(uploaded_file)
-        st.dataframe(upload_df)
+        try:
+            st.dataframe(read_csv_preview(uploaded_file))
+        except ValueError as e:
+            st.error(f"Could not read the file: {e}")
+            st.stop()
 
         if st.button("🚀 Upload Data"):
-            if bulk_insert_project_performance(upload_df):
-                st.success("Performance data uploaded successfully.")
+            progress_bar = st.progress(0.0, text="Uploading...")
+            result = ingest_performance_csv(
+                uploaded_file,
+                bulk_insert_project_performance,
+                progress=lambda rows, rejected, fraction: progress_bar.progress(fraction or 0.0, text=f"Uploaded {rows:,} rows")
+            )
+            if result:
+                st.success(f"Performance data uploaded successfully. {result.rows:,} rows inserted, {result.rejected:,} skipped.")
             else:
                 st.error("Upload failed. Please verify the CSV format and try again.")
 
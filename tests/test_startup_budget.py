@@ -0,0 +1,21 @@
+"""
+Startup budget: every page (and Helpers.Database_connectors) must import within
+its budget in benchmarks/startup_budget.json without loading a deferred module.
+
+    python -m pytest tests
+"""
+import importlib.util
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_startup_budget():
+    command = [sys.executable, "-m", "benchmarks.startup_profile", "--check"]
+    if importlib.util.find_spec("streamlit") is None:
+        # The page scripts can't be imported at all without Streamlit; still hold the shared module to its budget
+        command += ["--only", "Helpers.Database_connectors"]
+    proc = subprocess.run(command, capture_output=True, text=True, cwd=ROOT)
+    assert proc.returncode == 0, proc.stdout + proc.stderr